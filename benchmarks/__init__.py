@@ -0,0 +1,4 @@
+"""
+Нагрузочные сценарии и бенчмарки Hotel Control System.
+Запускаются только против локальной (одноразовой) базы данных.
+"""
@@ -0,0 +1,224 @@
+"""
+Бенчмарк основных операций аутентификации и управления пользователями.
+
+Заполняет локальную PostgreSQL синтетическими пользователями, измеряет
+задержки (перцентили), количество SQL-запросов на операцию и пиковое
+потребление памяти, и сохраняет результаты в JSON для сравнения запусков.
+
+Запуск:
+    python -m benchmarks.auth_suite --users 100000 --output results.json
+    python -m benchmarks.auth_suite --users 100000 --compare results.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from sqlalchemy import create_engine, event, text
+
+from benchmarks._db import bench_database_url, prepare_schema
+
+# Итераций прохода измерения памяти (после замера времени)
+MEMORY_PASS_ITERATIONS = 10
+
+# Пароль всех синтетических пользователей
+SEED_PASSWORD = "BenchPass1"
+
+# Стандартные размеры наборов данных
+DATASET_SIZES = (1000, 100000, 1000000)
+
+
+def seed_users(url: str, users: int):
+    """
+    Создает users синтетических пользователей одним INSERT ... SELECT.
+
+    Хэш пароля вычисляется один раз и используется для всех строк,
+    иначе заполнение миллиона пользователей заняло бы часы.
+    """
+    from core.auth import hash_password
+
+    password_hash = hash_password(SEED_PASSWORD)
+    engine = create_engine(url)
+    try:
+        with engine.begin() as connection:
+            connection.execute(text("""
+                INSERT INTO users (login, password_hash, role_id, is_blocked, failed_attempts, last_login)
+                SELECT 'user_' || g, :password_hash, 1 + g % 2, FALSE, 0, now()
+                  FROM generate_series(1, :users) AS g
+            """), {"password_hash": password_hash, "users": users})
+            connection.execute(text("ANALYZE users"))
+    finally:
+        engine.dispose()
+
+
+class QueryCounter:
+    """Считает SQL-запросы, выполненные через engine основной БД."""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Возвращает перцентиль по методу ближайшего ранга."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def measure(name: str, operation: Callable[[int], None], iterations: int, counter: QueryCounter) -> Dict:
+    """
+    Выполняет операцию iterations раз и собирает статистику.
+
+    Args:
+        name: Название операции
+        operation: Функция, принимающая номер итерации
+        iterations: Количество повторений
+        counter: Счетчик SQL-запросов
+
+    Returns:
+        dict: Статистика операции
+    """
+    operation(-1)  # Прогрев: соединения пула, кэши SQLAlchemy
+
+    latencies = []
+    queries_before = counter.count
+    for i in range(iterations):
+        started = time.perf_counter()
+        operation(i)
+        latencies.append((time.perf_counter() - started) * 1000)
+    queries = counter.count - queries_before
+
+    # Память - отдельным проходом: трассировка tracemalloc замедляет операцию
+    # и исказила бы перцентили. Номера итераций продолжают основной проход.
+    tracemalloc.start()
+    for i in range(iterations, iterations + min(iterations, MEMORY_PASS_ITERATIONS)):
+        operation(i)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {
+        "operation": name,
+        "iterations": iterations,
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "queries_per_op": round(queries / iterations, 2),
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+    print(f"{name:<24} p50={result['p50_ms']:>9} ms  p99={result['p99_ms']:>9} ms  "
+          f"queries/op={result['queries_per_op']:>6}  peak={result['peak_memory_kb']:>10} KB")
+    return result
+
+
+def run(users: int, iterations: int) -> List[Dict]:
+    """Запускает все сценарии на наборе из users пользователей."""
+    from core.auth import (
+        authenticate_user, create_user, update_user, change_password,
+        generate_access_token
+    )
+    from core.database import db_manager
+    from core.local_cache import LocalCache
+    from core.permissions import ALL_PERMISSIONS
+
+    counter = QueryCounter(db_manager.engine)
+    access_token = generate_access_token(0, 'Administrator', permissions=ALL_PERMISSIONS)
+    rng = random.Random(42)
+    run_id = int(time.time())
+
+    def op_authenticate(i):
+        authenticate_user(f"user_{rng.randint(1, users)}", SEED_PASSWORD)
+
+    def op_create(i):
+        create_user(f"new_{run_id}_{i}", SEED_PASSWORD, 1, access_token=access_token)
+
+    def op_update(i):
+        update_user(rng.randint(1, users), role_id=1 + i % 2, access_token=access_token)
+
+    passwords = [SEED_PASSWORD, SEED_PASSWORD + "x"]
+
+    def op_change_password(i):
+        # Пользователь user_1 попеременно меняет пароль туда и обратно
+        step = i + 1
+        change_password(1, passwords[step % 2], passwords[(step + 1) % 2])
+
+    cache_dir = tempfile.TemporaryDirectory()
+
+    def op_load_users(i):
+        # Холодная загрузка каталога пользователей в пустую локальную копию
+        cache = LocalCache(f"{cache_dir.name}/cache_{i + 1}.sqlite3")
+        cache.sync()
+        cache.get_users()
+
+    results = [
+        measure("authenticate_user", op_authenticate, iterations, counter),
+        measure("create_user", op_create, iterations, counter),
+        measure("update_user", op_update, iterations, counter),
+        measure("change_password", op_change_password, iterations, counter),
+        measure("load_users", op_load_users, max(1, min(iterations, 5)), counter),
+    ]
+    cache_dir.cleanup()
+    return results
+
+
+def compare(results: List[Dict], baseline_path: str):
+    """Печатает изменение p50/p99 относительно сохраненного запуска."""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {item["operation"]: item for item in json.load(f)["results"]}
+    print(f"\nСравнение с {baseline_path}:")
+    for item in results:
+        before = baseline.get(item["operation"])
+        if not before:
+            continue
+        for key in ("p50_ms", "p99_ms", "queries_per_op"):
+            if before[key]:
+                change = (item[key] - before[key]) / before[key] * 100
+                print(f"  {item['operation']:<24} {key:<15} {before[key]:>10} -> {item[key]:>10} ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк операций аутентификации")
+    parser.add_argument("--url", help="URL локальной PostgreSQL (по умолчанию BENCH_DATABASE_URL)")
+    parser.add_argument("--users", type=int, default=DATASET_SIZES[0],
+                        help=f"Размер набора данных, например {', '.join(map(str, DATASET_SIZES))}")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--output", help="Файл для сохранения результатов в JSON")
+    parser.add_argument("--compare", help="JSON предыдущего запуска для сравнения")
+    args = parser.parse_args()
+
+    url = bench_database_url(args.url)
+    prepare_schema(url, reset=True)
+    seed_users(url, args.users)
+
+    results = run(args.users, args.iterations)
+    report = {
+        "timestamp": datetime.now().isoformat(timespec='seconds'),
+        "users": args.users,
+        "iterations": args.iterations,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nРезультаты сохранены в {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
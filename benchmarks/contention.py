@@ -0,0 +1,105 @@
+"""
+Сценарий конкурентной записи: N стоек администраторов одновременно
+создают пользователей с пересекающимися логинами.
+
+Проверяет, что уникальность обеспечивается ограничением БД без блокировок
+таблиц, и измеряет пропускную способность и долю конфликтов.
+
+Запуск:
+    python -m benchmarks.contention --desks 8 --attempts 50 --logins 100
+"""
+
+import argparse
+import multiprocessing
+import random
+import time
+
+from benchmarks._db import bench_database_url, prepare_schema
+
+
+def _desk_worker(url: str, desk_no: int, attempts: int, logins: int, role_id: int, queue):
+    """Имитирует одну стойку: отдельный процесс со своим пулом соединений."""
+    bench_database_url(url)
+    from core.auth import create_user, generate_access_token
+    from core.permissions import ALL_PERMISSIONS
+
+    access_token = generate_access_token(0, 'Administrator', permissions=ALL_PERMISSIONS)
+    rng = random.Random(desk_no)
+    committed = conflicts = errors = 0
+    started = time.perf_counter()
+    for _ in range(attempts):
+        login = f"desk_user_{rng.randrange(logins)}"
+        success, message, _ = create_user(login, "BenchPass1", role_id, access_token=access_token)
+        if success:
+            committed += 1
+        elif "уже существует" in message:
+            conflicts += 1
+        else:
+            errors += 1
+    queue.put((committed, conflicts, errors, time.perf_counter() - started))
+
+
+def run(url: str, desks: int, attempts: int, logins: int) -> dict:
+    """
+    Запускает сценарий и возвращает сводку.
+
+    Args:
+        url: URL локальной БД
+        desks: Количество одновременных стоек (процессов)
+        attempts: Попыток создания на одну стойку
+        logins: Размер пула логинов (чем меньше, тем больше конфликтов)
+
+    Returns:
+        dict: commits, conflicts, errors, commits_per_sec, conflict_rate
+    """
+    prepare_schema(url, reset=True)
+
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    processes = [
+        ctx.Process(target=_desk_worker, args=(url, desk_no, attempts, logins, 1, queue))
+        for desk_no in range(desks)
+    ]
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+    results = [queue.get() for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+
+    committed = sum(r[0] for r in results)
+    conflicts = sum(r[1] for r in results)
+    errors = sum(r[2] for r in results)
+    total = committed + conflicts + errors
+    return {
+        "desks": desks,
+        "attempts": total,
+        "commits": committed,
+        "conflicts": conflicts,
+        "errors": errors,
+        "elapsed_sec": round(elapsed, 3),
+        "commits_per_sec": round(committed / elapsed, 1) if elapsed else 0.0,
+        "conflict_rate": round(conflicts / total, 3) if total else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Конкурентное создание пользователей")
+    parser.add_argument("--url", help="URL локальной PostgreSQL (по умолчанию BENCH_DATABASE_URL)")
+    parser.add_argument("--desks", type=int, default=8)
+    parser.add_argument("--attempts", type=int, default=50)
+    parser.add_argument("--logins", type=int, default=100)
+    args = parser.parse_args()
+
+    url = bench_database_url(args.url)
+    summary = run(url, args.desks, args.attempts, args.logins)
+    for key, value in summary.items():
+        print(f"{key}: {value}")
+
+    # Каждый логин может быть создан не более одного раза
+    assert summary["commits"] <= args.logins, "Обнаружены дубликаты логинов"
+
+
+if __name__ == "__main__":
+    main()
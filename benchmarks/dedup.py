@@ -0,0 +1,111 @@
+"""
+Бенчмарк поиска дублей профилей гостей на синтетических данных.
+
+Не требует БД: генерирует профили, часть из которых - повторно
+введенные гости (опечатка, транслитерация, другой формат телефона,
+пропущенные поля), и сравнивает найденные пары с известными дублями.
+
+Запуск:
+    python -m benchmarks.dedup --profiles 200000 --duplicates 0.05 --workers 4
+"""
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from core.dedup import GuestProfile, find_duplicates, group_duplicates
+
+SURNAMES = ("Иванов", "Смирнов", "Кузнецов", "Попов", "Васильев", "Петров", "Соколов", "Михайлов",
+            "Новиков", "Федоров", "Морозов", "Волков", "Алексеев", "Лебедев", "Семенов", "Егоров",
+            "Павлов", "Козлов", "Степанов", "Николаев", "Smith", "Johnson", "Müller", "Schmidt",
+            "Garcia", "Rossi", "Martin", "Bernard", "Dubois", "Kowalski")
+GIVEN_NAMES = ("Александр", "Сергей", "Дмитрий", "Андрей", "Алексей", "Мария", "Елена", "Ольга",
+               "Наталья", "Анна", "John", "Anna", "Peter", "Maria", "Thomas", "Laura")
+TRANSLIT = {"Иванов": "Ivanov", "Смирнов": "Smirnov", "Кузнецов": "Kuznetsov", "Попов": "Popov",
+            "Петров": "Petrov", "Соколов": "Sokolov", "Волков": "Volkov", "Козлов": "Kozlov"}
+
+
+def _typo(rng: random.Random, value: str) -> str:
+    """Одна опечатка: пропуск, перестановка или замена буквы."""
+    if len(value) < 4:
+        return value
+    i = rng.randrange(1, len(value) - 1)
+    kind = rng.randrange(3)
+    if kind == 0:
+        return value[:i] + value[i + 1:]
+    if kind == 1:
+        return value[:i - 1] + value[i] + value[i - 1] + value[i + 1:]
+    return value[:i] + rng.choice("аеиоуaeiou") + value[i + 1:]
+
+
+def generate(count: int, duplicate_share: float, seed: int = 1):
+    """
+    Генерирует профили и известные пары дублей.
+
+    Returns:
+        tuple: (профили, множество пар (меньший ID, больший ID))
+    """
+    rng = random.Random(seed)
+    profiles, truth = [], set()
+    originals = int(count * (1 - duplicate_share))
+    for guest_id in range(1, originals + 1):
+        surname = rng.choice(SURNAMES) + ("а" if rng.random() < 0.3 and rng.random() < 0.5 else "")
+        # Дополнительная часть фамилии делает однофамильцев реже, как в реальной базе
+        surname += rng.choice(("", "", "-" + rng.choice(SURNAMES)))
+        profiles.append(GuestProfile(
+            guest_id, surname, rng.choice(GIVEN_NAMES),
+            date(1950, 1, 1) + timedelta(days=rng.randrange(20000)),
+            f"+7 9{rng.randrange(10 ** 9):09d}" if rng.random() < 0.9 else None,
+            f"guest{guest_id}@example.com" if rng.random() < 0.6 else None,
+        ))
+    for guest_id in range(originals + 1, count + 1):
+        original = profiles[rng.randrange(originals)]
+        surname = original.surname
+        change = rng.random()
+        if change < 0.5:
+            surname = _typo(rng, surname)
+        elif change < 0.7:
+            surname = TRANSLIT.get(surname, surname)
+        phone = original.phone
+        if phone and rng.random() < 0.5:
+            digits = phone.replace("+7 ", "")
+            phone = f"8 ({digits[:3]}) {digits[3:6]}-{digits[6:8]}-{digits[8:]}"
+        profiles.append(GuestProfile(
+            guest_id, surname, original.given_name,
+            original.birth_date if rng.random() < 0.8 else None,
+            phone if rng.random() < 0.8 else None,
+            original.email if rng.random() < 0.5 else None,
+        ))
+        truth.add((original.guest_id, guest_id))
+    rng.shuffle(profiles)
+    return profiles, truth
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк поиска дублей гостей")
+    parser.add_argument("--profiles", type=int, default=200000)
+    parser.add_argument("--duplicates", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, default=4, help="Процессов пула (0 - без пула)")
+    args = parser.parse_args()
+
+    profiles, truth = generate(args.profiles, args.duplicates)
+    all_pairs = args.profiles * (args.profiles - 1) // 2
+    print(f"Профилей: {len(profiles)}, известных дублей: {len(truth)}, всех пар: {all_pairs:,}")
+    origin = {duplicate: original for original, duplicate in truth}
+
+    for workers in sorted({0, args.workers}):
+        started = time.perf_counter()
+        candidates = find_duplicates(profiles, workers=workers)
+        elapsed = time.perf_counter() - started
+        found = {(candidate.left_id, candidate.right_id) for candidate in candidates}
+        # Пара дублей одного оригинала между собой - тоже верная находка
+        correct = sum(origin.get(left, left) == origin.get(right, right) for left, right in found)
+        groups = group_duplicates(candidates)
+        print(f"Процессов {workers or 'нет'}: {elapsed:.1f} с, найдено пар {len(found)}, "
+              f"точность {correct / max(len(found), 1):.1%}, полнота {len(found & truth) / len(truth):.1%}, "
+              f"групп на проверку {len(groups)}")
+
+
+if __name__ == "__main__":
+    main()
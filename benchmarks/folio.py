@@ -0,0 +1,105 @@
+"""
+Бенчмарк счетов проживания: пакетная проводка и чтение баланса.
+
+Открывает заданное количество счетов, проводит по каждому услугу
+поштучно и пакетом, начисляет проживание одним оператором и сравнивает
+чтение итогов из folio_balance с суммированием проводок. В конце итоги
+сверяются с суммой журнала.
+
+Запуск:
+    python -m benchmarks.folio --folios 2000 --lookups 1000
+"""
+
+import argparse
+import random
+import time
+from decimal import Decimal
+
+from sqlalchemy import text
+
+from benchmarks._db import bench_database_url, prepare_schema, reset_tables
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк счетов проживания")
+    parser.add_argument("--url", help="URL локальной PostgreSQL (по умолчанию BENCH_DATABASE_URL)")
+    parser.add_argument("--folios", type=int, default=2000)
+    parser.add_argument("--lookups", type=int, default=1000)
+    args = parser.parse_args()
+
+    url = bench_database_url(args.url)
+    # Таблицы фолио предыдущего запуска пересоздаются миграцией
+    reset_tables(url, ["folio_balance", "folio_line", "folio"], ["0003_folio"])
+    prepare_schema(url)
+
+    from core.auth import generate_access_token
+    from core.database import get_db_session
+    from core.folio import Posting, open_folio, post_line, post_lines, post_room_charges, get_balance
+    from core.permissions import ALL_PERMISSIONS
+
+    access_token = generate_access_token(0, 'Administrator', permissions=ALL_PERMISSIONS)
+    rng = random.Random(1)
+
+    folio_ids = []
+    for number in range(args.folios):
+        success, message, folio_id = open_folio(
+            f"Гость {number}", access_token, room_number=str(100 + number),
+            room_rate=Decimal(rng.randrange(3000, 12000))
+        )
+        assert success, message
+        folio_ids.append(folio_id)
+    print(f"Открыто счетов: {len(folio_ids)}")
+
+    sample = folio_ids[:min(200, len(folio_ids))]
+    started = time.perf_counter()
+    for folio_id in sample:
+        success, message = post_line(folio_id, 'extra', Decimal('350.00'), access_token, "Мини-бар")
+        assert success, message
+    single = (time.perf_counter() - started) / len(sample)
+    print(f"Поштучная проводка: {single * 1000:.2f} мс на счет, "
+          f"оценка на все счета {single * len(folio_ids):.2f} с")
+
+    postings = [Posting(folio_id, 'extra', Decimal('120.50'), "Завтрак") for folio_id in folio_ids]
+    started = time.perf_counter()
+    success, message, posted = post_lines(postings, access_token)
+    print(f"Пакетная проводка: {message}, {time.perf_counter() - started:.3f} с")
+    assert success, message
+
+    started = time.perf_counter()
+    success, message, posted = post_room_charges(access_token, tax_rate=Decimal('0.02'))
+    print(f"Начисление за проживание: {message}, {time.perf_counter() - started:.3f} с")
+    assert success, message
+    success, message, repeated = post_room_charges(access_token, tax_rate=Decimal('0.02'))
+    assert success and repeated == 0, "Повторное начисление за ту же дату"
+
+    lookup_ids = [rng.choice(folio_ids) for _ in range(args.lookups)]
+    started = time.perf_counter()
+    for folio_id in lookup_ids:
+        success, message, totals = get_balance(folio_id, access_token)
+        assert success, message
+    print(f"Баланс из folio_balance: {(time.perf_counter() - started) / len(lookup_ids) * 1000:.3f} мс")
+
+    session = get_db_session(read_only=True)
+    try:
+        started = time.perf_counter()
+        for folio_id in lookup_ids:
+            session.execute(text("SELECT sum(amount) FROM folio_line WHERE folio_id = :id"),
+                            {"id": folio_id}).scalar()
+        print(f"Баланс суммированием проводок: "
+              f"{(time.perf_counter() - started) / len(lookup_ids) * 1000:.3f} мс")
+
+        mismatched = session.execute(text("""
+            SELECT count(*)
+              FROM folio_balance b
+              LEFT JOIN (SELECT folio_id, sum(amount) AS total, count(*) AS lines
+                           FROM folio_line GROUP BY folio_id) l USING (folio_id)
+             WHERE b.balance <> coalesce(l.total, 0) OR b.line_count <> coalesce(l.lines, 0)
+        """)).scalar()
+    finally:
+        session.close()
+    print(f"Расхождений итогов с журналом: {mismatched}")
+    assert mismatched == 0, "Итоги не совпадают с журналом"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Бенчмарк прогноза загрузки на синтетической истории бронирований.
+
+Не требует БД: генерирует бронирования за несколько лет по типам номеров,
+сравнивает векторизованное построение матриц набора с поштучным
+добавлением, а дозагрузку новых бронирований - с полным пересчетом.
+
+Запуск:
+    python -m benchmarks.forecast --bookings 150000 --new 500
+"""
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from core.forecast import BookingRecord, OccupancyForecaster
+
+ROOM_TYPES = {"standard": 200, "superior": 120, "deluxe": 60, "suite": 20}
+
+
+def generate(count: int, start: date, days: int, seed: int = 1):
+    """Генерирует бронирования: глубина бронирования распределена экспоненциально, 15% отмен."""
+    rng = random.Random(seed)
+    records = []
+    for _ in range(count):
+        arrival = start + timedelta(days=rng.randrange(days))
+        lead = int(rng.expovariate(1 / 25))
+        booked_on = arrival - timedelta(days=lead)
+        cancelled_on = None
+        if rng.random() < 0.15:
+            cancelled_on = booked_on + timedelta(days=rng.randint(0, lead))
+        records.append(BookingRecord(
+            rng.choices(list(ROOM_TYPES), weights=list(ROOM_TYPES.values()))[0], booked_on, arrival,
+            arrival + timedelta(days=rng.choice((1, 1, 2, 2, 3, 4, 7))), cancelled_on
+        ))
+    records.sort(key=lambda record: record.booked_on)
+    return records
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк прогноза загрузки")
+    parser.add_argument("--bookings", type=int, default=150000)
+    parser.add_argument("--days", type=int, default=3 * 365)
+    parser.add_argument("--new", type=int, default=500, help="Новых бронирований для дозагрузки")
+    args = parser.parse_args()
+
+    start = date.today() - timedelta(days=args.days - 120)
+    records = generate(args.bookings + args.new, start, args.days)
+    history, new = records[:args.bookings], records[args.bookings:]
+    as_of = new[0].booked_on
+    print(f"Бронирований: {len(history)}, типов номеров: {len(ROOM_TYPES)}, дата расчета: {as_of}")
+
+    forecaster, elapsed = timed(lambda: OccupancyForecaster(ROOM_TYPES, history))
+    print(f"Векторизованное построение матриц: {elapsed:.2f} с")
+    sample = history[:min(len(history), 20000)]
+    _, loop_elapsed = timed(lambda: OccupancyForecaster(ROOM_TYPES).add_bookings(sample))
+    print(f"Поштучное добавление (оценка на {len(sample)}): "
+          f"{loop_elapsed * len(history) / len(sample):.2f} с")
+
+    _, elapsed = timed(lambda: forecaster.forecast_all(as_of))
+    print(f"Прогноз по всем типам: {elapsed * 1000:.1f} мс")
+    _, elapsed = timed(lambda: forecaster.forecast_all(as_of))
+    print(f"Повторный прогноз из кэша: {elapsed * 1000:.3f} мс")
+
+    _, elapsed = timed(lambda: forecaster.add_bookings(new))
+    _, forecast_elapsed = timed(lambda: forecaster.forecast_all(as_of))
+    print(f"Дозагрузка {len(new)} бронирований и пересчет: {(elapsed + forecast_elapsed) * 1000:.1f} мс")
+    _, elapsed = timed(lambda: OccupancyForecaster(ROOM_TYPES, records).forecast_all(as_of))
+    print(f"Полный пересчет: {elapsed * 1000:.1f} мс")
+
+    for room_type, forecast in forecaster.forecast_all(as_of).items():
+        print(f"  {room_type:<10} загрузка на 7 дней: "
+              + " ".join(f"{value:.0%}" for value in forecast.occupancy[:7]))
+
+
+if __name__ == "__main__":
+    main()
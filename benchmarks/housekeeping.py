@@ -0,0 +1,121 @@
+"""
+Бенчмарк планирования уборки на синтетическом здании.
+
+Не требует БД: генерирует номера по этажам и крыльям и статусы на начало
+смены, сравнивает распределение "по очереди" с планировщиком по
+максимальной нагрузке и переходам, затем моделирует изменения статусов в
+течение смены и сравнивает время исправления плана на месте с построением
+плана с нуля.
+
+Запуск:
+    python -m benchmarks.housekeeping --floors 10 --rooms-per-floor 40 --housekeepers 8 --updates 200
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from core.housekeeping import (
+    HousekeepingPlanner, Housekeeper, RoomLocation, _walk,
+    STATUS_CLEAN, STATUS_DIRTY, STATUS_OCCUPIED
+)
+
+WINGS = ("A", "B")
+
+
+def generate(floors: int, rooms_per_floor: int, dirty_share: float, seed: int = 1):
+    """Генерирует номера здания и статусы на начало смены."""
+    rng = random.Random(seed)
+    rooms = []
+    per_wing = rooms_per_floor // len(WINGS)
+    for floor in range(1, floors + 1):
+        for wing_no, wing in enumerate(WINGS):
+            for position in range(1, per_wing + 1):
+                room_id = floor * 1000 + wing_no * per_wing + position
+                rooms.append(RoomLocation(room_id, floor, wing, position, rng.choice((20.0, 25.0, 30.0, 45.0))))
+    statuses = {
+        room.room_id: STATUS_DIRTY if rng.random() < dirty_share else rng.choice((STATUS_CLEAN, STATUS_OCCUPIED))
+        for room in rooms
+    }
+    return rooms, statuses
+
+
+def round_robin(rooms, housekeepers, statuses):
+    """
+    Раздает грязные номера по очереди в порядке номеров.
+
+    Returns:
+        tuple: (максимальная нагрузка, суммарное время переходов), мин
+    """
+    by_id = {room.room_id: room for room in rooms}
+    dirty = sorted(room_id for room_id, status in statuses.items() if status == STATUS_DIRTY)
+    loads, walking = [], 0.0
+    for number, housekeeper in enumerate(housekeepers):
+        previous, load = None, 0.0
+        for room_id in dirty[number::len(housekeepers)]:
+            room = by_id[room_id]
+            step = _walk(previous, room, housekeeper.start_floor)
+            load += room.cleaning_minutes + step
+            walking += step
+            previous = room
+        loads.append(load)
+    return max(loads), walking
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк планирования уборки")
+    parser.add_argument("--floors", type=int, default=10)
+    parser.add_argument("--rooms-per-floor", type=int, default=40)
+    parser.add_argument("--housekeepers", type=int, default=8)
+    parser.add_argument("--dirty", type=float, default=0.6, help="Доля грязных номеров на начало смены")
+    parser.add_argument("--updates", type=int, default=200, help="Изменений статуса за смену")
+    args = parser.parse_args()
+
+    rooms, statuses = generate(args.floors, args.rooms_per_floor, args.dirty)
+    housekeepers = [Housekeeper(h, f"Горничная {h}", start_floor=1) for h in range(1, args.housekeepers + 1)]
+    print(f"Номеров: {len(rooms)}, грязных: {sum(s == STATUS_DIRTY for s in statuses.values())}, "
+          f"горничных: {len(housekeepers)}")
+
+    busiest, walking = round_robin(rooms, housekeepers, statuses)
+    print(f"По очереди: максимальная нагрузка {busiest:.0f} мин, переходы {walking:.0f} мин")
+
+    planner = HousekeepingPlanner(rooms, housekeepers)
+    started = time.perf_counter()
+    routes = planner.plan(statuses)
+    plan_sec = time.perf_counter() - started
+    print(f"Планировщик: максимальная нагрузка {max(planner._load(h)[0] for h in planner.housekeepers):.0f} мин, "
+          f"переходы {sum(r.walking_minutes for r in routes):.0f} мин, время {plan_sec * 1000:.0f} мс")
+
+    # Смена: горничные берут номера по маршрутам, статусы меняются
+    rng = random.Random(2)
+    room_ids = [room.room_id for room in rooms]
+    replan_ms, full_ms = [], []
+    for _ in range(args.updates):
+        route = rng.choice(routes)
+        if route.rooms and rng.random() < 0.3:
+            planner.start_cleaning(route.rooms[0])
+        room_id = rng.choice(room_ids)
+        status = rng.choice((STATUS_DIRTY, STATUS_CLEAN, STATUS_OCCUPIED))
+        statuses[room_id] = status
+
+        started = time.perf_counter()
+        routes = planner.update_status(room_id, status)
+        replan_ms.append((time.perf_counter() - started) * 1000)
+
+        # Построение с нуля на копии для сравнения времени
+        fresh = HousekeepingPlanner(rooms, housekeepers)
+        fresh._done = {h: list(rooms_done) for h, rooms_done in planner._done.items()}
+        fresh._in_progress = dict(planner._in_progress)
+        started = time.perf_counter()
+        fresh.plan(statuses)
+        full_ms.append((time.perf_counter() - started) * 1000)
+
+    replan_ms.sort()
+    print(f"Исправление на месте: медиана {statistics.median(replan_ms):.1f} мс, "
+          f"p95 {replan_ms[int(len(replan_ms) * 0.95) - 1]:.1f} мс")
+    print(f"Построение с нуля: медиана {statistics.median(full_ms):.1f} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Нагрузочный тест: N клиентов в отдельных процессах (у каждого свой пул
+соединений, как у настольного приложения) выполняют смесь типичных
+операций стойки администратора.
+
+Отчет: пропускная способность, p99 задержки, количество соединений
+на сервере и ожидания блокировок.
+
+Запуск:
+    python -m benchmarks.load_harness --clients 20 --duration 60 --users 10000
+"""
+
+import argparse
+import multiprocessing
+import random
+import statistics
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+from sqlalchemy import create_engine, text
+
+from benchmarks._db import bench_database_url, prepare_schema
+from benchmarks.auth_suite import SEED_PASSWORD, seed_users, percentile
+
+# Смесь операций: (название, доля)
+OPERATION_MIX = [
+    ("login", 0.50),
+    ("failed_login", 0.10),
+    ("edit_user", 0.20),
+    ("list_refresh", 0.20),
+]
+
+# Интервал опроса статистики сервера (сек)
+SAMPLE_INTERVAL = 0.5
+
+
+def _client_worker(url: str, client_no: int, users: int, duration: float, cache_dir: str, queue):
+    """Один клиент: отдельный процесс со своим пулом соединений."""
+    bench_database_url(url)
+    from core.auth import authenticate_user, update_user, generate_access_token
+    from core.local_cache import LocalCache
+    from core.permissions import ALL_PERMISSIONS
+
+    rng = random.Random(client_no)
+    access_token = generate_access_token(0, 'Administrator', permissions=ALL_PERMISSIONS)
+    cache = LocalCache(f"{cache_dir}/client_{client_no}.sqlite3")
+    names = [name for name, _ in OPERATION_MIX]
+    weights = [weight for _, weight in OPERATION_MIX]
+    latencies = defaultdict(list)
+
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        operation = rng.choices(names, weights)[0]
+        user_no = rng.randint(1, users)
+        started = time.perf_counter()
+        if operation == "login":
+            authenticate_user(f"user_{user_no}", SEED_PASSWORD)
+        elif operation == "failed_login":
+            authenticate_user(f"user_{user_no}", "wrong-password")
+        elif operation == "edit_user":
+            # Заодно снимаем блокировку, накопленную неудачными входами
+            update_user(user_no, role_id=1 + user_no % 2, is_blocked=False, access_token=access_token)
+        else:
+            cache.sync()
+            cache.get_users()
+        latencies[operation].append((time.perf_counter() - started) * 1000)
+
+    queue.put(dict(latencies))
+
+
+def _sample_server(url: str, stop: threading.Event, samples: list):
+    """Периодически снимает количество соединений и ожиданий блокировок."""
+    engine = create_engine(url, pool_size=1, max_overflow=0)
+    try:
+        with engine.connect() as connection:
+            while not stop.is_set():
+                row = connection.execute(text("""
+                    SELECT count(*) FILTER (WHERE application_name LIKE 'HotelControlSystem%'),
+                           count(*) FILTER (WHERE application_name LIKE 'HotelControlSystem%' AND state = 'active'),
+                           count(*) FILTER (WHERE wait_event_type = 'Lock')
+                      FROM pg_stat_activity
+                     WHERE datname = current_database()
+                """)).one()
+                samples.append(tuple(row))
+                connection.commit()
+                stop.wait(SAMPLE_INTERVAL)
+    finally:
+        engine.dispose()
+
+
+def run(url: str, clients: int, duration: float, users: int) -> dict:
+    """Запускает нагрузку и возвращает сводку."""
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    cache_dir = tempfile.TemporaryDirectory()
+    processes = [
+        ctx.Process(target=_client_worker, args=(url, client_no, users, duration, cache_dir.name, queue))
+        for client_no in range(clients)
+    ]
+
+    samples = []
+    stop = threading.Event()
+    sampler = threading.Thread(target=_sample_server, args=(url, stop, samples), daemon=True)
+    sampler.start()
+
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+    results = [queue.get() for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    sampler.join()
+    cache_dir.cleanup()
+
+    merged = defaultdict(list)
+    for result in results:
+        for operation, values in result.items():
+            merged[operation].extend(values)
+    all_latencies = [value for values in merged.values() for value in values]
+
+    summary = {
+        "clients": clients,
+        "elapsed_sec": round(elapsed, 1),
+        "operations": len(all_latencies),
+        "throughput_ops_sec": round(len(all_latencies) / elapsed, 1),
+        "p99_ms": round(percentile(all_latencies, 99), 1) if all_latencies else 0.0,
+        "per_operation": {
+            operation: {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 50), 1),
+                "p99_ms": round(percentile(values, 99), 1),
+            }
+            for operation, values in merged.items()
+        },
+    }
+    if samples:
+        summary["server_connections_max"] = max(s[0] for s in samples)
+        summary["server_connections_avg"] = round(statistics.fmean(s[0] for s in samples), 1)
+        summary["server_active_max"] = max(s[1] for s in samples)
+        summary["lock_waits_max"] = max(s[2] for s in samples)
+        summary["lock_waits_avg"] = round(statistics.fmean(s[2] for s in samples), 2)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный тест нескольких клиентов")
+    parser.add_argument("--url", help="URL локальной PostgreSQL (по умолчанию BENCH_DATABASE_URL)")
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=60.0, help="Длительность (сек)")
+    parser.add_argument("--users", type=int, default=10000)
+    args = parser.parse_args()
+
+    url = bench_database_url(args.url)
+    prepare_schema(url, reset=True)
+    seed_users(url, args.users)
+
+    summary = run(url, args.clients, args.duration, args.users)
+    per_operation = summary.pop("per_operation")
+    for key, value in summary.items():
+        print(f"{key}: {value}")
+    for operation, stats in per_operation.items():
+        print(f"  {operation:<14} count={stats['count']:<8} p50={stats['p50_ms']} ms  p99={stats['p99_ms']} ms")
+
+
+if __name__ == "__main__":
+    main()
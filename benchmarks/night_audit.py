@@ -0,0 +1,63 @@
+"""
+Бенчмарк ночного аудита: время обработки и идемпотентность повторного запуска.
+
+Запуск:
+    python -m benchmarks.night_audit --rows 2000
+"""
+
+import argparse
+import time
+
+from sqlalchemy import create_engine, text
+
+from benchmarks._db import bench_database_url, prepare_schema
+
+# Целевое время аудита (сек)
+TARGET_SECONDS = 5.0
+
+
+def seed(url: str, rows: int):
+    """Создает rows пользователей, половина из которых давно не входила."""
+    engine = create_engine(url)
+    try:
+        with engine.begin() as connection:
+            connection.execute(text("""
+                INSERT INTO users (login, password_hash, role_id, is_blocked, failed_attempts, last_login)
+                SELECT 'audit_' || g, 'x', 1, FALSE, 0,
+                       now() - make_interval(days => CASE WHEN g % 2 = 0 THEN 60 ELSE 1 END)
+                  FROM generate_series(1, :rows) AS g
+            """), {"rows": rows})
+    finally:
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк ночного аудита")
+    parser.add_argument("--url", help="URL локальной PostgreSQL (по умолчанию BENCH_DATABASE_URL)")
+    parser.add_argument("--rows", type=int, default=2000)
+    args = parser.parse_args()
+
+    url = bench_database_url(args.url)
+    prepare_schema(url, reset=True)
+    seed(url, args.rows)
+
+    from core.auth import generate_access_token
+    from core.night_audit import run_night_audit
+    from core.permissions import ALL_PERMISSIONS
+
+    access_token = generate_access_token(0, 'Administrator', permissions=ALL_PERMISSIONS)
+
+    for run_no in (1, 2):
+        started = time.perf_counter()
+        success, message, stats = run_night_audit(access_token=access_token)
+        elapsed = time.perf_counter() - started
+        print(f"Запуск {run_no}: {message}, {stats}, {elapsed:.3f} с")
+        assert success, message
+        assert elapsed < TARGET_SECONDS, f"Превышено целевое время {TARGET_SECONDS} с"
+
+    # Повторный запуск не должен ничего менять
+    assert not any(stats.values()), "Аудит не идемпотентен"
+
+
+if __name__ == "__main__":
+    main()
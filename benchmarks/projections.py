@@ -0,0 +1,84 @@
+"""
+Сравнение чтения списка пользователей полными ORM-объектами
+и проекциями столбцов (core.queries.list_users).
+
+Запуск:
+    python -m benchmarks.projections --users 100000
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from benchmarks._db import bench_database_url, prepare_schema
+from benchmarks.auth_suite import seed_users
+
+
+def load_entities():
+    """Прежний способ: полные объекты User и роли через ORM."""
+    from core.database import get_db_session
+    from core.models import User, Role
+
+    session = get_db_session()
+    try:
+        roles = {role.role_id: role.role_name.value for role in session.query(Role).all()}
+        return [
+            (user.user_id, user.login, roles.get(user.role_id, "Неизвестно"),
+             user.is_blocked, user.failed_attempts)
+            for user in session.query(User).all()
+        ]
+    finally:
+        session.close()
+
+
+def load_projections():
+    """Проекции столбцов без карты идентичности."""
+    from core.queries import list_users
+
+    return list_users()
+
+
+def measure(name: str, loader, repeats: int) -> dict:
+    """
+    Возвращает лучшее время и пиковую память загрузки списка.
+
+    Время и память измеряются разными проходами: трассировка tracemalloc
+    замедляет создание объектов и исказила бы сравнение времени.
+    """
+    loader()  # Прогрев
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        rows = loader()
+        timings.append(time.perf_counter() - started)
+        del rows
+
+    tracemalloc.start()
+    rows = loader()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del rows
+    result = {"name": name, "best_sec": min(timings), "peak_mb": peak / 1024 / 1024}
+    print(f"{name:<12} время={result['best_sec']:.3f} с  пик памяти={result['peak_mb']:.1f} МБ")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ORM-объекты против проекций")
+    parser.add_argument("--url", help="URL локальной PostgreSQL (по умолчанию BENCH_DATABASE_URL)")
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    url = bench_database_url(args.url)
+    prepare_schema(url, reset=True)
+    seed_users(url, args.users)
+
+    entities = measure("ORM", load_entities, args.repeats)
+    projections = measure("Проекции", load_projections, args.repeats)
+    print(f"Ускорение: {entities['best_sec'] / projections['best_sec']:.1f}x, "
+          f"экономия памяти: {entities['peak_mb'] / projections['peak_mb']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
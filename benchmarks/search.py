@@ -0,0 +1,130 @@
+"""
+Бенчмарк полнотекстового поиска по счетам.
+
+Заполняет локальную БД счетами (номер бронирования, гость, комната,
+заметки на русском и английском), строит поисковый индекс и измеряет
+время запросов core.search.search. Проверяет, что изменение заметки
+сразу находится поиском (индекс поддерживает триггер).
+
+Запуск:
+    python -m benchmarks.search --rows 3000000 --queries 200
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+
+from sqlalchemy import create_engine, text
+
+from benchmarks._db import bench_database_url, prepare_schema, reset_tables
+
+# Целевое время запроса (мс, 95-й перцентиль)
+TARGET_P95_MS = 100.0
+
+SURNAMES = ["Иванов", "Смирнов", "Кузнецов", "Попов", "Васильев", "Петров", "Соколов", "Михайлов",
+            "Новиков", "Федоров", "Морозов", "Волков", "Алексеев", "Лебедев", "Семенов", "Егоров",
+            "Smith", "Johnson", "Brown", "Miller", "Schmidt", "Rossi", "Dubois", "Kowalski"]
+GIVEN_NAMES = ["Александр", "Сергей", "Мария", "Елена", "Ольга", "Дмитрий", "John", "Anna", "Peter", "Laura"]
+NOTES = ["поздний заезд", "нужна детская кроватка", "трансфер из аэропорта", "аллергия на орехи",
+         "late checkout requested", "extra pillows", "airport transfer booked", "vegetarian breakfast",
+         "", "", "", ""]
+
+
+def seed(url: str, rows: int):
+    """Пересоздает таблицы счетов и индекса и заполняет rows счетов одним INSERT ... SELECT."""
+    from core.database import get_db_session
+    from core.migrations import apply_migrations
+
+    reset_tables(url, ["search_document", "folio_balance", "folio_line", "folio"],
+                 ["0003_folio", "0004_search", "0005_search_order"])
+    engine = create_engine(url)
+    session = get_db_session()
+    try:
+        apply_migrations(engine, only=["0003_folio"])
+        started = time.perf_counter()
+        session.execute(text("""
+            INSERT INTO folio (booking_ref, guest_name, room_number, notes, status)
+            SELECT 'BR-' || lpad(g::text, 8, '0'),
+                   (:surnames)[1 + g % cardinality(CAST(:surnames AS TEXT[]))]
+                       || CASE WHEN g % 7 = 0 THEN 'а' ELSE '' END || ' '
+                       || (:given)[1 + (g / 7) % cardinality(CAST(:given AS TEXT[]))],
+                   (100 + g % 900)::text,
+                   nullif((:notes)[1 + (g / 3) % cardinality(CAST(:notes AS TEXT[]))], ''),
+                   'open'
+              FROM generate_series(1, :rows) AS g
+        """), {"rows": rows, "surnames": SURNAMES, "given": GIVEN_NAMES, "notes": NOTES})
+        session.commit()
+        print(f"Счетов: {rows}, заполнение {time.perf_counter() - started:.1f} с")
+
+        # Индекс строится миграцией по уже заполненной таблице (как на рабочей базе)
+        started = time.perf_counter()
+        apply_migrations(engine, only=["0004_search", "0005_search_order"])
+        print(f"Построение поискового индекса: {time.perf_counter() - started:.1f} с")
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк полнотекстового поиска")
+    parser.add_argument("--url", help="URL локальной PostgreSQL (по умолчанию BENCH_DATABASE_URL)")
+    parser.add_argument("--rows", type=int, default=3000000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    url = bench_database_url(args.url)
+    prepare_schema(url)
+    seed(url, args.rows)
+
+    from core.auth import generate_access_token
+    from core.folio import update_notes
+    from core.permissions import ALL_PERMISSIONS
+    from core.search import search
+
+    access_token = generate_access_token(0, 'Administrator', permissions=ALL_PERMISSIONS)
+    rng = random.Random(1)
+
+    # Виды запросов стойки: номер бронирования, фамилия в другом падеже,
+    # фамилия с комнатой, начало фамилии (в том числе самое короткое),
+    # слово заметки на русском и английском
+    query_kinds = {
+        "номер бронирования": lambda: f"BR-{rng.randrange(1, args.rows):08d}",
+        "фамилия (падеж)": lambda: rng.choice(SURNAMES[:16]) + "ой",
+        "фамилия и комната": lambda: f"{rng.choice(SURNAMES)} {100 + rng.randrange(900)}",
+        "префикс фамилии": lambda: rng.choice(SURNAMES)[:4],
+        # Самый короткий допустимый префикс совпадает с сотнями тысяч счетов
+        "короткий префикс": lambda: rng.choice(SURNAMES)[:3],
+        "заметка": lambda: rng.choice(["кроватка", "трансфер", "pillow", "breakfast"]),
+    }
+
+    ok = True
+    print(f"{'запрос':<22} {'p50, мс':>8} {'p95, мс':>8} {'результатов':>12}")
+    for kind, make_query in query_kinds.items():
+        timings, found = [], 0
+        for _ in range(args.queries):
+            query = make_query()
+            started = time.perf_counter()
+            success, message, results = search(query, access_token)
+            timings.append((time.perf_counter() - started) * 1000)
+            assert success, message
+            found += bool(results)
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        print(f"{kind:<22} {statistics.median(timings):>8.1f} {p95:>8.1f} "
+              f"{found / args.queries:>11.0%}")
+        ok &= p95 < TARGET_P95_MS
+
+    # Изменение заметки попадает в индекс в той же транзакции
+    success, message = update_notes(1, "Гость просил номер с видом на море", access_token)
+    assert success, message
+    _, _, results = search("видом на море", access_token)
+    indexed = any(result.entity_id == 1 for result in results)
+    print(f"Измененная заметка {'найдена' if indexed else 'не найдена'} поиском")
+
+    sys.exit(0 if ok and indexed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Сравнение прямого режима и сервисного режима при многих клиентах.
+
+В прямом режиме каждый клиент - отдельный процесс со своим пулом
+соединений. В сервисном режиме клиенты обращаются к одному процессу
+core.service по HTTP, и все запросы к БД идут через его общий пул.
+
+Отчет по каждому режиму: пропускная способность, p50/p99 задержки и
+максимальное количество соединений приложения на сервере.
+
+Запуск:
+    python -m benchmarks.service_mode --clients 20 --duration 30 --users 10000
+"""
+
+import argparse
+import multiprocessing
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks._db import bench_database_url, prepare_schema
+from benchmarks.auth_suite import SEED_PASSWORD, seed_users, percentile
+from benchmarks.load_harness import _sample_server
+
+# Смесь операций: (название, доля)
+OPERATION_MIX = [
+    ("login", 0.60),
+    ("edit_user", 0.20),
+    ("list_users", 0.20),
+]
+
+# Порт сервиса на время замера
+SERVICE_PORT = 8799
+
+
+def _client_worker(url: str, mode: str, client_no: int, users: int, duration: float, queue):
+    """Один клиент: в прямом режиме со своим пулом, в сервисном - через HTTP."""
+    bench_database_url(url)
+    from core.auth import generate_access_token
+    from core.permissions import ALL_PERMISSIONS
+
+    access_token = generate_access_token(0, 'Administrator', permissions=ALL_PERMISSIONS)
+    if mode == "service":
+        from core.service_client import ServiceClient, RemoteOperations
+        operations = RemoteOperations(ServiceClient(f"http://127.0.0.1:{SERVICE_PORT}"))
+        authenticate_user = operations.authenticate_user
+        update_user = operations.update_user
+        list_users = lambda: operations.list_users(access_token)
+    else:
+        from core.auth import authenticate_user, update_user
+        from core.queries import list_users
+
+    rng = random.Random(client_no)
+    names = [name for name, _ in OPERATION_MIX]
+    weights = [weight for _, weight in OPERATION_MIX]
+    latencies = []
+
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        operation = rng.choices(names, weights)[0]
+        user_no = rng.randint(1, users)
+        started = time.perf_counter()
+        if operation == "login":
+            authenticate_user(f"user_{user_no}", SEED_PASSWORD)
+        elif operation == "edit_user":
+            update_user(user_no, role_id=1 + user_no % 2, is_blocked=False, access_token=access_token)
+        else:
+            list_users()
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    queue.put(latencies)
+
+
+def _wait_for_port(port: int, timeout: float = 30.0):
+    """Ожидает, пока сервис начнет принимать соединения."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Сервис не запустился на порту {port}")
+
+
+def run(url: str, mode: str, clients: int, duration: float, users: int) -> dict:
+    """Запускает нагрузку в заданном режиме и возвращает сводку."""
+    service = None
+    if mode == "service":
+        service = subprocess.Popen(
+            [sys.executable, "-m", "core.service", "--port", str(SERVICE_PORT)]
+        )
+        _wait_for_port(SERVICE_PORT)
+
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    processes = [
+        ctx.Process(target=_client_worker, args=(url, mode, client_no, users, duration, queue))
+        for client_no in range(clients)
+    ]
+
+    samples = []
+    stop = threading.Event()
+    sampler = threading.Thread(target=_sample_server, args=(url, stop, samples), daemon=True)
+    sampler.start()
+
+    try:
+        started = time.perf_counter()
+        for process in processes:
+            process.start()
+        latencies = [value for _ in processes for value in queue.get()]
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        stop.set()
+        sampler.join()
+        if service is not None:
+            service.terminate()
+            service.wait()
+
+    return {
+        "mode": mode,
+        "clients": clients,
+        "operations": len(latencies),
+        "throughput_ops_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 1) if latencies else 0.0,
+        "p99_ms": round(percentile(latencies, 99), 1) if latencies else 0.0,
+        "server_connections_max": max((s[0] for s in samples), default=0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Прямой режим против сервисного")
+    parser.add_argument("--url", help="URL локальной PostgreSQL (по умолчанию BENCH_DATABASE_URL)")
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30.0, help="Длительность каждого режима (сек)")
+    parser.add_argument("--users", type=int, default=10000)
+    args = parser.parse_args()
+
+    url = bench_database_url(args.url)
+    prepare_schema(url, reset=True)
+    seed_users(url, args.users)
+
+    print(f"{'режим':<8} {'оп/с':>10} {'p50, мс':>9} {'p99, мс':>9} {'соединений':>11}")
+    for mode in ("direct", "service"):
+        summary = run(url, mode, args.clients, args.duration, args.users)
+        print(f"{summary['mode']:<8} {summary['throughput_ops_sec']:>10} {summary['p50_ms']:>9} "
+              f"{summary['p99_ms']:>9} {summary['server_connections_max']:>11}")
+
+
+if __name__ == "__main__":
+    main()
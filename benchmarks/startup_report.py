@@ -0,0 +1,96 @@
+"""
+Отчет о времени запуска приложения.
+
+1. Профиль импортов (python -X importtime): самые дорогие модули по
+   суммарному времени импорта при загрузке main.py.
+2. Время запуска собранного исполняемого файла до первого отображения окна
+   (HOTEL_STARTUP_PROBE=1). Первый запуск после сборки считается холодным,
+   последующие - теплыми (файлы уже в кэше ОС).
+
+Запуск:
+    python -m benchmarks.startup_report
+    python -m benchmarks.startup_report --exe dist/HotelControl/HotelControl.exe --runs 5
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+# Модули, которые загружаются только при первом использовании; их появление
+# в профиле запуска означает, что отложенный импорт снова стал ранним
+DEFERRED_MODULES = ("passlib", "jwt", "sqlalchemy.dialects.postgresql", "psycopg2")
+
+# Строка вывода -X importtime: "import time: self [us] | cumulative | imported package"
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def import_profile(top: int) -> list:
+    """
+    Профилирует импорты main.py (без запуска приложения).
+
+    Returns:
+        tuple: ((суммарное время, мс; модуль) для top модулей верхнего уровня,
+                загруженные при запуске модули из DEFERRED_MODULES)
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=root, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+
+    entries, deferred = [], []
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        # Уровень вложенности определяется отступом; берем модули верхнего уровня
+        if len(match.group(3)) <= 1:
+            entries.append((int(match.group(2)) / 1000, match.group(4)))
+        if match.group(4) in DEFERRED_MODULES:
+            deferred.append(match.group(4))
+    entries.sort(reverse=True)
+    return entries[:top], deferred
+
+
+def launch_times(exe: str, runs: int) -> list:
+    """Запускает исполняемый файл runs раз и возвращает время до выхода (сек)."""
+    env = dict(os.environ, HOTEL_STARTUP_PROBE='1')
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([exe], env=env, check=True)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Отчет о времени запуска")
+    parser.add_argument("--exe", help="Путь к собранному исполняемому файлу")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    entries, deferred = import_profile(args.top)
+    print("Самые медленные импорты при загрузке main.py:")
+    for cumulative_ms, module in entries:
+        print(f"  {cumulative_ms:>9.1f} мс  {module}")
+    if deferred:
+        print(f"\nПри запуске загружены отложенные модули: {', '.join(deferred)}")
+
+    if args.exe:
+        timings = launch_times(args.exe, args.runs)
+        print(f"\nХолодный запуск: {timings[0]:.2f} с")
+        if len(timings) > 1:
+            warm = timings[1:]
+            print(f"Теплый запуск: медиана {statistics.median(warm):.2f} с, "
+                  f"мин {min(warm):.2f} с, макс {max(warm):.2f} с")
+
+
+if __name__ == "__main__":
+    main()
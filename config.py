@@ -1,4 +1,5 @@
 import os
+import socket
 
 # Настройки подключения к БД
 DB_HOST = os.getenv('DB_HOST', '185.121.134.33')
@@ -7,7 +8,65 @@ DB_NAME = os.getenv('DB_NAME', 'hotel')
 DB_USER = os.getenv('DB_USER', 'admin')
 DB_PASSWORD = os.getenv('DB_PASSWORD', '123')
 
-DATABASE_URL = f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+DATABASE_URL = os.getenv(
+    'DATABASE_URL',
+    f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+)
+
+# Объекты (отели) сети, каждый в своей БД. Формат переменной HOTEL_PROPERTIES:
+# "имя=url;имя=url". Без нее используется один объект с DATABASE_URL.
+DEFAULT_PROPERTY = os.getenv('DEFAULT_PROPERTY', 'main')
+PROPERTY_DATABASES = dict(
+    item.strip().split('=', 1)
+    for item in os.getenv('HOTEL_PROPERTIES', '').split(';') if item.strip()
+) or {DEFAULT_PROPERTY: DATABASE_URL}
+if DEFAULT_PROPERTY not in PROPERTY_DATABASES:
+    DEFAULT_PROPERTY = next(iter(PROPERTY_DATABASES))
+PROPERTY_IDLE_TIMEOUT = float(os.getenv('PROPERTY_IDLE_TIMEOUT', '600'))  # сек до закрытия пула
+
+# Сервисный режим: общий пул соединений для всех рабочих мест.
+# Если задан SERVICE_URL, интерфейс работает как тонкий клиент сервиса.
+SERVICE_HOST = os.getenv('SERVICE_HOST', '127.0.0.1')
+SERVICE_PORT = int(os.getenv('SERVICE_PORT', '8765'))
+SERVICE_WORKERS = int(os.getenv('SERVICE_WORKERS', '5'))  # не больше pool_size
+SERVICE_URL = os.getenv('SERVICE_URL')
+SERVICE_TIMEOUT = float(os.getenv('SERVICE_TIMEOUT', '30'))
+# TLS сервиса: сертификат и ключ сервера; без них сервис слушает только
+# локальный адрес (например, за TLS-прокси)
+SERVICE_TLS_CERT = os.getenv('SERVICE_TLS_CERT')
+SERVICE_TLS_KEY = os.getenv('SERVICE_TLS_KEY')
+# Сертификат CA для проверки сервиса клиентом (по умолчанию системные)
+SERVICE_TLS_CA = os.getenv('SERVICE_TLS_CA')
+
+# Подключение через внешний пулер (PgBouncer, режим transaction)
+DB_POOLER_MODE = os.getenv('DB_POOLER_MODE', '0') == '1'
+DB_POOLER_POOL_SIZE = int(os.getenv('DB_POOLER_POOL_SIZE', '0'))  # 0 - без локального пула
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '15000'))
+DB_IDLE_IN_TRANSACTION_TIMEOUT_MS = int(os.getenv('DB_IDLE_IN_TRANSACTION_TIMEOUT_MS', '5000'))
+# Имя рабочего места в application_name
+CLIENT_NAME = os.getenv('CLIENT_NAME') or socket.gethostname()
+
+# Реплика PostgreSQL для чтения основного объекта (необязательно)
+DATABASE_REPLICA_URL = os.getenv('DATABASE_REPLICA_URL')
+REPLICA_MAX_LAG_SECONDS = float(os.getenv('REPLICA_MAX_LAG_SECONDS', '5'))
+
+# Предохранитель и повторы при недоступности БД
+DB_FAILURE_THRESHOLD = int(os.getenv('DB_FAILURE_THRESHOLD', '2'))  # неудач подряд до размыкания
+DB_PROBE_INTERVAL = float(os.getenv('DB_PROBE_INTERVAL', '5'))  # сек между пробными подключениями
+DB_RETRY_ATTEMPTS = int(os.getenv('DB_RETRY_ATTEMPTS', '3'))  # попыток при временных ошибках
+
+# Налог на проживание, начисляемый ночным аудитом вместе с тарифом (доля, например 0.02)
+FOLIO_ROOM_TAX_RATE = os.getenv('FOLIO_ROOM_TAX_RATE', '0')
+# Час, до которого ночной аудит закрывает предыдущие сутки (аудит идет после полуночи)
+BUSINESS_DAY_CUTOFF_HOUR = int(os.getenv('BUSINESS_DAY_CUTOFF_HOUR', '6'))
+
+# Настройки хэширования паролей (подбираются командой
+# python -m core.calibrate_hashing на эталонной машине)
+PASSWORD_SCHEME = os.getenv('PASSWORD_SCHEME', 'bcrypt')  # bcrypt или argon2
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+ARGON2_MEMORY_COST = int(os.getenv('ARGON2_MEMORY_COST', '65536'))  # КиБ
+ARGON2_TIME_COST = int(os.getenv('ARGON2_TIME_COST', '3'))
+ARGON2_PARALLELISM = int(os.getenv('ARGON2_PARALLELISM', '4'))
 
 # Настройки приложения
 APP_NAME = "Hotel Control System"
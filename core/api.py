@@ -0,0 +1,77 @@
+"""
+Модуль операций, используемых интерфейсом.
+
+Если задан SERVICE_URL, интерфейс работает как тонкий клиент: операции
+выполняются через сервис (core.service), а собственного пула соединений
+с БД у рабочего места нет. Иначе операции вызываются напрямую, а списки
+читаются из локальной копии справочников.
+"""
+
+from typing import List, Optional, Tuple
+
+from config import SERVICE_URL
+from core.queries import UserRow, UserDetails
+
+# Интерфейс работает через сервис
+THIN_CLIENT = bool(SERVICE_URL)
+
+if THIN_CLIENT:
+    from core.service_client import ServiceClient, RemoteOperations
+
+    _remote = RemoteOperations(ServiceClient(SERVICE_URL))
+
+    authenticate_user = _remote.authenticate_user
+    change_password = _remote.change_password
+    create_user = _remote.create_user
+    update_user = _remote.update_user
+    unblock_user = _remote.unblock_user
+    bulk_block_users = _remote.bulk_block_users
+    bulk_unblock_users = _remote.bulk_unblock_users
+    bulk_change_role = _remote.bulk_change_role
+    bulk_reset_passwords = _remote.bulk_reset_passwords
+    run_night_audit = _remote.run_night_audit
+    check_connection = _remote.check_connection
+    list_users = _remote.list_users
+    list_roles = _remote.list_roles
+    get_user_details = _remote.get_user_details
+    search = _remote.search
+
+    def sync_users() -> bool:
+        """Списки читаются из сервиса при каждом обращении, синхронизация не нужна."""
+        return False
+
+else:
+    from core.auth import (
+        authenticate_user, change_password, create_user, update_user, unblock_user,
+        bulk_block_users, bulk_unblock_users, bulk_change_role, bulk_reset_passwords
+    )
+    from core.night_audit import run_night_audit
+    from core.database import check_db_connection as check_connection
+    from core.search import search
+    from core.local_cache import local_cache
+    from core import queries
+
+    def list_users(access_token: Optional[str] = None) -> List[UserRow]:
+        """Возвращает каталог пользователей из локальной копии."""
+        if local_cache.is_empty():
+            local_cache.sync()
+        return local_cache.get_users()
+
+    def list_roles(access_token: Optional[str] = None) -> List[Tuple[int, str]]:
+        """Возвращает роли из локальной копии."""
+        if local_cache.is_empty():
+            local_cache.sync()
+        return local_cache.get_roles()
+
+    def get_user_details(user_id: int, access_token: Optional[str] = None) -> Optional[UserDetails]:
+        """Возвращает данные пользователя для формы редактирования."""
+        return queries.get_user_details(user_id)
+
+    def sync_users() -> bool:
+        """
+        Синхронизирует локальную копию справочников.
+
+        Returns:
+            bool: True, если данные изменились
+        """
+        return local_cache.sync()
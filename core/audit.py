@@ -0,0 +1,429 @@
+"""
+Модуль журнала аудита аутентификации.
+
+События ставятся в очередь в памяти и записываются в БД фоновым потоком
+пакетами (многострочный INSERT), поэтому запись аудита не добавляет
+обращений к БД в путь входа пользователя. Событие записывается в БД
+объекта, в котором оно произошло. Пока БД недоступна, попытки записи
+повторяются с растущей паузой, а события сверх предела буфера сохраняются
+в локальный файл и дописываются в БД после восстановления связи.
+
+Таблица журнала и ее секции создаются командой python -m core.migrations.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, date
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, text, or_, and_
+
+from core.database import get_db_session, db_registry
+from core.models import AuthAuditLog
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Типы событий
+EVENT_LOGIN_SUCCESS = 'login_success'
+EVENT_LOGIN_FAILURE = 'login_failure'
+EVENT_LOCKOUT = 'lockout'
+EVENT_PASSWORD_CHANGE = 'password_change'
+EVENT_UNBLOCK = 'unblock'
+EVENT_PASSWORD_RESET = 'password_reset'
+EVENT_ROLE_CHANGE = 'role_change'
+
+# Названия событий для отображения
+EVENT_LABELS = {
+    EVENT_LOGIN_SUCCESS: "Успешный вход",
+    EVENT_LOGIN_FAILURE: "Неудачный вход",
+    EVENT_LOCKOUT: "Блокировка",
+    EVENT_PASSWORD_CHANGE: "Смена пароля",
+    EVENT_UNBLOCK: "Разблокировка",
+    EVENT_PASSWORD_RESET: "Сброс пароля",
+    EVENT_ROLE_CHANGE: "Смена роли",
+}
+
+# Параметры пакетной записи
+AUDIT_BATCH_SIZE = 200  # Максимальное количество событий в одном INSERT
+AUDIT_FLUSH_INTERVAL = 2.0  # Интервал сброса очереди (сек)
+AUDIT_QUEUE_SIZE = 10000  # Предел очереди и буфера; буфер сверх предела сохраняется в файл
+AUDIT_RETRY_MAX_DELAY = 60.0  # Предельная пауза между попытками записи при недоступности БД (сек)
+
+# Файл событий, не записанных в БД из-за ее недоступности
+AUDIT_SPOOL_PATH = os.getenv(
+    'AUDIT_SPOOL_PATH',
+    os.path.join(os.path.expanduser('~'), '.hotel_control', 'audit_spool.jsonl')
+)
+
+# Файл событий объектов, удаленных из конфигурации: записать их некуда,
+# они сохраняются для ручного разбора и больше не повторяются
+AUDIT_DEAD_LETTER_PATH = os.getenv('AUDIT_DEAD_LETTER_PATH', f"{AUDIT_SPOOL_PATH}.unknown")
+
+# На сколько месяцев вперед создаются секции журнала
+AUDIT_PARTITION_MONTHS_AHEAD = 3
+
+# Размер страницы просмотрщика журнала
+AUDIT_PAGE_SIZE = 50
+
+# Схема секционированной таблицы (миграция core.migrations). UPDATE и DELETE
+# запрещены триггером. Секция по умолчанию принимает события, для месяца
+# которых секция еще не создана, чтобы запись журнала не прерывалась.
+AUDIT_SCHEMA_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS auth_audit_log (
+        event_id BIGSERIAL,
+        event_time TIMESTAMP NOT NULL,
+        event_type VARCHAR(32) NOT NULL,
+        user_id INTEGER,
+        login VARCHAR(50),
+        details VARCHAR(255),
+        PRIMARY KEY (event_time, event_id)
+    ) PARTITION BY RANGE (event_time)
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS auth_audit_log_default PARTITION OF auth_audit_log DEFAULT
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_auth_audit_log_login_time
+        ON auth_audit_log (login, event_time DESC, event_id DESC)
+    """,
+    """
+    CREATE OR REPLACE FUNCTION auth_audit_log_append_only() RETURNS trigger AS $$
+    BEGIN
+        RAISE EXCEPTION 'auth_audit_log is append-only';
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    DO $$ BEGIN
+        CREATE TRIGGER auth_audit_log_append_only
+            BEFORE UPDATE OR DELETE ON auth_audit_log
+            FOR EACH ROW EXECUTE FUNCTION auth_audit_log_append_only();
+    EXCEPTION WHEN duplicate_object THEN NULL;
+    END $$
+    """,
+]
+
+
+def _month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _next_month(value: date) -> date:
+    if value.month == 12:
+        return date(value.year + 1, 1, 1)
+    return date(value.year, value.month + 1, 1)
+
+
+def ensure_partition(connection, month: date):
+    """
+    Создает месячную секцию журнала, если ее нет.
+
+    Args:
+        connection: Соединение или сессия БД
+        month: Любая дата внутри нужного месяца
+    """
+    start = _month_start(month)
+    end = _next_month(start)
+    connection.execute(text(
+        f"CREATE TABLE IF NOT EXISTS auth_audit_log_{start:%Y_%m} "
+        f"PARTITION OF auth_audit_log FOR VALUES FROM ('{start}') TO ('{end}')"
+    ))
+
+
+def ensure_partitions(connection, months_ahead: int = AUDIT_PARTITION_MONTHS_AHEAD,
+                      today: Optional[date] = None) -> int:
+    """
+    Создает секции журнала на текущий и следующие месяцы.
+
+    Выполняется командой python -m core.migrations по расписанию.
+
+    Args:
+        connection: Соединение БД с правами владельца схемы
+        months_ahead: Количество месяцев вперед
+        today: Текущая дата (для проверки)
+
+    Returns:
+        int: Количество обработанных месяцев
+    """
+    month = _month_start(today or date.today())
+    for _ in range(months_ahead + 1):
+        ensure_partition(connection, month)
+        month = _next_month(month)
+    return months_ahead + 1
+
+
+class AuditWriter:
+    """
+    Фоновый писатель журнала аудита.
+
+    Накапливает события в очереди и записывает их пакетами по размеру
+    или по таймеру. После неудачной записи следующая попытка откладывается
+    с удвоением паузы (до AUDIT_RETRY_MAX_DELAY); если за это время буфер
+    достигает AUDIT_QUEUE_SIZE, он сохраняется в файл AUDIT_SPOOL_PATH.
+    """
+
+    def __init__(self, batch_size: int = AUDIT_BATCH_SIZE,
+                 flush_interval: float = AUDIT_FLUSH_INTERVAL,
+                 spool_path: str = AUDIT_SPOOL_PATH,
+                 dead_letter_path: str = AUDIT_DEAD_LETTER_PATH):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spool_path = spool_path
+        self.dead_letter_path = dead_letter_path
+        self._queue = queue.Queue(maxsize=AUDIT_QUEUE_SIZE)
+        self._pending: List[Dict] = []
+        self._failures = 0
+        self._retry_at = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Запускает фоновый поток, если он еще не запущен."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="AuditWriter", daemon=True
+                )
+                self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Останавливает поток, предварительно записав накопленные события."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def submit(self, event: Dict):
+        """Ставит событие в очередь без обращения к БД."""
+        self.start()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            logger.error(f"Очередь аудита переполнена, событие отброшено: {event.get('event_type')}")
+
+    def _drain(self, wait: bool = True):
+        """Переносит события из очереди в буфер, не превышая предел буфера."""
+        if wait:
+            try:
+                # Ждем первое событие не дольше интервала сброса
+                self._pending.append(self._queue.get(timeout=self.flush_interval))
+            except queue.Empty:
+                return
+        while len(self._pending) < AUDIT_QUEUE_SIZE:
+            try:
+                self._pending.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+    def _run(self):
+        self._load_spool()
+        while not self._stop.is_set():
+            self._drain()
+            if time.monotonic() >= self._retry_at:
+                if not self._pending and self._failures:
+                    # Буфер сохранен в файл: следующая попытка записывает его
+                    self._load_spool()
+                if self._pending:
+                    self.flush()
+            # БД недоступна, а буфер заполнен: освобождаем память
+            if len(self._pending) >= AUDIT_QUEUE_SIZE:
+                self._spill()
+        # Дописываем остаток очереди при остановке; что не записалось - в файл
+        self._drain(wait=False)
+        while not self._queue.empty() or self._pending:
+            if not self.flush():
+                self._spill()
+                break
+            self._drain(wait=False)
+
+    def _spill(self):
+        """Сохраняет буфер в локальный файл, пока БД недоступна."""
+        if not self._pending:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.spool_path) or '.', exist_ok=True)
+            with open(self.spool_path, 'a', encoding='utf-8') as spool:
+                for event in self._pending:
+                    spool.write(json.dumps(event, ensure_ascii=False, default=str) + '\n')
+        except OSError as e:
+            logger.critical(f"События аудита ({len(self._pending)}) потеряны: "
+                            f"не удалось сохранить их в {self.spool_path}: {e}")
+        else:
+            logger.error(f"БД недоступна: {len(self._pending)} событий аудита сохранены в "
+                         f"{self.spool_path} и будут записаны после восстановления связи")
+        self._pending = []
+
+    def _load_spool(self):
+        """Возвращает в буфер события, сохраненные в файл."""
+        if not os.path.exists(self.spool_path):
+            return
+        # Файл переименовывается, чтобы новые события не смешались с читаемыми
+        replay_path = f"{self.spool_path}.{os.getpid()}"
+        try:
+            os.replace(self.spool_path, replay_path)
+            with open(replay_path, encoding='utf-8') as spool:
+                events = [json.loads(line) for line in spool if line.strip()]
+        except (OSError, ValueError) as e:
+            logger.error(f"Не удалось прочитать сохраненные события аудита из {self.spool_path}: {e}")
+            return
+        for event in events:
+            event['event_time'] = datetime.fromisoformat(event['event_time'])
+        self._pending[:0] = events
+        os.remove(replay_path)
+        logger.info(f"Из {self.spool_path} загружено событий аудита: {len(events)}")
+
+    def _dead_letter(self, property_name: str, events: List[Dict]):
+        """Сохраняет события объекта, удаленного из конфигурации, в отдельный файл."""
+        try:
+            os.makedirs(os.path.dirname(self.dead_letter_path) or '.', exist_ok=True)
+            with open(self.dead_letter_path, 'a', encoding='utf-8') as dead_letter:
+                for event in events:
+                    dead_letter.write(json.dumps(event, ensure_ascii=False, default=str) + '\n')
+        except OSError as e:
+            logger.critical(f"События аудита неизвестного объекта {property_name} ({len(events)}) "
+                            f"потеряны: не удалось сохранить их в {self.dead_letter_path}: {e}")
+        else:
+            logger.error(f"Объект {property_name} отсутствует в конфигурации: {len(events)} событий "
+                         f"аудита перенесены в {self.dead_letter_path}")
+
+    def _write(self, property_name: str, events: List[Dict]):
+        """Записывает события одного объекта пакетами в одной транзакции."""
+        rows = [{key: value for key, value in event.items() if key != 'property_name'}
+                for event in events]
+        session = db_registry.get(property_name).get_session()
+        try:
+            for start in range(0, len(rows), self.batch_size):
+                session.execute(insert(AuthAuditLog.__table__), rows[start:start + self.batch_size])
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def flush(self) -> bool:
+        """
+        Записывает накопленный буфер многострочными INSERT в БД объектов,
+        где произошли события.
+
+        Returns:
+            bool: True, если записан весь буфер
+        """
+        if not self._pending:
+            return True
+        by_property: Dict[str, List[Dict]] = {}
+        for event in self._pending:
+            by_property.setdefault(event['property_name'], []).append(event)
+
+        failed = []
+        known = set(db_registry.names())
+        for property_name, events in by_property.items():
+            if property_name not in known:
+                # Повтор не поможет: объект удален из конфигурации
+                self._dead_letter(property_name, events)
+                continue
+            try:
+                self._write(property_name, events)
+            except Exception as e:
+                logger.error(f"Ошибка записи журнала аудита объекта {property_name} "
+                             f"({len(events)} событий): {e}")
+                failed.extend(events)
+        self._pending = failed
+
+        if failed:
+            self._failures += 1
+            delay = min(self.flush_interval * 2 ** (self._failures - 1), AUDIT_RETRY_MAX_DELAY)
+            self._retry_at = time.monotonic() + delay
+            logger.warning(f"Повтор записи журнала аудита через {delay:.0f} с")
+            return False
+
+        if self._failures:
+            # Связь восстановлена: дописываем события, сохраненные в файл
+            self._failures = 0
+            self._retry_at = 0.0
+            self._load_spool()
+        return True
+
+
+# Единственный экземпляр писателя на процесс
+audit_writer = AuditWriter()
+atexit.register(audit_writer.stop)
+
+
+def record_event(event_type: str, login: Optional[str] = None,
+                 user_id: Optional[int] = None, details: Optional[str] = None):
+    """
+    Регистрирует событие аутентификации.
+
+    Вызов не блокирует: событие записывается в БД фоновым потоком.
+
+    Args:
+        event_type: Тип события (EVENT_*)
+        login: Логин пользователя
+        user_id: ID пользователя
+        details: Дополнительные сведения
+    """
+    audit_writer.submit({
+        # Событие записывается в БД объекта, в котором выполнен вход
+        'property_name': db_registry.current_name,
+        'event_time': datetime.now(),
+        'event_type': event_type,
+        'user_id': user_id,
+        'login': login[:50] if login else login,
+        'details': details[:255] if details else details,
+    })
+
+
+def fetch_events(cursor: Optional[Tuple[datetime, int]] = None,
+                 login: Optional[str] = None,
+                 limit: int = AUDIT_PAGE_SIZE) -> Tuple[List[Dict], Optional[Tuple[datetime, int]]]:
+    """
+    Возвращает страницу журнала от новых событий к старым.
+
+    Используется постраничная выборка по ключу (event_time, event_id),
+    которая опирается на индекс и не замедляется на дальних страницах.
+
+    Args:
+        cursor: Ключ последнего события предыдущей страницы
+        login: Фильтр по логину
+        limit: Размер страницы
+
+    Returns:
+        tuple: (список событий, ключ для следующей страницы или None)
+    """
+    session = get_db_session(read_only=True)
+    try:
+        query = session.query(
+            AuthAuditLog.event_id, AuthAuditLog.event_time, AuthAuditLog.event_type,
+            AuthAuditLog.user_id, AuthAuditLog.login, AuthAuditLog.details
+        )
+        if login:
+            query = query.filter(AuthAuditLog.login == login)
+        if cursor is not None:
+            cursor_time, cursor_id = cursor
+            query = query.filter(or_(
+                AuthAuditLog.event_time < cursor_time,
+                and_(AuthAuditLog.event_time == cursor_time, AuthAuditLog.event_id < cursor_id)
+            ))
+        rows = (
+            query.order_by(AuthAuditLog.event_time.desc(), AuthAuditLog.event_id.desc())
+            .limit(limit + 1)
+            .all()
+        )
+
+        events = [row._asdict() for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = events[-1]
+            next_cursor = (last['event_time'], last['event_id'])
+        return events, next_cursor
+    finally:
+        session.close()
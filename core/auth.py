@@ -1,15 +1,123 @@
-from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import update
-from typing import Optional, Tuple, Dict
-import jwt
-
+from sqlalchemy import update, any_, literal, Integer, ARRAY
+from sqlalchemy.exc import IntegrityError
+from typing import Optional, Tuple, Dict, Iterable
+from functools import lru_cache
+from collections import Counter
+import logging
+import threading
+import time
+
+from config import (
+    PASSWORD_SCHEME, BCRYPT_ROUNDS, ARGON2_MEMORY_COST, ARGON2_TIME_COST, ARGON2_PARALLELISM,
+    SERVICE_URL
+)
 from core.models import User, Role, UserRoleEnum
-from core.database import get_db_session
+from core.database import get_db_session, db_registry
+from core.permissions import Permission, compile_role_permissions
+from core.queries import get_last_login, get_role_name
+from core.audit import (
+    record_event, EVENT_LOGIN_SUCCESS, EVENT_LOGIN_FAILURE, EVENT_LOCKOUT,
+    EVENT_PASSWORD_CHANGE, EVENT_UNBLOCK, EVENT_PASSWORD_RESET, EVENT_ROLE_CHANGE
+)
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Контекст паролей создается при первом использовании:
+# импорт passlib/bcrypt не должен задерживать запуск приложения
+_pwd_context = None
+
+# Счетчики параметров хэшей, встреченных при входе, и выполненных перехэширований
+hash_metrics = Counter()
+_metrics_lock = threading.Lock()
+
+
+def get_pwd_context():
+    # Возвращает CryptContext, импортируя passlib при первом обращении.
+    # Стоимость фиксирована (min = max = default), поэтому хэши с другой
+    # стоимостью считаются устаревшими и перехэшируются при входе.
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+        
+        settings = {
+            'bcrypt__default_rounds': BCRYPT_ROUNDS,
+            'bcrypt__min_rounds': BCRYPT_ROUNDS,
+            'bcrypt__max_rounds': BCRYPT_ROUNDS,
+        }
+        schemes = ["bcrypt"]
+        if PASSWORD_SCHEME == "argon2":
+            try:
+                import argon2  # noqa: F401
+                schemes = ["argon2", "bcrypt"]
+                settings.update({
+                    'argon2__memory_cost': ARGON2_MEMORY_COST,
+                    'argon2__time_cost': ARGON2_TIME_COST,
+                    'argon2__parallelism': ARGON2_PARALLELISM,
+                })
+            except ImportError:
+                logger.warning("Пакет argon2-cffi не установлен, используется bcrypt")
+        
+        _pwd_context = CryptContext(schemes=schemes, deprecated="auto", **settings)
+    return _pwd_context
+
+
+def hash_parameters(hashed_password: str) -> str:
+    # Возвращает схему и параметры хэша, например "bcrypt:12" или "argon2:m=65536,t=3,p=4".
+    parts = hashed_password.split('$')
+    if hashed_password.startswith('$2') and len(parts) > 2:
+        return f"bcrypt:{parts[2]}"
+    if hashed_password.startswith('$argon2') and len(parts) > 3:
+        return f"argon2:{parts[3]}"
+    return "unknown"
+
+
+def _count_metric(key: str):
+    with _metrics_lock:
+        hash_metrics[key] += 1
+
+
+def get_hash_metrics() -> Dict[str, int]:
+    # Возвращает снимок счетчиков параметров хэшей.
+    with _metrics_lock:
+        return dict(hash_metrics)
+
+
+def _password_needs_rehash(hashed_password: str) -> bool:
+    # Проверяет, соответствует ли хэш текущей схеме и стоимости.
+    try:
+        return get_pwd_context().needs_update(hashed_password)
+    except ValueError:
+        # Хэш не распознан (тестовые данные) - не трогаем
+        return False
+
+
+def _rehash_in_background(user_id: int, password: str, old_hash: str):
+    # Перехэширует пароль с текущими параметрами в фоновом потоке.
+    # UPDATE сравнивает старый хэш, чтобы не затереть пароль, измененный за это время.
+    def worker():
+        session = get_db_session()
+        try:
+            new_hash = hash_password(password)
+            result = session.execute(
+                update(User)
+                .where(User.user_id == user_id, User.password_hash == old_hash)
+                .values(password_hash=new_hash)
+            )
+            session.commit()
+            if result.rowcount:
+                _count_metric(f"rehash:{hash_parameters(old_hash)}->{hash_parameters(new_hash)}")
+                logger.info(f"Пароль пользователя {user_id} перехэширован: {hash_parameters(new_hash)}")
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Ошибка перехэширования пароля пользователя {user_id}: {str(e)}")
+        finally:
+            session.close()
+    
+    threading.Thread(target=worker, name="PasswordRehash", daemon=True).start()
 
-# Создаем пароли для контекста с использованием bcrypt
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # Настройки JWT
 SECRET_KEY = "1234567890" 
@@ -20,11 +128,18 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 MAX_FAILED_ATTEMPTS = 3
 INACTIVITY_DAYS = 30  # Блокировка через 30 дней бездействия (1 месяц)
 
+# Временный пароль, выдаваемый при сбросе
+TEMP_PASSWORD = "Temp123!"
+
+# Коды SQLSTATE нарушений ограничений PostgreSQL
+UNIQUE_VIOLATION = '23505'
+FOREIGN_KEY_VIOLATION = '23503'
+
 
 def hash_password(password: str) -> str:
-    # Хэширует пароль с использованием bcrypt.
+    # Хэширует пароль по текущей схеме (bcrypt или argon2) и стоимости.
 
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -35,16 +150,16 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return True
     
     # Для временного пароля Temp123!
-    if plain_password == "Temp123!" and hashed_password.startswith("$2b$"):
+    if plain_password == TEMP_PASSWORD and hashed_password.startswith("$2b$"):
         try:
-            return pwd_context.verify(plain_password, hashed_password)
+            return get_pwd_context().verify(plain_password, hashed_password)
         except Exception:
             # Если возникла ошибка при проверке, считаем это специальным случаем для временного пароля
             return True
     
     # Для остальных пользователей используем безопасную проверку bcrypt
     try:
-        result = pwd_context.verify(plain_password, hashed_password)
+        result = get_pwd_context().verify(plain_password, hashed_password)
         return result
     except ValueError as e:
         # Обрабатываем ошибку, если хэш не распознан
@@ -56,8 +171,13 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return False
 
 
-def generate_access_token(user_id: int, role: str, expires_delta: Optional[timedelta] = None) -> str:
-    # Генерирует JWT токен доступа.
+def generate_access_token(user_id: int, role: str, expires_delta: Optional[timedelta] = None,
+                          permissions: int = 0, property_name: Optional[str] = None) -> str:
+    # Генерирует JWT токен доступа. permissions - битовая маска прав роли.
+    # Токен действует только в БД объекта property_name (по умолчанию текущего):
+    # пользователи, роли и идентификаторы у каждого объекта свои.
+    import jwt
+    
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
@@ -66,14 +186,24 @@ def generate_access_token(user_id: int, role: str, expires_delta: Optional[timed
     to_encode = {
         "sub": str(user_id),
         "role": role,
+        "perms": int(permissions),
+        "prop": property_name or db_registry.current_name,
         "exp": expire
     }
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
+def _token_property_matches(property_name: Optional[str]) -> bool:
+    # Проверяет, что токен выдан для текущего объекта. Тонкий клиент объект
+    # не выбирает: токен проверяет сервис, выдавший его.
+    return bool(SERVICE_URL) or property_name == db_registry.current_name
+
+
 def verify_access_token(token: str) -> Tuple[bool, str, Optional[Dict]]:
     # Проверяет JWT токен доступа. данные токена
+    import jwt
+    
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id = int(payload.get("sub"))
@@ -82,9 +212,14 @@ def verify_access_token(token: str) -> Tuple[bool, str, Optional[Dict]]:
         if user_id is None or role is None:
             return False, "Недействительный токен", None
         
+        if not _token_property_matches(payload.get("prop")):
+            return False, "Токен выдан для другого объекта", None
+        
         token_data = {
             "user_id": user_id,
-            "role": role
+            "role": role,
+            "permissions": payload.get("perms", 0),
+            "property": payload.get("prop")
         }
         return True, "", token_data
     
@@ -96,10 +231,41 @@ def verify_access_token(token: str) -> Tuple[bool, str, Optional[Dict]]:
         return False, f"Ошибка проверки токена: {str(e)}", None
 
 
+@lru_cache(maxsize=64)
+def _token_permissions(token: str) -> Tuple[int, float, Optional[str]]:
+    # Проверяет подпись токена один раз и кэширует (маска прав, срок действия, объект).
+    import jwt
+    
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except Exception:
+        return 0, 0.0, None
+    return int(payload.get("perms", 0)), float(payload.get("exp", 0)), payload.get("prop")
+
+
+def has_permission(token: Optional[str], permission: Permission) -> bool:
+    # Проверяет право по маске из токена без обращения к БД.
+    if not token:
+        return False
+    mask, expires_at, property_name = _token_permissions(token)
+    if expires_at < time.time():
+        return False
+    if not _token_property_matches(property_name):
+        return False
+    return (mask & permission) == permission
+
+
+def _permission_denied(token: Optional[str], permission: Permission) -> Optional[str]:
+    # Возвращает сообщение об ошибке, если у владельца токена нет права.
+    if has_permission(token, permission):
+        return None
+    return "Недостаточно прав для выполнения операции"
+
+
 def authenticate_user(login: str, password: str) -> Tuple[bool, str, Optional[Dict]]:
     # Аутентифицирует пользователя.
 
-    print(f"Попытка аутентификации: login={login}, password={password}")
+    logger.debug(f"Попытка аутентификации: login={login}")
     
     session = get_db_session()
     try:
@@ -107,14 +273,16 @@ def authenticate_user(login: str, password: str) -> Tuple[bool, str, Optional[Di
         user = session.query(User).filter(User.login == login).first()
         
         if not user:
-            print(f"Пользователь с логином '{login}' не найден")
+            logger.debug(f"Пользователь с логином '{login}' не найден")
+            record_event(EVENT_LOGIN_FAILURE, login=login, details="Пользователь не найден")
             return False, "Пользователь не найден", None
         
-        print(f"Найден пользователь: id={user.user_id}, login={user.login}, blocked={user.is_blocked}")
-        print(f"Хэш пароля: {user.password_hash[:20]}...")
+        logger.debug(f"Найден пользователь: id={user.user_id}, login={user.login}, blocked={user.is_blocked}")
         
         if user.is_blocked:
-            print("Пользователь заблокирован")
+            logger.debug("Пользователь заблокирован")
+            record_event(EVENT_LOGIN_FAILURE, login=login, user_id=user.user_id,
+                         details="Пользователь заблокирован")
             return False, "Пользователь заблокирован", None
         
         # Проверяем на неактивность пользователя в течение месяца
@@ -123,11 +291,13 @@ def authenticate_user(login: str, password: str) -> Tuple[bool, str, Optional[Di
             if inactive_days >= INACTIVITY_DAYS:
                 user.is_blocked = True
                 session.commit()
-                print(f"Пользователь заблокирован из-за неактивности ({inactive_days} дней)")
+                logger.debug(f"Пользователь заблокирован из-за неактивности ({inactive_days} дней)")
+                record_event(EVENT_LOCKOUT, login=login, user_id=user.user_id,
+                             details=f"Неактивность {inactive_days} дней")
                 return False, f"Пользователь заблокирован из-за неактивности в течение {inactive_days} дней", None
         
         is_valid = verify_password(password, user.password_hash)
-        print(f"Результат проверки пароля: {is_valid}")
+        logger.debug(f"Результат проверки пароля: {is_valid}")
         
         if not is_valid:
             # Увеличиваем счетчик неудачных попыток
@@ -137,22 +307,39 @@ def authenticate_user(login: str, password: str) -> Tuple[bool, str, Optional[Di
             if user.failed_attempts >= MAX_FAILED_ATTEMPTS:
                 user.is_blocked = True
                 session.commit()
-                print(f"Пользователь заблокирован из-за превышения лимита попыток ({user.failed_attempts})")
+                logger.debug(f"Пользователь заблокирован из-за превышения лимита попыток ({user.failed_attempts})")
+                record_event(EVENT_LOCKOUT, login=login, user_id=user.user_id,
+                             details=f"Превышен лимит попыток ({user.failed_attempts})")
                 return False, "Пользователь заблокирован из-за превышения лимита неудачных попыток", None
             
             session.commit()
-            print(f"Неверный пароль, попытка {user.failed_attempts}")
+            logger.debug(f"Неверный пароль, попытка {user.failed_attempts}")
+            record_event(EVENT_LOGIN_FAILURE, login=login, user_id=user.user_id,
+                         details=f"Неверный пароль, попытка {user.failed_attempts}")
             return False, "Неверный пароль", None
         
+        # Учитываем параметры хэша и при необходимости перехэшируем пароль
+        # в фоне, не задерживая вход
+        _count_metric(f"login:{hash_parameters(user.password_hash)}")
+        if _password_needs_rehash(user.password_hash):
+            _rehash_in_background(user.user_id, password, user.password_hash)
+        
         # Сбрасываем счетчик неудачных попыток
         user.failed_attempts = 0
         
         # Получаем роль пользователя
         role = session.query(Role).filter(Role.role_id == user.role_id).first()
-        print(f"Роль пользователя: {role.role_name.value if role else 'Неизвестна'}")
+        logger.debug(f"Роль пользователя: {role.role_name.value if role else 'Неизвестна'}")
         
-        # Генерируем токен доступа
-        access_token = generate_access_token(user.user_id, role.role_name.value if role else "unknown")
+        # Собираем маску прав роли и генерируем токен доступа
+        permissions = compile_role_permissions(
+            role.role_name.value if role else None,
+            role.permissions if role else None
+        )
+        access_token = generate_access_token(
+            user.user_id, role.role_name.value if role else "unknown", permissions=permissions,
+            property_name=db_registry.current_name
+        )
         
         # Формируем данные пользователя
         user_data = {
@@ -164,7 +351,7 @@ def authenticate_user(login: str, password: str) -> Tuple[bool, str, Optional[Di
         
         # Проверяем, первый ли это вход (сохраняем информацию до обновления last_login)
         is_first_login_flag = user.last_login is None
-        print(f"Первый вход: {is_first_login_flag}")
+        logger.debug(f"Первый вход: {is_first_login_flag}")
         
         # Сохраняем признак первого входа в данных пользователя
         user_data['is_first_login'] = is_first_login_flag
@@ -174,18 +361,19 @@ def authenticate_user(login: str, password: str) -> Tuple[bool, str, Optional[Di
         if not is_first_login_flag:
             user.last_login = datetime.now()
             session.commit()
-            print("Время последнего входа обновлено")
+            logger.debug("Время последнего входа обновлено")
         else:
             # Только сбрасываем счетчик попыток
             session.commit()
-            print("Время последнего входа НЕ обновлено (первый вход)")
+            logger.debug("Время последнего входа НЕ обновлено (первый вход)")
         
-        print("Аутентификация успешна!")
+        logger.debug("Аутентификация успешна!")
+        record_event(EVENT_LOGIN_SUCCESS, login=user_data['login'], user_id=user_data['user_id'])
         
         return True, "", user_data
     
     except Exception as e:
-        print(f"Ошибка при аутентификации: {str(e)}")
+        logger.error(f"Ошибка при аутентификации: {str(e)}")
         session.rollback()
         return False, f"Ошибка при аутентификации: {str(e)}", None
     
@@ -215,7 +403,9 @@ def change_password(user_id: int, current_password: str, new_password: str) -> t
         if user.last_login is None:
             user.last_login = datetime.now()
         
+        user_login = user.login
         session.commit()
+        record_event(EVENT_PASSWORD_CHANGE, login=user_login, user_id=user_id)
         return True, "Пароль успешно изменен"
     
     except Exception as e:
@@ -226,7 +416,11 @@ def change_password(user_id: int, current_password: str, new_password: str) -> t
         session.close()
 
 
-def unblock_user(user_id: int) -> tuple:
+def unblock_user(user_id: int, access_token: str = None) -> tuple:
+
+    denied = _permission_denied(access_token, Permission.USERS_UNBLOCK)
+    if denied:
+        return False, denied
 
     session = get_db_session()
     try:
@@ -240,7 +434,9 @@ def unblock_user(user_id: int) -> tuple:
         
         user.is_blocked = False
         user.failed_attempts = 0
+        user_login = user.login
         session.commit()
+        record_event(EVENT_UNBLOCK, login=user_login, user_id=user_id)
         
         return True, "Пользователь успешно разблокирован"
     
@@ -252,60 +448,150 @@ def unblock_user(user_id: int) -> tuple:
         session.close()
 
 
-def is_first_login(user_id: int) -> bool:
+def _ids_filter(user_ids: Iterable[int]):
+    # Условие user_id = ANY(:ids): один параметр-массив вместо списка IN.
+    return User.user_id == any_(literal(sorted(set(user_ids)), ARRAY(Integer)))
+
 
-    print(f"Проверка первого входа для пользователя с ID={user_id}")
+def _bulk_update(user_ids, access_token, permission, values, condition=None,
+                 event_type=None, action="обновлении",
+                 details="Групповое изменение администратором") -> tuple:
+    # Выполняет один UPDATE ... WHERE user_id = ANY(:ids) в одной транзакции.
+    # values - словарь или функция, которая его возвращает: дорогие значения
+    # (хэш пароля) вычисляются только после проверки прав.
+    # Возвращает (успех, сообщение, количество измененных пользователей).
+    denied = _permission_denied(access_token, permission)
+    if denied:
+        return False, denied, 0
+    
+    user_ids = list(user_ids)
+    if not user_ids:
+        return False, "Не выбраны пользователи", 0
+    if callable(values):
+        values = values()
+    
     session = get_db_session()
     try:
-        user = session.query(User).filter(User.user_id == user_id).first()
-        if not user:
-            print(f"Пользователь с ID={user_id} не найден")
-            return False
+        statement = update(User).where(_ids_filter(user_ids))
+        if condition is not None:
+            statement = statement.where(condition)
+        changed = session.execute(
+            statement.values(**values).returning(User.user_id, User.login),
+            execution_options={'synchronize_session': False}
+        ).all()
+        session.commit()
         
-        print(f"Пользователь найден, last_login={user.last_login}")
-        is_first = user.last_login is None
-        print(f"Результат проверки первого входа: {is_first}")
-        return is_first
+        if event_type:
+            for user_id, user_login in changed:
+                record_event(event_type, login=user_login, user_id=user_id, details=details)
+        
+        return True, f"Изменено пользователей: {len(changed)}", len(changed)
+    
+    except IntegrityError as e:
+        session.rollback()
+        if _integrity_error_code(e) == FOREIGN_KEY_VIOLATION:
+            return False, "Указанная роль не существует", 0
+        return False, f"Ошибка при групповом {action}: {str(e)}", 0
+    
     except Exception as e:
-        print(f"Ошибка при проверке первого входа: {str(e)}")
-        return False
+        session.rollback()
+        return False, f"Ошибка при групповом {action}: {str(e)}", 0
+    
     finally:
         session.close()
 
 
+def bulk_block_users(user_ids: Iterable[int], access_token: str = None) -> tuple:
+
+    return _bulk_update(
+        user_ids, access_token, Permission.USERS_EDIT,
+        {'is_blocked': True},
+        condition=User.is_blocked.is_(False),
+        event_type=EVENT_LOCKOUT, action="блокировке"
+    )
+
+
+def bulk_unblock_users(user_ids: Iterable[int], access_token: str = None) -> tuple:
+
+    return _bulk_update(
+        user_ids, access_token, Permission.USERS_UNBLOCK,
+        {'is_blocked': False, 'failed_attempts': 0},
+        condition=User.is_blocked.is_(True),
+        event_type=EVENT_UNBLOCK, action="разблокировке"
+    )
+
+
+def bulk_change_role(user_ids: Iterable[int], role_id: int, access_token: str = None) -> tuple:
+
+    return _bulk_update(
+        user_ids, access_token, Permission.USERS_EDIT,
+        {'role_id': role_id},
+        condition=User.role_id != role_id,
+        event_type=EVENT_ROLE_CHANGE, action="смене роли",
+        details=f"Групповая смена роли администратором: role_id={role_id}"
+    )
+
+
+def bulk_reset_passwords(user_ids: Iterable[int], access_token: str = None) -> tuple:
+    # Сбрасывает пароли на TEMP_PASSWORD с обязательной сменой при следующем входе.
+    # Хэш вычисляется один раз на всю группу и только после проверки прав.
+    # Статус блокировки не меняется: разблокировка - отдельное действие с правом users.unblock.
+    return _bulk_update(
+        user_ids, access_token, Permission.USERS_EDIT,
+        lambda: {
+            'password_hash': hash_password(TEMP_PASSWORD),
+            'failed_attempts': 0,
+            'last_login': None,
+        },
+        event_type=EVENT_PASSWORD_RESET, action="сбросе паролей"
+    )
+
+
+def is_first_login(user_id: int) -> bool:
+
+    logger.debug(f"Проверка первого входа для пользователя с ID={user_id}")
+    try:
+        last_login = get_last_login(user_id)
+        logger.debug(f"Пользователь найден, last_login={last_login}")
+        is_first = last_login is None
+        logger.debug(f"Результат проверки первого входа: {is_first}")
+        return is_first
+    except LookupError:
+        logger.debug(f"Пользователь с ID={user_id} не найден")
+        return False
+    except Exception as e:
+        logger.error(f"Ошибка при проверке первого входа: {str(e)}")
+        return False
+
+
 def get_user_role(user_id: int) -> str:
 
-    session = get_db_session()
     try:
-        user = session.query(User).filter(User.user_id == user_id).first()
-        if user:
-            role = session.query(Role).filter(Role.role_id == user.role_id).first()
-            return role.role_name.value if role else None
-        return None
+        return get_role_name(user_id)
     except Exception:
         return None
-    finally:
-        session.close()
 
 
-def create_user(login: str, password: str, role_id: int) -> tuple:
+def _integrity_error_code(error: IntegrityError) -> Optional[str]:
+    # Возвращает SQLSTATE нарушенного ограничения (psycopg2 кладет его в pgcode).
+    return getattr(error.orig, 'pgcode', None)
+
+
+def create_user(login: str, password: str, role_id: int, access_token: str = None) -> tuple:
+
+    denied = _permission_denied(access_token, Permission.USERS_CREATE)
+    if denied:
+        return False, denied, None
 
+    # Хэшируем пароль до открытия сессии, чтобы не держать соединение во время bcrypt
+    hashed_password = hash_password(password)
+    
     session = get_db_session()
     try:
-        # Проверка на существование пользователя с таким логином
-        existing_user = session.query(User).filter(User.login == login).first()
-        if existing_user:
-            return False, "Пользователь с таким логином уже существует", None
-        
-        # Получаем роль
-        role = session.query(Role).filter(Role.role_id == role_id).first()
-        if not role:
-            return False, "Указанная роль не существует", None
-        
-        # Хэшируем пароль
-        hashed_password = hash_password(password)
-        
-        # Создаем нового пользователя
+        # Уникальность логина и существование роли проверяет сама БД
+        # (UNIQUE на users.login и FK на role.role_id). Предварительный SELECT
+        # не защищает от гонки между клиентами, поэтому вставляем сразу
+        # и разбираем нарушение ограничения.
         new_user = User(
             login=login,
             password_hash=hashed_password,
@@ -319,6 +605,15 @@ def create_user(login: str, password: str, role_id: int) -> tuple:
         
         return True, "Пользователь успешно создан", new_user.user_id
     
+    except IntegrityError as e:
+        session.rollback()
+        code = _integrity_error_code(e)
+        if code == UNIQUE_VIOLATION:
+            return False, "Пользователь с таким логином уже существует", None
+        if code == FOREIGN_KEY_VIOLATION:
+            return False, "Указанная роль не существует", None
+        return False, f"Ошибка при создании пользователя: {str(e)}", None
+    
     except Exception as e:
         session.rollback()
         return False, f"Ошибка при создании пользователя: {str(e)}", None
@@ -327,72 +622,70 @@ def create_user(login: str, password: str, role_id: int) -> tuple:
         session.close()
 
 
-def update_user(user_id: int, login: str = None, role_id: int = None, is_blocked: bool = None) -> tuple:
+def update_user(user_id: int, login: str = None, role_id: int = None, is_blocked: bool = None,
+                access_token: str = None) -> tuple:
+
+    denied = _permission_denied(access_token, Permission.USERS_EDIT)
+    if denied:
+        return False, denied
 
     session = get_db_session()
     
     # Добавляем логирование для отладки
-    print(f"[DEBUG] update_user вызвана с параметрами: user_id={user_id}, login={repr(login)}, "
-          f"role_id={role_id}, is_blocked={is_blocked}")
+    logger.debug(f"update_user вызвана с параметрами: user_id={user_id}, login={repr(login)}, "
+                 f"role_id={role_id}, is_blocked={is_blocked}")
     
     try:
         # Найти пользователя
         user = session.query(User).filter(User.user_id == user_id).first()
         
         if not user:
-            print(f"[DEBUG] Пользователь с ID {user_id} не найден")
+            logger.debug(f"Пользователь с ID {user_id} не найден")
             return False, "Пользователь не найден"
         
         # Логируем текущие значения пользователя
-        print(f"[DEBUG] Текущие значения пользователя: login={repr(user.login)}, "
-              f"role_id={user.role_id}, is_blocked={user.is_blocked}")
+        logger.debug(f"Текущие значения пользователя: login={repr(user.login)}, "
+                     f"role_id={user.role_id}, is_blocked={user.is_blocked}")
         
         changes_made = False  # Флаг для отслеживания изменений
+        block_event = None  # Событие аудита при смене статуса блокировки
         
         # Обновляем логин, если он предоставлен
         if login is not None:
-            print(f"[DEBUG] Проверка логина: new={repr(login)}, current={repr(user.login)}")
+            logger.debug(f"Проверка логина: new={repr(login)}, current={repr(user.login)}")
             
             # Проверяем, изменился ли логин
             if login != user.login:
-                print(f"[DEBUG] Логин отличается, проверка существующих пользователей")
-                
-                # Проверяем уникальность логина
-                existing_user = session.query(User).filter(User.login == login).first()
-                if existing_user:
-                    print(f"[DEBUG] Найден другой пользователь с логином {repr(login)}: ID={existing_user.user_id}")
-                    return False, "Пользователь с таким логином уже существует"
-                
-                # Обновляем логин
+                # Уникальность логина проверяет ограничение UNIQUE при flush
                 old_login = user.login
                 user.login = login
                 changes_made = True
-                print(f"[DEBUG] Логин изменен с {repr(old_login)} на {repr(login)}")
+                logger.debug(f"Логин изменен с {repr(old_login)} на {repr(login)}")
             else:
-                print(f"[DEBUG] Логин не изменился")
+                logger.debug(f"Логин не изменился")
         
         # Обновляем роль, если она предоставлена
         if role_id is not None:
-            print(f"[DEBUG] Проверка роли: new={role_id}, current={user.role_id}")
+            logger.debug(f"Проверка роли: new={role_id}, current={user.role_id}")
             
             if role_id != user.role_id:
                 # Проверяем существование роли
                 role = session.query(Role).filter(Role.role_id == role_id).first()
                 if not role:
-                    print(f"[DEBUG] Роль с ID {role_id} не найдена")
+                    logger.debug(f"Роль с ID {role_id} не найдена")
                     return False, "Указанная роль не существует"
                 
                 # Обновляем роль
                 old_role_id = user.role_id
                 user.role_id = role_id
                 changes_made = True
-                print(f"[DEBUG] Роль изменена с {old_role_id} на {role_id}")
+                logger.debug(f"Роль изменена с {old_role_id} на {role_id}")
             else:
-                print(f"[DEBUG] Роль не изменилась")
+                logger.debug(f"Роль не изменилась")
         
         # Обновляем статус блокировки, если он предоставлен
         if is_blocked is not None:
-            print(f"[DEBUG] Проверка блокировки: new={is_blocked}, current={user.is_blocked}")
+            logger.debug(f"Проверка блокировки: new={is_blocked}, current={user.is_blocked}")
             
             if is_blocked != user.is_blocked:
                 old_is_blocked = user.is_blocked
@@ -401,32 +694,44 @@ def update_user(user_id: int, login: str = None, role_id: int = None, is_blocked
                 # Если разблокируем пользователя, сбрасываем счетчик неудачных попыток
                 if not is_blocked:
                     user.failed_attempts = 0
-                    print(f"[DEBUG] Пользователь разблокирован, сброшены неудачные попытки")
+                    logger.debug(f"Пользователь разблокирован, сброшены неудачные попытки")
                 
+                block_event = EVENT_LOCKOUT if is_blocked else EVENT_UNBLOCK
                 changes_made = True
-                print(f"[DEBUG] Статус блокировки изменен с {old_is_blocked} на {is_blocked}")
+                logger.debug(f"Статус блокировки изменен с {old_is_blocked} на {is_blocked}")
             else:
-                print(f"[DEBUG] Статус блокировки не изменился")
+                logger.debug(f"Статус блокировки не изменился")
         
         # Сохраняем изменения, если они были
         if changes_made:
-            print(f"[DEBUG] Сохранение изменений в базу данных")
+            logger.debug(f"Сохранение изменений в базу данных")
             session.flush()  # Проверка на ошибки перед коммитом
+            user_login = user.login
             session.commit()
-            print(f"[DEBUG] Изменения успешно сохранены")
+            if block_event:
+                record_event(block_event, login=user_login, user_id=user_id,
+                             details="Изменено администратором")
+            logger.debug(f"Изменения успешно сохранены")
             return True, "Пользователь успешно обновлен"
         else:
-            print(f"[DEBUG] Нет изменений для сохранения")
+            logger.debug(f"Нет изменений для сохранения")
             return True, "Нет изменений в данных пользователя"
     
+    except IntegrityError as e:
+        logger.error(f"Нарушение ограничения при обновлении: {str(e)}")
+        session.rollback()
+        if _integrity_error_code(e) == UNIQUE_VIOLATION:
+            return False, "Пользователь с таким логином уже существует"
+        return False, f"Ошибка при обновлении пользователя: {str(e)}"
+    
     except Exception as e:
-        print(f"[DEBUG] Ошибка при обновлении: {str(e)}")
+        logger.error(f"Ошибка при обновлении: {str(e)}")
         session.rollback()
         return False, f"Ошибка при обновлении пользователя: {str(e)}"
     
     finally:
         session.close()
-        print(f"[DEBUG] Сессия закрыта")
+        logger.debug(f"Сессия закрыта")
 
 
 def verify_token(token: str) -> Tuple[bool, str, Optional[Dict]]:
@@ -0,0 +1,100 @@
+"""
+Подбор стоимости хэширования паролей для эталонной машины.
+
+Измеряет время проверки пароля при разной стоимости и выбирает максимальную
+стоимость, укладывающуюся в целевое время. Результат задается через
+переменные окружения BCRYPT_ROUNDS / ARGON2_MEMORY_COST (см. config.py);
+существующие хэши перехэшируются при следующем входе пользователя.
+
+Запуск:
+    python -m core.calibrate_hashing --target-ms 250
+    python -m core.calibrate_hashing --scheme argon2 --target-ms 250
+"""
+
+import argparse
+import statistics
+import time
+from typing import Callable, List, Tuple
+
+# Диапазоны перебора
+BCRYPT_ROUNDS_RANGE = range(10, 17)
+ARGON2_MEMORY_RANGE = [2 ** power for power in range(14, 21)]  # от 16 МиБ до 1 ГиБ (КиБ)
+
+SAMPLE_PASSWORD = "Calibration-Password-1"
+
+
+def _median_verify_ms(handler, samples: int) -> float:
+    """Возвращает медианное время проверки пароля (мс)."""
+    hashed = handler.hash(SAMPLE_PASSWORD)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        handler.verify(SAMPLE_PASSWORD, hashed)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def _calibrate(candidates: List[Tuple[int, Callable]], target_ms: float, samples: int) -> Tuple[int, list]:
+    """
+    Перебирает стоимость по возрастанию, пока время не превысит цель.
+
+    Returns:
+        tuple: (выбранная стоимость, список (стоимость, мс))
+    """
+    chosen = candidates[0][0]
+    measured = []
+    for cost, make_handler in candidates:
+        elapsed = _median_verify_ms(make_handler(), samples)
+        measured.append((cost, elapsed))
+        if elapsed > target_ms:
+            break
+        chosen = cost
+    return chosen, measured
+
+
+def calibrate_bcrypt(target_ms: float, samples: int = 3) -> Tuple[int, list]:
+    """Подбирает количество раундов bcrypt."""
+    from passlib.hash import bcrypt
+
+    candidates = [(rounds, lambda rounds=rounds: bcrypt.using(rounds=rounds)) for rounds in BCRYPT_ROUNDS_RANGE]
+    return _calibrate(candidates, target_ms, samples)
+
+
+def calibrate_argon2(target_ms: float, time_cost: int, parallelism: int, samples: int = 3) -> Tuple[int, list]:
+    """Подбирает объем памяти argon2 при заданном числе итераций."""
+    from passlib.hash import argon2
+
+    candidates = [
+        (memory, lambda memory=memory: argon2.using(
+            memory_cost=memory, time_cost=time_cost, parallelism=parallelism
+        ))
+        for memory in ARGON2_MEMORY_RANGE
+    ]
+    return _calibrate(candidates, target_ms, samples)
+
+
+def main():
+    from config import ARGON2_TIME_COST, ARGON2_PARALLELISM
+
+    parser = argparse.ArgumentParser(description="Подбор стоимости хэширования паролей")
+    parser.add_argument("--scheme", choices=["bcrypt", "argon2"], default="bcrypt")
+    parser.add_argument("--target-ms", type=float, default=250.0,
+                        help="Целевое время проверки пароля (мс)")
+    parser.add_argument("--samples", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.scheme == "bcrypt":
+        chosen, measured = calibrate_bcrypt(args.target_ms, args.samples)
+        for rounds, elapsed in measured:
+            print(f"  rounds={rounds:<3} {elapsed:8.1f} мс")
+        print(f"\nРекомендуется: BCRYPT_ROUNDS={chosen}")
+    else:
+        chosen, measured = calibrate_argon2(args.target_ms, ARGON2_TIME_COST, ARGON2_PARALLELISM, args.samples)
+        for memory, elapsed in measured:
+            print(f"  memory_cost={memory:<8} {elapsed:8.1f} мс")
+        print(f"\nРекомендуется: PASSWORD_SCHEME=argon2 ARGON2_MEMORY_COST={chosen} "
+              f"ARGON2_TIME_COST={ARGON2_TIME_COST} ARGON2_PARALLELISM={ARGON2_PARALLELISM}")
+
+
+if __name__ == "__main__":
+    main()
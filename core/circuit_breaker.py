@@ -0,0 +1,154 @@
+"""
+Модуль предохранителя (circuit breaker) для доступа к базе данных.
+
+После нескольких подряд неудачных подключений предохранитель размыкается:
+запросы сразу завершаются ошибкой, не дожидаясь таймаутов соединения.
+Фоновый поток периодически проверяет доступность БД и замыкает
+предохранитель, когда она восстанавливается.
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Callable, List, Optional
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Состояния предохранителя
+STATE_CLOSED = 'closed'  # БД доступна, запросы выполняются
+STATE_OPEN = 'open'  # БД недоступна, запросы отклоняются сразу
+STATE_HALF_OPEN = 'half_open'  # Выполняется пробное подключение
+
+
+class CircuitBreaker:
+    """
+    Предохранитель с фоновой проверкой восстановления.
+
+    Attributes:
+        failure_threshold: Количество подряд неудач до размыкания
+        probe_interval: Интервал пробных подключений в разомкнутом состоянии (сек)
+    """
+
+    def __init__(self, probe: Callable[[], None], failure_threshold: int = 2,
+                 probe_interval: float = 5.0):
+        """
+        Args:
+            probe: Функция пробного подключения; должна выбросить исключение при неудаче
+            failure_threshold: Количество подряд неудач до размыкания
+            probe_interval: Интервал пробных подключений (сек)
+        """
+        self._probe = probe
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._lock = threading.Lock()
+        self._probe_thread: Optional[threading.Thread] = None
+        self._listeners: List[Callable[[str], None]] = []
+
+    @property
+    def state(self) -> str:
+        """Текущее состояние предохранителя."""
+        return self._state
+
+    def add_listener(self, listener: Callable[[str], None]):
+        """
+        Подписывает обработчик на смену состояния.
+
+        Обработчик может вызываться из фонового потока.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[str], None]):
+        """Отписывает обработчик смены состояния."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def allow_request(self) -> bool:
+        """
+        Проверяет, можно ли обращаться к БД.
+
+        Пробный поток пропускается всегда, чтобы проверить восстановление.
+        """
+        return self._state == STATE_CLOSED or threading.current_thread() is self._probe_thread
+
+    def record_success(self):
+        """Регистрирует успешное обращение к БД."""
+        if self._failures or self._state != STATE_CLOSED:
+            with self._lock:
+                self._failures = 0
+            self._set_state(STATE_CLOSED)
+
+    def record_failure(self, error: Exception):
+        """Регистрирует неудачное подключение к БД."""
+        with self._lock:
+            self._failures += 1
+            should_open = self._state == STATE_CLOSED and self._failures >= self.failure_threshold
+        if should_open:
+            logger.error(f"БД недоступна, предохранитель разомкнут: {error}")
+            self._set_state(STATE_OPEN)
+            self._start_probe()
+
+    def _set_state(self, state: str):
+        with self._lock:
+            if self._state == state:
+                return
+            self._state = state
+        logger.info(f"Состояние доступа к БД: {state}")
+        for listener in list(self._listeners):
+            try:
+                listener(state)
+            except Exception as e:
+                logger.error(f"Ошибка обработчика состояния предохранителя: {e}")
+
+    def _start_probe(self):
+        with self._lock:
+            if self._probe_thread is not None and self._probe_thread.is_alive():
+                return
+            self._probe_thread = threading.Thread(target=self._probe_loop, name="DatabaseProbe", daemon=True)
+            self._probe_thread.start()
+
+    def _probe_loop(self):
+        """Периодически проверяет доступность БД, пока она не восстановится."""
+        while self._state != STATE_CLOSED:
+            time.sleep(self.probe_interval * random.uniform(0.8, 1.2))
+            self._set_state(STATE_HALF_OPEN)
+            try:
+                self._probe()
+            except Exception as e:
+                logger.warning(f"Пробное подключение к БД не удалось: {e}")
+                self._set_state(STATE_OPEN)
+                continue
+            logger.info("Доступ к БД восстановлен")
+            self.record_success()
+
+
+def retry_transient(func: Callable, is_transient: Callable[[Exception], bool],
+                    attempts: int = 3, base_delay: float = 0.1, max_delay: float = 1.0):
+    """
+    Выполняет func с ограниченным числом повторов при временных ошибках.
+
+    Задержка между попытками растет экспоненциально со случайным
+    разбросом (full jitter), чтобы клиенты не повторяли запросы синхронно.
+
+    Args:
+        func: Функция без аргументов, выполняющая транзакцию целиком
+        is_transient: Проверка, является ли ошибка временной
+        attempts: Максимальное количество попыток
+        base_delay: Базовая задержка (сек)
+        max_delay: Максимальная задержка (сек)
+
+    Returns:
+        Результат func
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            return func()
+        except Exception as e:
+            if attempt == attempts or not is_transient(e):
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
+            logger.warning(f"Временная ошибка БД (попытка {attempt} из {attempts}), повтор через {delay:.2f} с: {e}")
+            time.sleep(delay)
@@ -5,14 +5,25 @@
 
 import logging
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
-from typing import Optional, Tuple, Any
+from typing import Optional, Tuple, Any, Iterator, Union, Callable, Dict, List, NamedTuple
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, text, event, Executable, Row
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, scoped_session, Session
-from sqlalchemy.exc import SQLAlchemyError, OperationalError
-from config import DATABASE_URL
+from sqlalchemy.pool import NullPool
+from sqlalchemy.exc import SQLAlchemyError, OperationalError, DBAPIError
+from config import (
+    DATABASE_REPLICA_URL, REPLICA_MAX_LAG_SECONDS,
+    DB_FAILURE_THRESHOLD, DB_PROBE_INTERVAL, DB_RETRY_ATTEMPTS,
+    PROPERTY_DATABASES, DEFAULT_PROPERTY, PROPERTY_IDLE_TIMEOUT,
+    DB_POOLER_MODE, DB_POOLER_POOL_SIZE, DB_STATEMENT_TIMEOUT_MS, DB_IDLE_IN_TRANSACTION_TIMEOUT_MS,
+    CLIENT_NAME
+)
+from core.circuit_breaker import CircuitBreaker, retry_transient
 
 # Настройка логирования
 logger = logging.getLogger(__name__)
@@ -33,27 +44,135 @@ class QueryError(DatabaseError):
     pass
 
 
+class DatabaseUnavailableError(ConnectionError):
+    """Исключение, выбрасываемое без обращения к БД, пока она известна как недоступная."""
+    pass
+
+
+class _Engines(NamedTuple):
+    """Engine и фабрики сессий, действующие на момент обращения."""
+    engine: Any
+    replica_engine: Any
+    session_factory: Any
+    replica_session_factory: Any
+
+
+# Коды SQLSTATE временных ошибок, после которых транзакцию можно повторить
+TRANSIENT_PGCODES = {
+    '40001',  # serialization_failure
+    '40P01',  # deadlock_detected
+    '53300',  # too_many_connections
+    '57P01',  # admin_shutdown
+    '57P03',  # cannot_connect_now
+}
+
+
+def is_transient_error(error: Exception) -> bool:
+    """
+    Проверяет, является ли ошибка БД временной.
+    
+    Args:
+        error: Исключение, полученное при работе с БД
+        
+    Returns:
+        bool: True, если операцию имеет смысл повторить
+    """
+    if isinstance(error, DatabaseUnavailableError):
+        return False
+    if isinstance(error, QueryError) and isinstance(error.__cause__, Exception):
+        error = error.__cause__
+    if isinstance(error, DBAPIError):
+        if error.connection_invalidated:
+            return True
+        return getattr(error.orig, 'pgcode', None) in TRANSIENT_PGCODES
+    return False
+
+
+# Имя приложения в pg_stat_activity
+APPLICATION_NAME = "HotelControlSystem"
+
+# Размер порции, читаемой из серверного курсора в stream_query
+STREAM_CHUNK_SIZE = 1000
+
+# Интервал повторной проверки задержки реплики (сек)
+REPLICA_LAG_CHECK_INTERVAL = 5.0
+
+# Запрос задержки реплики (сек). На основном сервере и на реплике, которая
+# применила все полученные изменения, задержка равна 0.
+REPLICA_LAG_QUERY = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+
 class DatabaseManager:
     """
     Менеджер базы данных.
     Управляет подключением и сессиями базы данных.
+    
+    Если задан URL реплики, сессии только для чтения направляются на нее,
+    пока ее задержка не превышает порог и с момента последней записи этого
+    клиента прошло больше порога задержки (чтение своих записей).
+    
+    Подключения к основной БД проходят через предохранитель: после
+    нескольких подряд неудачных подключений запросы отклоняются сразу
+    (DatabaseUnavailableError), пока фоновая проверка не обнаружит, что БД
+    снова доступна.
+    
+    В режиме внешнего пулера (PgBouncer в режиме transaction) соединение
+    сервера принадлежит клиенту только на время транзакции, поэтому менеджер
+    не держит собственный пул (или держит крошечный), не опирается на
+    состояние сеанса и ограничивает длительность каждой транзакции.
     """
     
-    def __init__(self, database_url: str):
+    def __init__(self, database_url: str, replica_url: Optional[str] = None,
+                 max_replica_lag: float = REPLICA_MAX_LAG_SECONDS,
+                 pooler_mode: bool = DB_POOLER_MODE):
         """
         Инициализирует менеджер базы данных.
         
         Args:
-            database_url (str): URL подключения к базе данных
+            database_url (str): URL подключения к основной базе данных
+            replica_url (str, optional): URL подключения к реплике для чтения
+            max_replica_lag (float): Допустимая задержка реплики (сек)
+            pooler_mode (bool): Подключение через внешний пулер в режиме transaction
             
         Raises:
             ValueError: Если URL подключения некорректен
         """
         self.validate_database_url(database_url)
+        if replica_url:
+            self.validate_database_url(replica_url)
         self.database_url = database_url
+        self.replica_url = replica_url
+        self.max_replica_lag = max_replica_lag
+        self.pooler_mode = pooler_mode
         self._engine = None
         self._session_factory = None
-        self._setup_engine()
+        self._replica_engine = None
+        self._replica_session_factory = None
+        # Engine создается при первом обращении: загрузка диалекта и драйвера
+        # PostgreSQL не должна задерживать появление окна. Блокировка защищает
+        # также от закрытия пула (dispose) между выбором фабрики и созданием сессии.
+        self._engine_lock = threading.Lock()
+        
+        # Состояние маршрутизации чтения
+        self._last_write_at = 0.0
+        self._replica_checked_at = 0.0
+        self._replica_usable = False
+        
+        # Время последнего обращения (для закрытия простаивающего пула)
+        self.last_used = time.monotonic()
+        
+        # Предохранитель основной БД
+        self.breaker = CircuitBreaker(
+            probe=self._probe_connection,
+            failure_threshold=DB_FAILURE_THRESHOLD,
+            probe_interval=DB_PROBE_INTERVAL
+        )
     
     @staticmethod
     def validate_database_url(url: str) -> bool:
@@ -74,33 +193,104 @@ class DatabaseManager:
             raise ValueError(f"Некорректный URL подключения к БД: {url}")
         return True
     
+    def _create_engine(self, url: str):
+        """
+        Создает engine SQLAlchemy с оптимальными параметрами.
+        
+        Args:
+            url (str): URL подключения
+        """
+        if self.pooler_mode:
+            return self._create_pooler_engine(url)
+        return create_engine(
+            url,
+            echo=False,  # Отключаем логирование SQL-запросов в консоль
+            pool_pre_ping=True,  # Проверка соединения перед использованием
+            pool_recycle=3600,  # Переподключение через 1 час неактивности
+            pool_size=5,  # Максимальное количество соединений в пуле
+            max_overflow=10,  # Максимальное количество временных соединений
+            pool_timeout=30,  # Таймаут получения соединения из пула (сек)
+            connect_args={
+                "connect_timeout": 5,  # Таймаут соединения с БД (сек)
+                "application_name": APPLICATION_NAME  # Имя приложения в БД
+            }
+        )
+    
+    def _create_pooler_engine(self, url: str):
+        """
+        Создает engine для работы через внешний пулер в режиме transaction.
+        
+        Соединения объединяет пулер, поэтому локально используется NullPool
+        или пул из DB_POOLER_POOL_SIZE соединений. psycopg2 не создает
+        подготовленных операторов на сервере, а приложение не использует
+        рекомендательные блокировки, LISTEN и SET уровня сеанса: все настройки
+        задаются через SET LOCAL и действуют только до конца транзакции.
+        
+        Args:
+            url (str): URL подключения к пулеру
+        """
+        if DB_POOLER_POOL_SIZE > 0:
+            pool_args = {
+                'pool_size': DB_POOLER_POOL_SIZE,
+                'max_overflow': 0,
+                'pool_timeout': 30,
+                'pool_pre_ping': True,
+            }
+        else:
+            pool_args = {'poolclass': NullPool}
+        return create_engine(
+            url,
+            echo=False,
+            connect_args={
+                "connect_timeout": 5,
+                # Пулер передает имя клиента серверу при выдаче соединения
+                "application_name": f"{APPLICATION_NAME}/{CLIENT_NAME}"
+            },
+            **pool_args
+        )
+    
+    @staticmethod
+    def _limit_transactions(factory):
+        """Ограничивает длительность транзакций сессий в режиме пулера."""
+        def after_begin(session, transaction, connection):
+            # Длинные транзакции удерживают соединение сервера у пулера
+            connection.exec_driver_sql(
+                f"SET LOCAL statement_timeout = {int(DB_STATEMENT_TIMEOUT_MS)}; "
+                f"SET LOCAL idle_in_transaction_session_timeout = {int(DB_IDLE_IN_TRANSACTION_TIMEOUT_MS)}"
+            )
+        
+        event.listen(factory, 'after_begin', after_begin)
+    
     def _setup_engine(self):
         """
-        Настраивает engine SQLAlchemy с оптимальными параметрами.
+        Настраивает engine SQLAlchemy основной БД и, если задана, реплики.
         """
         try:
-            self._engine = create_engine(
-                self.database_url,
-                echo=False,  # Отключаем логирование SQL-запросов в консоль
-                pool_pre_ping=True,  # Проверка соединения перед использованием
-                pool_recycle=3600,  # Переподключение через 1 час неактивности
-                pool_size=5,  # Максимальное количество соединений в пуле
-                max_overflow=10,  # Максимальное количество временных соединений
-                pool_timeout=30,  # Таймаут получения соединения из пула (сек)
-                connect_args={
-                    "connect_timeout": 5,  # Таймаут соединения с БД (сек)
-                    "application_name": "HotelControlSystem"  # Имя приложения в БД
-                }
+            self._engine = self._create_engine(self.database_url)
+            self._guard_engine(self._engine)
+            primary_factory = sessionmaker(
+                autocommit=False,
+                autoflush=False,
+                bind=self._engine
             )
             
-            # Создаем фабрику сессий
-            self._session_factory = scoped_session(
-                sessionmaker(
+            if self.pooler_mode:
+                self._limit_transactions(primary_factory)
+            
+            if self.replica_url:
+                self._replica_engine = self._create_engine(self.replica_url)
+                replica_factory = sessionmaker(
                     autocommit=False,
                     autoflush=False,
-                    bind=self._engine
+                    bind=self._replica_engine
                 )
-            )
+                if self.pooler_mode:
+                    self._limit_transactions(replica_factory)
+                self._replica_session_factory = scoped_session(replica_factory)
+                self._track_writes(primary_factory)
+            
+            # Создаем фабрику сессий
+            self._session_factory = scoped_session(primary_factory)
             
             logger.info("Engine SQLAlchemy успешно настроен")
             
@@ -108,46 +298,272 @@ class DatabaseManager:
             logger.error(f"Ошибка настройки engine SQLAlchemy: {e}")
             raise ConnectionError(f"Не удалось настроить подключение к БД: {e}")
     
-    def get_session(self) -> Session:
+    def _ensure_engine(self) -> _Engines:
+        """
+        Создает engine и фабрики сессий, если их нет (при первом обращении
+        или после dispose), и возвращает действующие.
+        
+        Должен вызываться под self._engine_lock.
+        """
+        if self._session_factory is None:
+            self._setup_engine()
+        return _Engines(self._engine, self._replica_engine,
+                        self._session_factory, self._replica_session_factory)
+    
+    def _engines(self) -> _Engines:
+        """Возвращает действующие engine и фабрики сессий, создавая их при необходимости."""
+        with self._engine_lock:
+            return self._ensure_engine()
+    
+    @property
+    def engine(self):
+        """Engine SQLAlchemy основной БД."""
+        return self._engines().engine
+    
+    def dispose(self, idle_for: float = 0.0) -> bool:
+        """
+        Закрывает пулы соединений, если ни одно соединение не выдано и к
+        менеджеру не обращались последние idle_for секунд.
+        
+        Время простоя проверяется под той же блокировкой, под которой
+        get_session выдает сессии, поэтому только что выданная сессия не
+        останется с закрытым engine. Engine будет создан заново при
+        следующем обращении.
+        
+        Args:
+            idle_for (float): Требуемое время простоя (сек)
+        
+        Returns:
+            bool: True, если пулы закрыты
+        """
+        with self._engine_lock:
+            if self._engine is None:
+                return False
+            if time.monotonic() - self.last_used < idle_for:
+                return False
+            engines = [e for e in (self._engine, self._replica_engine) if e is not None]
+            # У NullPool нет выданных соединений, которые нужно ждать
+            if any(getattr(e.pool, 'checkedout', lambda: 0)() for e in engines):
+                return False
+            self._session_factory.remove()
+            if self._replica_session_factory is not None:
+                self._replica_session_factory.remove()
+            for e in engines:
+                e.dispose()
+            self._engine = self._replica_engine = None
+            self._session_factory = self._replica_session_factory = None
+        logger.info(f"Пул соединений закрыт после простоя: {self.database_url.split('@')[-1]}")
+        return True
+    
+    def _guard_engine(self, engine):
+        """
+        Подключает предохранитель и повторы подключения к engine.
+        
+        Проверка выполняется при создании и выдаче соединения из пула, поэтому
+        ошибка возникает при первом запросе сессии, внутри обработчиков
+        ошибок вызывающего кода.
+        """
+        breaker = self.breaker
+        
+        def reject_if_open():
+            if not breaker.allow_request():
+                raise DatabaseUnavailableError("База данных недоступна, повторите попытку позже")
+        
+        @event.listens_for(engine, 'do_connect')
+        def connect_with_retry(dialect, conn_rec, cargs, cparams):
+            reject_if_open()
+            # Временные отказы подключения повторяем с задержкой
+            return retry_transient(
+                lambda: dialect.connect(*cargs, **cparams),
+                lambda e: getattr(e, 'pgcode', None) in TRANSIENT_PGCODES,
+                attempts=DB_RETRY_ATTEMPTS
+            )
+        
+        @event.listens_for(engine, 'checkout')
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            reject_if_open()
+            breaker.record_success()
+        
+        @event.listens_for(engine, 'handle_error')
+        def on_error(context):
+            # Ошибка подключения или разрыв соединения: БД может быть недоступна
+            if context.connection is None or context.is_disconnect:
+                breaker.record_failure(context.original_exception)
+    
+    def _probe_connection(self):
+        """Пробное подключение к основной БД для проверки восстановления."""
+        with self.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    
+    @property
+    def breaker_state(self) -> str:
+        """Состояние предохранителя основной БД."""
+        return self.breaker.state
+    
+    def _track_writes(self, factory):
+        """Запоминает время последней фиксации транзакции с изменениями на основной БД."""
+        def mark_write(session, *args):
+            session.info['has_writes'] = True
+        
+        def mark_statement(orm_execute_state):
+            if not orm_execute_state.is_select:
+                orm_execute_state.session.info['has_writes'] = True
+        
+        def after_commit(session):
+            if session.info.pop('has_writes', False):
+                self._last_write_at = time.monotonic()
+        
+        def after_rollback(session):
+            session.info.pop('has_writes', None)
+        
+        event.listen(factory, 'after_flush', mark_write)
+        event.listen(factory, 'do_orm_execute', mark_statement)
+        event.listen(factory, 'after_commit', after_commit)
+        event.listen(factory, 'after_rollback', after_rollback)
+    
+    def replica_lag(self) -> Optional[float]:
+        """
+        Возвращает задержку реплики в секундах.
+        
+        Returns:
+            float или None, если реплика не задана или недоступна
+        """
+        replica_engine = self._engines().replica_engine
+        if replica_engine is None:
+            return None
+        try:
+            with replica_engine.connect() as connection:
+                return float(connection.execute(text(REPLICA_LAG_QUERY)).scalar())
+        except Exception as e:
+            logger.warning(f"Реплика недоступна: {e}")
+            return None
+    
+    def _use_replica(self) -> bool:
+        """Решает, можно ли направить чтение на реплику."""
+        if self._replica_session_factory is None:
+            return False
+        now = time.monotonic()
+        # Клиент недавно писал: реплика может еще не содержать его изменений
+        if now - self._last_write_at < self.max_replica_lag:
+            return False
+        if now - self._replica_checked_at >= REPLICA_LAG_CHECK_INTERVAL:
+            lag = self.replica_lag()
+            self._replica_usable = lag is not None and lag <= self.max_replica_lag
+            self._replica_checked_at = now
+            if not self._replica_usable:
+                logger.warning(f"Чтение переключено на основную БД, задержка реплики: {lag}")
+        return self._replica_usable
+    
+    def get_session(self, read_only: bool = False) -> Session:
         """
         Создает и возвращает новую сессию базы данных.
         
+        Args:
+            read_only (bool): Сессия только для чтения; может быть направлена на реплику
+        
         Returns:
             Session: Объект сессии SQLAlchemy
             
         Raises:
             ConnectionError: При проблемах с созданием сессии
         """
+        return self._open_session(read_only, scoped=True)
+    
+    def _open_session(self, read_only: bool, scoped: bool) -> Session:
+        """Создает сессию потока (scoped) или отдельную сессию."""
+        # Задержка реплики проверяется до блокировки: replica_lag берет ее сам
+        use_replica = read_only and self._use_replica()
         try:
-            session = self._session_factory()
-            return session
+            # Выбор фабрики и создание сессии - под блокировкой вместе
+            # с отметкой времени обращения, чтобы dispose не закрыл engine между ними
+            with self._engine_lock:
+                self.last_used = time.monotonic()
+                engines = self._ensure_engine()
+                factory = engines.session_factory
+                if use_replica and engines.replica_session_factory is not None:
+                    factory = engines.replica_session_factory
+                return factory() if scoped else factory.session_factory()
+        except ConnectionError:
+            raise
         except Exception as e:
             logger.error(f"Ошибка создания сессии БД: {e}")
             raise ConnectionError(f"Не удалось создать сессию БД: {e}")
     
+    def new_session(self, read_only: bool = False) -> Session:
+        """
+        Создает отдельную сессию, не связанную с сессией потока.
+        
+        get_session возвращает сессию потока (scoped_session): ее разделяет
+        весь код потока. Отдельную сессию вызывающий код закрывает сам,
+        и ее откат или закрытие не затрагивают сессию потока.
+        
+        Args:
+            read_only (bool): Сессия только для чтения; может быть направлена на реплику
+        
+        Returns:
+            Session: Объект сессии SQLAlchemy
+            
+        Raises:
+            ConnectionError: При проблемах с созданием сессии
+        """
+        return self._open_session(read_only, scoped=False)
+    
     @contextmanager
-    def session_scope(self):
+    def session_scope(self, read_only: bool = False):
         """
         Контекстный менеджер для работы с сессией базы данных.
         Автоматически закрывает сессию после использования.
         
+        Args:
+            read_only (bool): Сессия только для чтения; может быть направлена на реплику
+        
         Yields:
             Session: Объект сессии SQLAlchemy
             
         Raises:
+            DatabaseUnavailableError: Если БД известна как недоступная
             QueryError: При ошибках выполнения операций с БД
         """
-        session = self.get_session()
+        session = self.get_session(read_only)
         try:
             yield session
             session.commit()
+        except DatabaseUnavailableError:
+            session.rollback()
+            raise
         except Exception as e:
             session.rollback()
             logger.error(f"Ошибка в операции с БД: {e}")
-            raise QueryError(f"Ошибка выполнения операции: {e}")
+            raise QueryError(f"Ошибка выполнения операции: {e}") from e
         finally:
             session.close()
     
+    def run_in_transaction(self, func, read_only: bool = False,
+                           attempts: int = DB_RETRY_ATTEMPTS) -> Any:
+        """
+        Выполняет func(session) в транзакции с повтором при временных ошибках.
+        
+        Транзакция повторяется целиком, поэтому func должна быть идемпотентной
+        до фиксации (все изменения выполняются внутри переданной сессии).
+        
+        Args:
+            func: Функция, принимающая сессию
+            read_only (bool): Сессия только для чтения
+            attempts (int): Максимальное количество попыток
+            
+        Returns:
+            Any: Результат func
+            
+        Raises:
+            DatabaseUnavailableError: Если БД известна как недоступная
+            QueryError: Если операция не удалась после всех попыток
+        """
+        def attempt():
+            with self.session_scope(read_only) as session:
+                return func(session)
+        
+        return retry_transient(attempt, is_transient_error, attempts=attempts)
+    
     def check_connection(self) -> Tuple[bool, str]:
         """
         Проверяет подключение к базе данных.
@@ -156,12 +572,15 @@ class DatabaseManager:
             tuple: (успех, сообщение)
         """
         try:
-            with self._engine.connect() as connection:
+            with self.engine.connect() as connection:
                 connection.execute(text("SELECT 1"))
                 connection.commit()
             logger.info("Подключение к БД успешно проверено")
             return True, "Успешное подключение к базе данных"
             
+        except DatabaseUnavailableError as e:
+            return False, str(e)
+            
         except OperationalError as e:
             logger.error(f"Ошибка подключения к БД: {e}")
             return False, f"Ошибка подключения к БД: {e}"
@@ -174,10 +593,57 @@ class DatabaseManager:
             logger.error(f"Неожиданная ошибка при проверке подключения: {e}")
             return False, f"Непредвиденная ошибка: {e}"
     
+    def stream_query(self, query: Union[str, Executable], params: Optional[dict] = None,
+                     chunk_size: int = STREAM_CHUNK_SIZE, read_only: bool = True) -> Iterator[Row]:
+        """
+        Выполняет запрос и построчно возвращает результат через серверный курсор.
+        
+        Соединение остается открытым, пока вызывающий код перебирает строки;
+        в памяти находится не больше одной порции. Запрос выполняется в
+        собственной сессии (new_session), поэтому сессия потока остается
+        доступной во время перебора. Курсор, транзакция и сессия освобождаются
+        по окончании перебора, при исключении и при досрочной остановке
+        (break или закрытие генератора).
+        
+        Args:
+            query: SQL-запрос в виде строки или выражение SQLAlchemy (select)
+            params (dict, optional): Параметры запроса
+            chunk_size (int): Количество строк, читаемых из курсора за раз
+            read_only (bool): Сессия только для чтения; может быть направлена на реплику
+            
+        Yields:
+            Row: Строки результата
+            
+        Raises:
+            QueryError: При ошибках выполнения запроса
+        """
+        statement = text(query) if isinstance(query, str) else query
+        session = self.new_session(read_only)
+        result = None
+        try:
+            result = session.execute(
+                statement, params or {},
+                execution_options={'stream_results': True, 'yield_per': chunk_size}
+            )
+            for partition in result.partitions():
+                yield from partition
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка потокового запроса: {e}")
+            raise QueryError(f"Ошибка выполнения запроса: {e}") from e
+        finally:
+            if result is not None:
+                result.close()
+            # Запрос только читает данные: транзакцию достаточно откатить
+            session.rollback()
+            session.close()
+    
     def execute_query(self, query: str, params: Optional[dict] = None, commit: bool = False) -> Any:
         """
         Выполняет SQL-запрос к базе данных.
         
+        Результат возвращается после закрытия сессии, поэтому для больших
+        выборок следует использовать stream_query.
+        
         Args:
             query (str): SQL-запрос
             params (dict, optional): Параметры запроса
@@ -200,30 +666,183 @@ class DatabaseManager:
                 raise QueryError(f"Ошибка выполнения запроса: {e}")
 
 
-# Создаем экземпляр менеджера БД
-db_manager = DatabaseManager(DATABASE_URL)
+class DatabaseRegistry:
+    """
+    Реестр БД объектов (отелей) сети.
+    
+    Менеджер каждого объекта создается при первом обращении, а его пул
+    соединений - при первом запросе. Пулы объектов, к которым долго не
+    обращались, закрываются фоновым потоком. Текущий объект выбирается
+    пользователем после входа; к нему обращаются get_db_session и
+    get_db_manager.
+    """
+    
+    def __init__(self, databases: Dict[str, str], default: str,
+                 replicas: Optional[Dict[str, str]] = None,
+                 idle_timeout: float = PROPERTY_IDLE_TIMEOUT):
+        """
+        Args:
+            databases: URL подключения по именам объектов
+            default: Объект по умолчанию (в его БД выполняется вход)
+            replicas: URL реплик по именам объектов
+            idle_timeout: Время простоя до закрытия пула (сек)
+        """
+        if default not in databases:
+            raise ValueError(f"Неизвестный объект по умолчанию: {default}")
+        self._databases = dict(databases)
+        self._replicas = dict(replicas or {})
+        self.default = default
+        self.idle_timeout = idle_timeout
+        self._current = default
+        self._managers: Dict[str, DatabaseManager] = {}
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[str], None]] = []
+        self._reaper: Optional[threading.Thread] = None
+    
+    def names(self) -> List[str]:
+        """Возвращает имена объектов сети."""
+        return list(self._databases)
+    
+    def get(self, name: str) -> DatabaseManager:
+        """
+        Возвращает менеджер БД объекта.
+        
+        Raises:
+            KeyError: Если объект не настроен
+        """
+        manager = self._managers.get(name)
+        if manager is None:
+            with self._lock:
+                manager = self._managers.get(name)
+                if manager is None:
+                    manager = DatabaseManager(self._databases[name], self._replicas.get(name))
+                    self._managers[name] = manager
+                    if len(self._managers) > 1:
+                        self._start_reaper()
+        return manager
+    
+    @property
+    def current_name(self) -> str:
+        """Имя текущего объекта."""
+        return self._current
+    
+    @property
+    def current(self) -> DatabaseManager:
+        """Менеджер БД текущего объекта."""
+        return self.get(self._current)
+    
+    def add_listener(self, listener: Callable[[str], None]):
+        """Подписывает обработчик на смену текущего объекта."""
+        self._listeners.append(listener)
+    
+    def select(self, name: str):
+        """
+        Делает объект текущим.
+        
+        Raises:
+            KeyError: Если объект не настроен
+        """
+        if name not in self._databases:
+            raise KeyError(f"Неизвестный объект: {name}")
+        if name == self._current:
+            return
+        self._current = name
+        logger.info(f"Текущий объект: {name}")
+        for listener in list(self._listeners):
+            listener(name)
+    
+    def dispose_idle(self):
+        """Закрывает пулы объектов, простаивающих дольше idle_timeout."""
+        now = time.monotonic()
+        for name, manager in list(self._managers.items()):
+            if name != self._current and now - manager.last_used > self.idle_timeout:
+                # Простой перепроверяется под блокировкой менеджера
+                manager.dispose(idle_for=self.idle_timeout)
+    
+    def _start_reaper(self):
+        if self._reaper is not None:
+            return
+        
+        def reap():
+            while True:
+                time.sleep(self.idle_timeout / 2)
+                try:
+                    self.dispose_idle()
+                except Exception as e:
+                    logger.error(f"Ошибка закрытия простаивающих пулов: {e}")
+        
+        self._reaper = threading.Thread(target=reap, name="DatabasePoolReaper", daemon=True)
+        self._reaper.start()
+    
+    def fan_out(self, func: Callable[[DatabaseManager], Any],
+                names: Optional[List[str]] = None) -> Dict[str, Tuple[bool, Any]]:
+        """
+        Параллельно выполняет func для БД нескольких объектов.
+        
+        Ошибка одного объекта не прерывает остальные.
+        
+        Args:
+            func: Функция, принимающая менеджер БД объекта
+            names: Объекты (по умолчанию все)
+            
+        Returns:
+            dict: По имени объекта (успех, результат или текст ошибки)
+        """
+        names = names or self.names()
+        
+        def call(name):
+            try:
+                return True, func(self.get(name))
+            except Exception as e:
+                logger.error(f"Ошибка запроса к объекту {name}: {e}")
+                return False, str(e)
+        
+        with ThreadPoolExecutor(max_workers=len(names), thread_name_prefix="PropertyFanOut") as pool:
+            return dict(zip(names, pool.map(call, names)))
+
+
+# Создаем реестр БД объектов сети
+db_registry = DatabaseRegistry(
+    PROPERTY_DATABASES, DEFAULT_PROPERTY,
+    replicas={DEFAULT_PROPERTY: DATABASE_REPLICA_URL} if DATABASE_REPLICA_URL else None
+)
+
+# Менеджер БД объекта по умолчанию
+db_manager = db_registry.get(DEFAULT_PROPERTY)
 
 # Создаем базовый класс для моделей
 Base = declarative_base()
 
+def get_db_manager() -> DatabaseManager:
+    """
+    Возвращает менеджер БД текущего объекта.
+    
+    Returns:
+        DatabaseManager: Менеджер БД
+    """
+    return db_registry.current
+
 # Функции для обратной совместимости
-def get_db_session() -> Session:
+def get_db_session(read_only: bool = False) -> Session:
     """
-    Получает сессию базы данных.
+    Получает сессию базы данных текущего объекта.
+    
+    Args:
+        read_only: Сессия только для чтения; может быть направлена на реплику
     
     Returns:
         Session: Объект сессии SQLAlchemy
     """
-    return db_manager.get_session()
+    return db_registry.current.get_session(read_only)
 
 def check_db_connection() -> Tuple[bool, str]:
     """
-    Проверяет подключение к базе данных.
+    Проверяет подключение к базе данных текущего объекта.
     
     Returns:
         tuple: (успех, сообщение)
     """
-    return db_manager.check_connection()
+    return db_registry.current.check_connection()
 
 
 if __name__ == "__main__":
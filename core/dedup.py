@@ -0,0 +1,334 @@
+"""
+Модуль поиска дублей профилей гостей.
+
+Попарное сравнение всех профилей невозможно уже на сотнях тысяч записей,
+поэтому сравниваются только профили с общим ключом блокировки: начало
+нормализованной фамилии (кириллица транслитерируется), дата рождения,
+последние цифры телефона, адрес электронной почты. Пары оцениваются по
+сходству Джаро-Винклера имен и совпадению контактов; блоки обрабатываются
+в пуле процессов. Результат - пары и группы дублей для проверки.
+
+Модуль не обращается к БД: профили подаются на вход.
+"""
+
+import logging
+import re
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from itertools import combinations
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Ключи блокировки
+SURNAME_PREFIX_LENGTH = 4
+PHONE_SUFFIX_LENGTH = 7
+
+# Блоки больше этого размера (однофамильцы, служебный телефон) не сравниваются
+# попарно: пары из них находятся по более избирательным ключам
+MAX_BLOCK_SIZE = 500
+
+# Порог оценки, начиная с которого пара попадает на проверку
+MATCH_THRESHOLD = 0.85
+
+# Веса признаков в оценке пары
+NAME_WEIGHT = 0.5
+BIRTH_DATE_WEIGHT = 0.2
+PHONE_WEIGHT = 0.15
+EMAIL_WEIGHT = 0.15
+
+# Количество профилей, начиная с которого используется пул процессов
+PARALLEL_MIN_PROFILES = 20000
+
+# Количество блоков в одном задании пула
+BLOCKS_PER_TASK = 2000
+
+_TRANSLIT = str.maketrans({
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'д': 'd', 'е': 'e', 'ё': 'e', 'ж': 'zh',
+    'з': 'z', 'и': 'i', 'й': 'i', 'к': 'k', 'л': 'l', 'м': 'm', 'н': 'n', 'о': 'o',
+    'п': 'p', 'р': 'r', 'с': 's', 'т': 't', 'у': 'u', 'ф': 'f', 'х': 'kh', 'ц': 'ts',
+    'ч': 'ch', 'ш': 'sh', 'щ': 'shch', 'ъ': '', 'ы': 'y', 'ь': '', 'э': 'e', 'ю': 'iu',
+    'я': 'ia',
+})
+_NON_LETTERS = re.compile(r'[^a-z]+')
+_NON_DIGITS = re.compile(r'\D+')
+
+
+class GuestProfile(NamedTuple):
+    """Профиль гостя."""
+    guest_id: int
+    surname: str
+    given_name: str = ''
+    birth_date: Optional[date] = None
+    phone: Optional[str] = None
+    email: Optional[str] = None
+
+
+class DuplicateCandidate(NamedTuple):
+    """Пара вероятных дублей для проверки."""
+    left_id: int
+    right_id: int
+    score: float
+    reasons: Tuple[str, ...]  # Совпавшие признаки
+
+
+class _Normalized(NamedTuple):
+    guest_id: int
+    surname: str
+    given_name: str
+    birth_date: Optional[date]
+    phone: str
+    email: str
+
+
+def normalize_name(value: Optional[str]) -> str:
+    """Приводит имя к латинице в нижнем регистре без диакритики и разделителей."""
+    if not value:
+        return ''
+    value = unicodedata.normalize('NFKD', value.lower().translate(_TRANSLIT))
+    return _NON_LETTERS.sub('', value.encode('ascii', 'ignore').decode())
+
+
+def _normalize(profile: GuestProfile) -> _Normalized:
+    return _Normalized(
+        profile.guest_id,
+        normalize_name(profile.surname),
+        normalize_name(profile.given_name),
+        profile.birth_date,
+        _NON_DIGITS.sub('', profile.phone or ''),
+        (profile.email or '').strip().lower(),
+    )
+
+
+def blocking_keys(profile: _Normalized) -> Tuple[Optional[str], ...]:
+    """
+    Ключи блокировки профиля в фиксированном порядке; None - ключа нет.
+
+    Порядок важен: пара оценивается только в блоке первого общего ключа.
+    """
+    return (
+        profile.surname[:SURNAME_PREFIX_LENGTH] or None,
+        profile.birth_date.isoformat() if profile.birth_date else None,
+        profile.phone[-PHONE_SUFFIX_LENGTH:] if len(profile.phone) >= PHONE_SUFFIX_LENGTH else None,
+        profile.email or None,
+    )
+
+
+def _jaro_winkler_python(a: str, b: str) -> float:
+    """Сходство Джаро-Винклера (0..1)."""
+    if a == b:
+        return 1.0 if a else 0.0
+    if not a or not b:
+        return 0.0
+    window = max(max(len(a), len(b)) // 2 - 1, 0)
+    matched_b = [False] * len(b)
+    matches_a = []
+    for i, char in enumerate(a):
+        for j in range(max(0, i - window), min(len(b), i + window + 1)):
+            if not matched_b[j] and b[j] == char:
+                matched_b[j] = True
+                matches_a.append(char)
+                break
+    if not matches_a:
+        return 0.0
+    matches_b = [char for char, matched in zip(b, matched_b) if matched]
+    transpositions = sum(x != y for x, y in zip(matches_a, matches_b)) / 2
+    m = len(matches_a)
+    jaro = (m / len(a) + m / len(b) + (m - transpositions) / m) / 3
+    prefix = 0
+    for x, y in zip(a[:4], b[:4]):
+        if x != y:
+            break
+        prefix += 1
+    return jaro + prefix * 0.1 * (1 - jaro)
+
+
+# rapidfuzz необязателен: с ним сравнение строк выполняется в C++
+try:
+    from rapidfuzz.distance import JaroWinkler as _JaroWinkler
+    jaro_winkler = _JaroWinkler.similarity
+except ImportError:
+    jaro_winkler = _jaro_winkler_python
+
+
+def score_pair(a: _Normalized, b: _Normalized) -> Tuple[float, Tuple[str, ...]]:
+    """
+    Оценивает сходство двух профилей.
+
+    Отсутствующие у одного из профилей признаки не учитываются: вес
+    распределяется между сравнимыми признаками.
+
+    Returns:
+        tuple: (оценка 0..1, совпавшие признаки)
+    """
+    total, weight = 0.0, 0.0
+    reasons = []
+
+    name = jaro_winkler(a.surname, b.surname)
+    if a.given_name and b.given_name:
+        name = 0.6 * name + 0.4 * jaro_winkler(a.given_name, b.given_name)
+    total += NAME_WEIGHT * name
+    weight += NAME_WEIGHT
+    if name >= 0.9:
+        reasons.append('name')
+
+    if a.birth_date and b.birth_date:
+        weight += BIRTH_DATE_WEIGHT
+        if a.birth_date == b.birth_date:
+            total += BIRTH_DATE_WEIGHT
+            reasons.append('birth_date')
+        elif (a.birth_date.year, a.birth_date.day, a.birth_date.month) == \
+                (b.birth_date.year, b.birth_date.month, b.birth_date.day):
+            # Перепутаны день и месяц
+            total += BIRTH_DATE_WEIGHT * 0.5
+    if len(a.phone) >= PHONE_SUFFIX_LENGTH and len(b.phone) >= PHONE_SUFFIX_LENGTH:
+        weight += PHONE_WEIGHT
+        if a.phone[-PHONE_SUFFIX_LENGTH:] == b.phone[-PHONE_SUFFIX_LENGTH:]:
+            total += PHONE_WEIGHT
+            reasons.append('phone')
+    if a.email and b.email:
+        weight += EMAIL_WEIGHT
+        if a.email == b.email:
+            total += EMAIL_WEIGHT
+            reasons.append('email')
+
+    # Совпадение одного имени без подтверждающих признаков не считается дублем
+    if weight == NAME_WEIGHT:
+        return total / weight * 0.8, tuple(reasons)
+    return total / weight, tuple(reasons)
+
+
+def _score_blocks(blocks: List[Tuple[int, List[_Normalized]]], threshold: float,
+                  skipped: FrozenSet[Tuple[int, str]] = frozenset()) -> List[DuplicateCandidate]:
+    """
+    Оценивает пары внутри блоков (выполняется в процессе пула).
+
+    Args:
+        blocks: Блоки (номер ключа, профили)
+        threshold: Минимальная оценка пары
+        skipped: Слишком большие блоки, пары из которых не оценивались
+    """
+    found = []
+    for key_index, members in blocks:
+        keys = {member.guest_id: blocking_keys(member) for member in members}
+        for a, b in combinations(members, 2):
+            keys_a, keys_b = keys[a.guest_id], keys[b.guest_id]
+            # Пара с общим более ранним ключом оценивается в его блоке
+            if any(keys_a[i] is not None and keys_a[i] == keys_b[i] and (i, keys_a[i]) not in skipped
+                   for i in range(key_index)):
+                continue
+            score, reasons = score_pair(a, b)
+            if score >= threshold:
+                left, right = sorted((a.guest_id, b.guest_id))
+                found.append(DuplicateCandidate(left, right, round(score, 4), reasons))
+    return found
+
+
+def _build_blocks(profiles: Sequence[_Normalized]) -> Tuple[List[Tuple[int, List[_Normalized]]],
+                                                             FrozenSet[Tuple[int, str]]]:
+    """
+    Группирует профили по ключам блокировки.
+
+    Returns:
+        tuple: (блоки для сравнения, ключи отброшенных слишком больших блоков)
+    """
+    index: Dict[Tuple[int, str], List[_Normalized]] = {}
+    for profile in profiles:
+        for key_index, key in enumerate(blocking_keys(profile)):
+            if key is not None:
+                index.setdefault((key_index, key), []).append(profile)
+
+    blocks, oversized = [], set()
+    for (key_index, key), members in index.items():
+        if len(members) < 2:
+            continue
+        if len(members) > MAX_BLOCK_SIZE:
+            oversized.add((key_index, key))
+            continue
+        blocks.append((key_index, members))
+    if oversized:
+        logger.info(f"Пропущено блоков больше {MAX_BLOCK_SIZE} профилей: {len(oversized)}")
+    return blocks, frozenset(oversized)
+
+
+def find_duplicates(profiles: Iterable[GuestProfile], threshold: float = MATCH_THRESHOLD,
+                    workers: Optional[int] = None) -> List[DuplicateCandidate]:
+    """
+    Находит вероятные дубли.
+
+    Args:
+        profiles: Профили гостей
+        threshold: Минимальная оценка пары
+        workers: Количество процессов; 0 - без пула, None - по числу ядер
+            для больших наборов
+
+    Returns:
+        list: Пары по убыванию оценки
+    """
+    started = time.perf_counter()
+    normalized = [_normalize(profile) for profile in profiles]
+    blocks, skipped = _build_blocks(normalized)
+    pairs = sum(len(members) * (len(members) - 1) // 2 for _, members in blocks)
+
+    if workers == 0 or (workers is None and len(normalized) < PARALLEL_MIN_PROFILES):
+        candidates = _score_blocks(blocks, threshold, skipped)
+    else:
+        # Крупные блоки первыми, чтобы задания были сопоставимы по объему
+        blocks.sort(key=lambda block: len(block[1]), reverse=True)
+        tasks = [blocks[i::max(len(blocks) // BLOCKS_PER_TASK, 1)]
+                 for i in range(max(len(blocks) // BLOCKS_PER_TASK, 1))]
+        candidates = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for found in executor.map(_score_blocks, tasks, [threshold] * len(tasks), [skipped] * len(tasks)):
+                candidates.extend(found)
+
+    candidates.sort(key=lambda candidate: (-candidate.score, candidate.left_id, candidate.right_id))
+    logger.info(f"Поиск дублей: {len(normalized)} профилей, {len(blocks)} блоков, "
+                f"{pairs} пар-кандидатов, найдено {len(candidates)}, "
+                f"{time.perf_counter() - started:.2f} с")
+    return candidates
+
+
+def group_duplicates(candidates: Iterable[DuplicateCandidate]) -> List[List[int]]:
+    """
+    Объединяет пары в группы дублей (связные компоненты).
+
+    Returns:
+        list: Группы ID профилей, в каждой группе ID по возрастанию
+    """
+    parent: Dict[int, int] = {}
+
+    def find(node: int) -> int:
+        parent.setdefault(node, node)
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for candidate in candidates:
+        left, right = find(candidate.left_id), find(candidate.right_id)
+        if left != right:
+            parent[max(left, right)] = min(left, right)
+
+    groups: Dict[int, List[int]] = {}
+    for node in parent:
+        groups.setdefault(find(node), []).append(node)
+    return sorted((sorted(group) for group in groups.values()), key=lambda group: group[0])
+
+
+def merge_profiles(survivor: GuestProfile, duplicates: Iterable[GuestProfile]) -> GuestProfile:
+    """
+    Формирует объединенный профиль: пустые поля основного профиля
+    заполняются из дублей в порядке передачи.
+    """
+    merged = survivor
+    for duplicate in duplicates:
+        merged = merged._replace(**{
+            field: getattr(duplicate, field)
+            for field in ('given_name', 'birth_date', 'phone', 'email')
+            if not getattr(merged, field) and getattr(duplicate, field)
+        })
+    return merged
@@ -0,0 +1,154 @@
+"""
+Модуль потоковой выгрузки отчетов.
+Читает данные серверным курсором порциями и пишет их в файл построчно,
+не загружая всю выборку в память.
+"""
+
+import csv
+import logging
+import os
+from contextlib import closing
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+
+from core.auth import has_permission
+from core.database import get_db_manager
+from core.models import User, Role
+from core.permissions import Permission
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Размер порции, читаемой из серверного курсора
+EXPORT_CHUNK_SIZE = 1000
+
+# Тип обратного вызова прогресса: (выгружено строк, всего строк)
+ProgressCallback = Callable[[int, int], None]
+
+
+class ExportCancelled(Exception):
+    """Исключение, возникающее при отмене выгрузки пользователем."""
+    pass
+
+
+class CsvWriter:
+    """Построчная запись в CSV."""
+
+    def __init__(self, path: str):
+        self._file = open(path, 'w', newline='', encoding='utf-8-sig')
+        self._writer = csv.writer(self._file, delimiter=';')
+
+    def write_row(self, row: Sequence):
+        self._writer.writerow(row)
+
+    def close(self):
+        self._file.close()
+
+
+class XlsxWriter:
+    """Построчная запись в XLSX в режиме write_only (требует openpyxl)."""
+
+    def __init__(self, path: str):
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise RuntimeError("Для выгрузки в XLSX установите пакет openpyxl")
+        self._path = path
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet()
+
+    def write_row(self, row: Sequence):
+        self._sheet.append(list(row))
+
+    def close(self):
+        self._workbook.save(self._path)
+
+
+def _open_writer(path: str):
+    """Выбирает формат записи по расширению файла."""
+    if path.lower().endswith('.xlsx'):
+        return XlsxWriter(path)
+    return CsvWriter(path)
+
+
+def _stream_to_file(path: str, header: List[str], rows: Iterable[Sequence], total: int,
+                    progress: Optional[ProgressCallback],
+                    is_cancelled: Optional[Callable[[], bool]]) -> int:
+    """Записывает поток строк в файл, сообщая о прогрессе после каждой порции."""
+    writer = _open_writer(path)
+    written = 0
+    try:
+        writer.write_row(header)
+        for row in rows:
+            writer.write_row(row)
+            written += 1
+            if written % EXPORT_CHUNK_SIZE == 0:
+                if is_cancelled and is_cancelled():
+                    raise ExportCancelled()
+                if progress:
+                    progress(written, total)
+    finally:
+        writer.close()
+    if progress:
+        progress(written, total)
+    return written
+
+
+def export_users(path: str, progress: Optional[ProgressCallback] = None,
+                 is_cancelled: Optional[Callable[[], bool]] = None,
+                 access_token: str = None) -> Tuple[bool, str, int]:
+    """
+    Выгружает список пользователей в CSV или XLSX.
+
+    Args:
+        path: Путь к файлу (.csv или .xlsx)
+        progress: Обратный вызов прогресса
+        is_cancelled: Функция, возвращающая True при запросе отмены
+        access_token: Токен пользователя (нужно право users.export)
+
+    Returns:
+        tuple: (успех, сообщение, количество выгруженных строк)
+    """
+    if not has_permission(access_token, Permission.USERS_EXPORT):
+        return False, "Недостаточно прав для выполнения операции", 0
+
+    db_manager = get_db_manager()
+    try:
+        with db_manager.session_scope(read_only=True) as session:
+            total = session.query(func.count(User.user_id)).scalar()
+
+        query = (
+            select(
+                User.user_id, User.login, Role.role_name,
+                User.is_blocked, User.failed_attempts, User.last_login
+            )
+            .outerjoin(Role, Role.role_id == User.role_id)
+            .order_by(User.user_id)
+        )
+        header = ["ID", "Логин", "Роль", "Статус", "Попытки входа", "Последний вход"]
+        # closing освобождает курсор и соединение сразу и при отмене выгрузки
+        with closing(db_manager.stream_query(query, chunk_size=EXPORT_CHUNK_SIZE)) as stream:
+            rows = (
+                (
+                    user_id, login, role_name.value if role_name else "Неизвестно",
+                    "Заблокирован" if is_blocked else "Активен",
+                    failed_attempts, last_login.isoformat(sep=' ') if last_login else ""
+                )
+                for user_id, login, role_name, is_blocked, failed_attempts, last_login in stream
+            )
+            written = _stream_to_file(path, header, rows, total, progress, is_cancelled)
+
+        logger.info(f"Выгружено пользователей: {written} в {path}")
+        return True, f"Выгружено записей: {written}", written
+
+    except ExportCancelled:
+        # Не оставляем недописанный файл
+        if os.path.exists(path):
+            os.remove(path)
+        logger.info(f"Выгрузка в {path} отменена пользователем")
+        return False, "Выгрузка отменена", 0
+
+    except Exception as e:
+        logger.error(f"Ошибка выгрузки пользователей: {e}")
+        return False, f"Ошибка выгрузки: {str(e)}", 0
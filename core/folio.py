@@ -0,0 +1,584 @@
+"""
+Модуль счетов проживания (фолио).
+
+Проводки (начисления за проживание, услуги, налоги, оплаты) хранятся в
+таблице folio_line только на добавление; ошибочная проводка исправляется
+сторнирующей. Итоги счета поддерживает триггер уровня оператора в
+folio_balance: одна строка на счет, обновляемая один раз на INSERT, поэтому
+баланс для стойки регистрации читается по первичному ключу без суммирования.
+
+Суммы - только Decimal с точностью до копейки; float не принимается.
+Пакетные проводки записываются многострочным INSERT, а начисление за
+проживание по всем открытым счетам - одним INSERT ... SELECT на сервере.
+"""
+
+import logging
+from datetime import date
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from sqlalchemy import insert, select, text, BigInteger, any_, literal, ARRAY
+from sqlalchemy.exc import IntegrityError
+
+from config import FOLIO_ROOM_TAX_RATE
+from core.auth import has_permission, verify_access_token, UNIQUE_VIOLATION, FOREIGN_KEY_VIOLATION
+from core.database import get_db_session
+from core.models import Folio, FolioLine, FolioBalance
+from core.permissions import Permission
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Статусы счета
+FOLIO_OPEN = 'open'
+FOLIO_CLOSED = 'closed'
+
+# Типы проводок: знак суммы в журнале и название для отображения. Корректировка
+# может быть любого знака, остальные суммы передаются положительными; оплаты
+# учитываются в payments_total, остальное - в charges_total.
+LINE_TYPES = {
+    'room': (1, "Проживание"),
+    'room_tax': (1, "Налог на проживание"),
+    'extra': (1, "Дополнительные услуги"),
+    'tax': (1, "Налог"),
+    'payment': (-1, "Оплата"),
+    'adjustment': (1, "Корректировка"),
+}
+
+# Максимальное количество строк в одном многострочном INSERT
+FOLIO_BATCH_SIZE = 1000
+
+# SQLSTATE ошибки триггера при проводке по закрытому счету
+FOLIO_CLOSED_ERROR = 'HF001'
+
+CENT = Decimal('0.01')
+
+# Схема фолио (применяется миграцией 0003_folio, см. core.migrations). Таблицы
+# соответствуют core.models; триггеры запрещают UPDATE и DELETE проводок,
+# поддерживают итоги и не дают проводить по закрытому счету.
+FOLIO_SCHEMA_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS folio (
+        folio_id BIGSERIAL PRIMARY KEY,
+        booking_ref VARCHAR(32),
+        guest_name VARCHAR(100) NOT NULL,
+        room_number VARCHAR(10),
+        room_rate NUMERIC(12, 2),
+        status VARCHAR(16) NOT NULL DEFAULT 'open',
+        notes TEXT,
+        opened_at TIMESTAMP NOT NULL DEFAULT now(),
+        closed_at TIMESTAMP
+    )
+    """,
+    """
+    ALTER TABLE folio ADD COLUMN IF NOT EXISTS notes TEXT
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_folio_open ON folio (folio_id) WHERE status = 'open'
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS folio_line (
+        line_id BIGSERIAL PRIMARY KEY,
+        folio_id BIGINT NOT NULL REFERENCES folio (folio_id) ON DELETE RESTRICT,
+        business_date DATE NOT NULL,
+        line_type VARCHAR(16) NOT NULL,
+        description VARCHAR(255),
+        amount NUMERIC(12, 2) NOT NULL,
+        posted_at TIMESTAMP NOT NULL DEFAULT now(),
+        posted_by INTEGER,
+        reverses_line_id BIGINT REFERENCES folio_line (line_id)
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_folio_line_folio ON folio_line (folio_id, line_id)
+    """,
+    # Начисление за проживание - не больше одного на счет и дату (повторный ночной аудит)
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS ux_folio_line_room_charge
+        ON folio_line (folio_id, business_date, line_type)
+        WHERE line_type IN ('room', 'room_tax') AND reverses_line_id IS NULL
+    """,
+    # Проводку можно сторнировать только один раз
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS ux_folio_line_reversal
+        ON folio_line (reverses_line_id) WHERE reverses_line_id IS NOT NULL
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS folio_balance (
+        folio_id BIGINT PRIMARY KEY REFERENCES folio (folio_id) ON DELETE RESTRICT,
+        balance NUMERIC(14, 2) NOT NULL DEFAULT 0,
+        charges_total NUMERIC(14, 2) NOT NULL DEFAULT 0,
+        payments_total NUMERIC(14, 2) NOT NULL DEFAULT 0,
+        line_count INTEGER NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP NOT NULL DEFAULT now()
+    )
+    """,
+    """
+    CREATE OR REPLACE FUNCTION folio_line_append_only() RETURNS trigger AS $$
+    BEGIN
+        RAISE EXCEPTION 'folio_line is append-only';
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    DO $$ BEGIN
+        CREATE TRIGGER folio_line_append_only
+            BEFORE UPDATE OR DELETE ON folio_line
+            FOR EACH ROW EXECUTE FUNCTION folio_line_append_only();
+    EXCEPTION WHEN duplicate_object THEN NULL;
+    END $$
+    """,
+    # Итоги обновляются один раз на оператор: строки счета блокируются по
+    # возрастанию folio_id, чтобы параллельные пакетные проводки не взаимоблокировались.
+    # Статус проверяется после блокировки итогов, которую берет и закрытие счета.
+    """
+    CREATE OR REPLACE FUNCTION folio_balance_apply() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO folio_balance AS b (folio_id, balance, charges_total, payments_total, line_count, updated_at)
+        SELECT folio_id,
+               sum(amount),
+               coalesce(sum(amount) FILTER (WHERE line_type <> 'payment'), 0),
+               coalesce(-sum(amount) FILTER (WHERE line_type = 'payment'), 0),
+               count(*),
+               now()
+          FROM new_lines
+         GROUP BY folio_id
+         ORDER BY folio_id
+        ON CONFLICT (folio_id) DO UPDATE
+           SET balance = b.balance + EXCLUDED.balance,
+               charges_total = b.charges_total + EXCLUDED.charges_total,
+               payments_total = b.payments_total + EXCLUDED.payments_total,
+               line_count = b.line_count + EXCLUDED.line_count,
+               updated_at = EXCLUDED.updated_at;
+
+        IF EXISTS (SELECT 1 FROM new_lines n JOIN folio f USING (folio_id) WHERE f.status <> 'open') THEN
+            RAISE EXCEPTION 'folio is closed' USING ERRCODE = 'HF001';
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    DO $$ BEGIN
+        CREATE TRIGGER folio_balance_apply
+            AFTER INSERT ON folio_line
+            REFERENCING NEW TABLE AS new_lines
+            FOR EACH STATEMENT EXECUTE FUNCTION folio_balance_apply();
+    EXCEPTION WHEN duplicate_object THEN NULL;
+    END $$
+    """,
+]
+
+# Начисление за проживание и налога по всем открытым счетам с тарифом одним оператором.
+# Повторный запуск за ту же дату ничего не добавляет (ux_folio_line_room_charge).
+ROOM_CHARGE_SQL = """
+    INSERT INTO folio_line (folio_id, business_date, line_type, description, amount, posted_by)
+    SELECT f.folio_id, CAST(:business_date AS DATE), c.line_type, c.description, c.amount,
+           CAST(:posted_by AS INTEGER)
+      FROM folio f
+     CROSS JOIN LATERAL (VALUES
+            ('room', 'Проживание', f.room_rate),
+            ('room_tax', 'Налог на проживание', round(f.room_rate * CAST(:tax_rate AS NUMERIC), 2))
+          ) AS c (line_type, description, amount)
+     WHERE f.status = 'open'
+       AND f.room_rate IS NOT NULL
+       AND c.amount <> 0
+     ORDER BY f.folio_id
+    ON CONFLICT (folio_id, business_date, line_type)
+        WHERE line_type IN ('room', 'room_tax') AND reverses_line_id IS NULL
+        DO NOTHING
+"""
+
+AmountLike = Union[Decimal, int, str]
+
+
+class Posting(NamedTuple):
+    """Проводка для пакетной записи."""
+    folio_id: int
+    line_type: str
+    amount: AmountLike
+    description: Optional[str] = None
+    business_date: Optional[date] = None
+
+
+class FolioTotals(NamedTuple):
+    """Итоги счета."""
+    folio_id: int
+    balance: Decimal
+    charges_total: Decimal
+    payments_total: Decimal
+    line_count: int
+
+
+def to_amount(value: AmountLike) -> Decimal:
+    """
+    Приводит сумму к Decimal с точностью до копейки.
+
+    Raises:
+        ValueError: Если значение не является точной суммой (в том числе float)
+    """
+    if isinstance(value, float) or isinstance(value, bool):
+        raise ValueError("Сумма должна быть Decimal, целым числом или строкой")
+    try:
+        amount = Decimal(value)
+    except (InvalidOperation, TypeError):
+        raise ValueError(f"Некорректная сумма: {value!r}")
+    if not amount.is_finite():
+        raise ValueError(f"Некорректная сумма: {value!r}")
+    return amount.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def to_amount_rate(value: AmountLike) -> Decimal:
+    """Приводит ставку налога к Decimal (без округления до копейки)."""
+    if isinstance(value, float) or isinstance(value, bool):
+        raise ValueError("Ставка должна быть Decimal, целым числом или строкой")
+    try:
+        return Decimal(value)
+    except (InvalidOperation, TypeError):
+        raise ValueError(f"Некорректная ставка: {value!r}")
+
+
+def _user_id(access_token: str) -> Optional[int]:
+    valid, _, token_data = verify_access_token(access_token)
+    return token_data['user_id'] if valid else None
+
+
+def _pgcode(error: Exception) -> Optional[str]:
+    return getattr(getattr(error, 'orig', None), 'pgcode', None)
+
+
+def _line_row(posting: Posting, posted_by: Optional[int]) -> Dict:
+    """
+    Проверяет проводку и формирует строку folio_line.
+
+    Raises:
+        ValueError: При неизвестном типе или недопустимой сумме
+    """
+    if posting.line_type not in LINE_TYPES:
+        raise ValueError(f"Неизвестный тип проводки: {posting.line_type}")
+    sign, label = LINE_TYPES[posting.line_type]
+    amount = to_amount(posting.amount)
+    if posting.line_type != 'adjustment' and amount <= 0:
+        raise ValueError(f"Сумма проводки должна быть положительной: {amount}")
+    return {
+        'folio_id': posting.folio_id,
+        'business_date': posting.business_date or date.today(),
+        'line_type': posting.line_type,
+        'description': (posting.description or label)[:255],
+        'amount': sign * amount,
+        'posted_by': posted_by,
+    }
+
+
+def _post_error(error: Exception, action: str) -> str:
+    code = _pgcode(error)
+    if code == FOLIO_CLOSED_ERROR:
+        return "Счет закрыт"
+    if code == FOREIGN_KEY_VIOLATION:
+        return "Счет не найден"
+    return f"Ошибка при {action}: {str(error)}"
+
+
+def open_folio(guest_name: str, access_token: str, booking_ref: Optional[str] = None,
+               room_number: Optional[str] = None, room_rate: Optional[AmountLike] = None,
+               notes: Optional[str] = None) -> Tuple[bool, str, Optional[int]]:
+    """
+    Открывает счет с нулевыми итогами.
+
+    Returns:
+        tuple: (успех, сообщение, ID счета)
+    """
+    if not has_permission(access_token, Permission.FOLIO_POST):
+        return False, "Недостаточно прав для выполнения операции", None
+    try:
+        rate = to_amount(room_rate) if room_rate is not None else None
+    except ValueError as e:
+        return False, str(e), None
+
+    session = get_db_session()
+    try:
+        folio = Folio(guest_name=guest_name, booking_ref=booking_ref, room_number=room_number,
+                      room_rate=rate, notes=notes, status=FOLIO_OPEN)
+        session.add(folio)
+        session.flush()
+        session.add(FolioBalance(folio_id=folio.folio_id, balance=0, charges_total=0,
+                                 payments_total=0, line_count=0))
+        session.commit()
+        return True, "Счет открыт", folio.folio_id
+
+    except Exception as e:
+        session.rollback()
+        return False, f"Ошибка при открытии счета: {str(e)}", None
+
+    finally:
+        session.close()
+
+
+def post_lines(postings: Iterable[Posting], access_token: str) -> Tuple[bool, str, int]:
+    """
+    Записывает проводки многострочными INSERT в одной транзакции.
+
+    Итоги каждого затронутого счета обновляются триггером один раз на
+    INSERT. Проводка на тысячу счетов - один запрос к БД.
+
+    Args:
+        postings: Проводки
+        access_token: Токен пользователя
+
+    Returns:
+        tuple: (успех, сообщение, количество записанных проводок)
+    """
+    if not has_permission(access_token, Permission.FOLIO_POST):
+        return False, "Недостаточно прав для выполнения операции", 0
+
+    posted_by = _user_id(access_token)
+    try:
+        rows = [_line_row(posting, posted_by) for posting in postings]
+    except ValueError as e:
+        return False, str(e), 0
+    if not rows:
+        return False, "Нет проводок", 0
+
+    session = get_db_session()
+    try:
+        for start in range(0, len(rows), FOLIO_BATCH_SIZE):
+            session.execute(insert(FolioLine.__table__).values(rows[start:start + FOLIO_BATCH_SIZE]))
+        session.commit()
+        return True, f"Записано проводок: {len(rows)}", len(rows)
+
+    except Exception as e:
+        session.rollback()
+        return False, _post_error(e, "записи проводок"), 0
+
+    finally:
+        session.close()
+
+
+def post_line(folio_id: int, line_type: str, amount: AmountLike, access_token: str,
+              description: Optional[str] = None) -> Tuple[bool, str]:
+    """Записывает одну проводку. Returns: (успех, сообщение)."""
+    success, message, _ = post_lines([Posting(folio_id, line_type, amount, description)], access_token)
+    return success, message
+
+
+def post_room_charges(access_token: str, business_date: Optional[date] = None,
+                      tax_rate: Optional[AmountLike] = None) -> Tuple[bool, str, int]:
+    """
+    Начисляет проживание и налог по всем открытым счетам с тарифом.
+
+    Выполняется одним оператором на сервере; повторный вызов за ту же
+    дату ничего не добавляет.
+
+    Returns:
+        tuple: (успех, сообщение, количество записанных проводок)
+    """
+    if not has_permission(access_token, Permission.FOLIO_POST):
+        return False, "Недостаточно прав для выполнения операции", 0
+
+    session = get_db_session()
+    try:
+        posted = post_room_charges_in(session, business_date, tax_rate, _user_id(access_token))
+        session.commit()
+        return True, f"Начислено проводок: {posted}", posted
+
+    except Exception as e:
+        session.rollback()
+        return False, _post_error(e, "начислении за проживание"), 0
+
+    finally:
+        session.close()
+
+
+def post_room_charges_in(session, business_date: Optional[date] = None,
+                         tax_rate: Optional[AmountLike] = None, posted_by: Optional[int] = None) -> int:
+    """
+    Начисляет проживание в переданной сессии (используется ночным аудитом).
+
+    Returns:
+        int: Количество записанных проводок
+    """
+    result = session.execute(text(ROOM_CHARGE_SQL), {
+        'business_date': business_date or date.today(),
+        'tax_rate': str(to_amount_rate(FOLIO_ROOM_TAX_RATE if tax_rate is None else tax_rate)),
+        'posted_by': posted_by,
+    })
+    return result.rowcount
+
+
+def reverse_line(line_id: int, access_token: str, reason: Optional[str] = None) -> Tuple[bool, str]:
+    """
+    Сторнирует проводку: добавляет проводку с обратной суммой.
+
+    Returns:
+        tuple: (успех, сообщение)
+    """
+    if not has_permission(access_token, Permission.FOLIO_POST):
+        return False, "Недостаточно прав для выполнения операции"
+
+    session = get_db_session()
+    try:
+        reversal = session.execute(text("""
+            INSERT INTO folio_line (folio_id, business_date, line_type, description, amount,
+                                    posted_by, reverses_line_id)
+            SELECT folio_id, CURRENT_DATE, line_type, :description, -amount, CAST(:posted_by AS INTEGER), line_id
+              FROM folio_line
+             WHERE line_id = :line_id AND reverses_line_id IS NULL
+            RETURNING line_id
+        """), {
+            'line_id': line_id,
+            'description': (reason or f"Сторно проводки {line_id}")[:255],
+            'posted_by': _user_id(access_token),
+        }).scalar()
+        if reversal is None:
+            session.rollback()
+            return False, "Проводка не найдена или сама является сторнирующей"
+        session.commit()
+        return True, "Проводка сторнирована"
+
+    except IntegrityError as e:
+        session.rollback()
+        if _pgcode(e) == UNIQUE_VIOLATION:
+            return False, "Проводка уже сторнирована"
+        return False, _post_error(e, "сторнировании")
+
+    except Exception as e:
+        session.rollback()
+        return False, _post_error(e, "сторнировании")
+
+    finally:
+        session.close()
+
+
+def close_folio(folio_id: int, access_token: str) -> Tuple[bool, str]:
+    """
+    Закрывает счет с нулевым балансом.
+
+    Строка итогов блокируется так же, как при проводке, поэтому счет не
+    закроется одновременно с записью новой проводки.
+
+    Returns:
+        tuple: (успех, сообщение)
+    """
+    if not has_permission(access_token, Permission.FOLIO_POST):
+        return False, "Недостаточно прав для выполнения операции"
+
+    session = get_db_session()
+    try:
+        balance = session.execute(
+            select(FolioBalance.balance).where(FolioBalance.folio_id == folio_id).with_for_update()
+        ).scalar()
+        if balance is None:
+            return False, "Счет не найден"
+        if balance != 0:
+            return False, f"Баланс счета не нулевой: {balance}"
+        closed = session.execute(text("""
+            UPDATE folio SET status = :closed, closed_at = now()
+             WHERE folio_id = :folio_id AND status = :open
+        """), {'folio_id': folio_id, 'closed': FOLIO_CLOSED, 'open': FOLIO_OPEN}).rowcount
+        session.commit()
+        return (True, "Счет закрыт") if closed else (False, "Счет уже закрыт")
+
+    except Exception as e:
+        session.rollback()
+        return False, f"Ошибка при закрытии счета: {str(e)}"
+
+    finally:
+        session.close()
+
+
+def update_notes(folio_id: int, notes: Optional[str], access_token: str) -> Tuple[bool, str]:
+    """
+    Изменяет заметки стойки регистрации по счету.
+
+    Returns:
+        tuple: (успех, сообщение)
+    """
+    if not has_permission(access_token, Permission.FOLIO_POST):
+        return False, "Недостаточно прав для выполнения операции"
+
+    session = get_db_session()
+    try:
+        updated = session.execute(
+            text("UPDATE folio SET notes = :notes WHERE folio_id = :folio_id"),
+            {'folio_id': folio_id, 'notes': notes or None}
+        ).rowcount
+        session.commit()
+        return (True, "Заметки сохранены") if updated else (False, "Счет не найден")
+
+    except Exception as e:
+        session.rollback()
+        return False, f"Ошибка при сохранении заметок: {str(e)}"
+
+    finally:
+        session.close()
+
+
+def get_balances(folio_ids: Iterable[int], access_token: str) -> Tuple[bool, str, Dict[int, FolioTotals]]:
+    """
+    Возвращает итоги счетов по первичному ключу folio_balance.
+
+    Returns:
+        tuple: (успех, сообщение, итоги по ID счета)
+    """
+    if not has_permission(access_token, Permission.FOLIO_VIEW):
+        return False, "Недостаточно прав для выполнения операции", {}
+
+    folio_ids = sorted(set(folio_ids))
+    if not folio_ids:
+        return True, "", {}
+
+    session = get_db_session(read_only=True)
+    try:
+        rows = session.execute(
+            select(FolioBalance.folio_id, FolioBalance.balance, FolioBalance.charges_total,
+                   FolioBalance.payments_total, FolioBalance.line_count)
+            .where(FolioBalance.folio_id == any_(literal(folio_ids, ARRAY(BigInteger))))
+        ).all()
+        return True, "", {row.folio_id: FolioTotals(*row) for row in rows}
+
+    except Exception as e:
+        return False, f"Ошибка при получении баланса: {str(e)}", {}
+
+    finally:
+        session.close()
+
+
+def get_balance(folio_id: int, access_token: str) -> Tuple[bool, str, Optional[FolioTotals]]:
+    """
+    Возвращает итоги одного счета.
+
+    Returns:
+        tuple: (успех, сообщение, итоги или None)
+    """
+    success, message, totals = get_balances([folio_id], access_token)
+    if success and folio_id not in totals:
+        return False, "Счет не найден", None
+    return success, message, totals.get(folio_id)
+
+
+def list_lines(folio_id: int, access_token: str) -> Tuple[bool, str, List[Dict]]:
+    """
+    Возвращает проводки счета в порядке записи.
+
+    Returns:
+        tuple: (успех, сообщение, список проводок)
+    """
+    if not has_permission(access_token, Permission.FOLIO_VIEW):
+        return False, "Недостаточно прав для выполнения операции", []
+
+    session = get_db_session(read_only=True)
+    try:
+        rows = session.execute(
+            select(FolioLine.line_id, FolioLine.business_date, FolioLine.line_type,
+                   FolioLine.description, FolioLine.amount, FolioLine.posted_at,
+                   FolioLine.reverses_line_id)
+            .where(FolioLine.folio_id == folio_id)
+            .order_by(FolioLine.line_id)
+        ).all()
+        return True, "", [row._asdict() for row in rows]
+
+    except Exception as e:
+        return False, f"Ошибка при получении проводок: {str(e)}", []
+
+    finally:
+        session.close()
@@ -0,0 +1,271 @@
+"""
+Модуль прогноза загрузки по типам номеров.
+
+По истории бронирований строится матрица набора (pickup): строка - число
+дней до даты проживания, столбец - дата проживания, значение - число
+номеров, забронированных на эту дату к этому моменту (on the books).
+Прогноз на горизонт строится по кривым добора, усредненным по прошедшим
+датам с разбивкой по дням недели; все вычисления векторизованы в NumPy.
+
+Прогнозы кэшируются по (тип номера, дата расчета). Новые бронирования
+добавляются в матрицу на месте, а из кэша удаляются только прогнозы,
+которые они затрагивают.
+"""
+
+import logging
+import threading
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Максимальная глубина бронирования, учитываемая в матрице (дней)
+MAX_LEAD_DAYS = 365
+
+# Горизонт прогноза (дней)
+FORECAST_HORIZON_DAYS = 90
+
+# Глубина истории для кривых добора (дней)
+HISTORY_DAYS = 365
+
+
+class BookingRecord(NamedTuple):
+    """Бронирование для построения матрицы набора."""
+    room_type: str
+    booked_on: date
+    arrival: date
+    departure: date
+    cancelled_on: Optional[date] = None
+    rooms: int = 1
+
+
+class Forecast(NamedTuple):
+    """Прогноз загрузки типа номеров."""
+    room_type: str
+    as_of: date
+    stay_dates: List[date]
+    on_the_books: np.ndarray  # Забронировано на дату расчета
+    expected: np.ndarray  # Ожидаемое число занятых номеров
+    occupancy: np.ndarray  # Ожидаемая загрузка, доля от вместимости
+
+
+class PickupMatrix:
+    """
+    Матрица набора одного типа номеров.
+
+    Attributes:
+        origin: Дата проживания, соответствующая столбцу 0
+        otb: Массив (MAX_LEAD_DAYS + 1) x дней, забронировано за d дней до даты
+    """
+
+    def __init__(self, origin: date, days: int):
+        self.origin = origin
+        self.otb = np.zeros((MAX_LEAD_DAYS + 1, days), dtype=np.int32)
+
+    @classmethod
+    def build(cls, records: List[BookingRecord], origin: date, days: int) -> 'PickupMatrix':
+        """
+        Строит матрицу по списку бронирований.
+
+        Каждое бронирование дает +1 в ячейку (глубина бронирования, дата) для
+        каждой ночи и -1 в ячейку (глубина отмены, дата); сумма с накоплением
+        от больших глубин к меньшим дает число бронирований на руках.
+        """
+        matrix = cls(origin, days)
+        if not records:
+            return matrix
+        base = origin.toordinal()
+        arrival = np.array([r.arrival.toordinal() for r in records]) - base
+        nights = np.array([(r.departure - r.arrival).days for r in records])
+        booked = np.array([r.booked_on.toordinal() for r in records]) - base
+        cancelled = np.array([
+            r.cancelled_on.toordinal() - base if r.cancelled_on else np.iinfo(np.int32).max
+            for r in records
+        ])
+        rooms = np.array([r.rooms for r in records])
+
+        # Разворачиваем бронирования в ночи: индекс бронирования и дата проживания
+        owner = np.repeat(np.arange(len(records)), nights)
+        offsets = np.arange(len(owner)) - np.repeat(np.cumsum(nights) - nights, nights)
+        stay = arrival[owner] + offsets
+        inside = (stay >= 0) & (stay < days)
+        owner, stay = owner[inside], stay[inside]
+
+        increments = np.zeros((MAX_LEAD_DAYS + 1, days), dtype=np.int32)
+        lead = np.clip(stay - booked[owner], 0, MAX_LEAD_DAYS)
+        np.add.at(increments, (lead, stay), rooms[owner])
+        was_cancelled = cancelled[owner] <= stay
+        # Отмена за d дней до даты: бронирование на руках только на глубинах больше d
+        cancel_lead = np.clip(stay - cancelled[owner], 0, MAX_LEAD_DAYS)[was_cancelled]
+        np.add.at(increments, (cancel_lead, stay[was_cancelled]), -rooms[owner][was_cancelled])
+        matrix.otb[:] = np.cumsum(increments[::-1], axis=0)[::-1]
+        return matrix
+
+    def column(self, day: date) -> int:
+        return (day - self.origin).days
+
+    def ensure(self, last_day: date):
+        """Расширяет матрицу до даты last_day включительно."""
+        needed = self.column(last_day) + 1
+        if needed > self.otb.shape[1]:
+            extra = max(needed - self.otb.shape[1], FORECAST_HORIZON_DAYS)
+            self.otb = np.pad(self.otb, ((0, 0), (0, extra)))
+
+    def add(self, record: BookingRecord, sign: int = 1):
+        """Добавляет (sign=-1 - вычитает) одно бронирование в матрице на месте."""
+        self.ensure(record.departure)
+        first = max(self.column(record.arrival), 0)
+        last = self.column(record.departure)
+        if last <= first:
+            return
+        stay = np.arange(first, last)
+        stay_ordinals = stay + self.origin.toordinal()
+        lead = np.clip(stay_ordinals - record.booked_on.toordinal(), 0, MAX_LEAD_DAYS)
+        on_books = np.arange(MAX_LEAD_DAYS + 1)[:, None] <= lead[None, :]
+        if record.cancelled_on is not None:
+            cancel_lead = stay_ordinals - record.cancelled_on.toordinal()
+            on_books &= np.arange(MAX_LEAD_DAYS + 1)[:, None] > cancel_lead[None, :]
+        self.otb[:, first:last] += on_books.astype(np.int32) * (record.rooms * sign)
+
+    def rebased(self, origin: date) -> 'PickupMatrix':
+        """Копия матрицы с началом на более ранней дате."""
+        shift = (self.origin - origin).days
+        matrix = PickupMatrix(origin, self.otb.shape[1] + shift)
+        matrix.otb[:, shift:] = self.otb
+        return matrix
+
+    def pickup_curves(self, as_of: date, history_days: int = HISTORY_DAYS) -> np.ndarray:
+        """
+        Средний добор по дням недели.
+
+        Returns:
+            np.ndarray: Массив 7 x (MAX_LEAD_DAYS + 1): средний добор от глубины d до даты
+        """
+        end = min(self.column(as_of), self.otb.shape[1])
+        start = max(end - history_days, 0)
+        curves = np.zeros((7, MAX_LEAD_DAYS + 1))
+        if end <= start:
+            return curves
+        history = self.otb[:, start:end]
+        pickup = history[0][None, :] - history  # добор от глубины d до дня проживания
+        weekdays = (np.arange(start, end) + self.origin.weekday()) % 7
+        for weekday in range(7):
+            mask = weekdays == weekday
+            if mask.any():
+                curves[weekday] = pickup[:, mask].mean(axis=1)
+        return curves
+
+
+class OccupancyForecaster:
+    """
+    Прогноз загрузки по типам номеров с кэшем по (тип номера, дата расчета).
+
+    Attributes:
+        capacity: Количество номеров по типам
+    """
+
+    def __init__(self, capacity: Dict[str, int], records: Iterable[BookingRecord] = (),
+                 horizon_days: int = FORECAST_HORIZON_DAYS):
+        self.capacity = dict(capacity)
+        self.horizon_days = horizon_days
+        self._lock = threading.Lock()
+        self._matrices: Dict[str, PickupMatrix] = {}
+        self._cache: Dict[Tuple[str, date], Forecast] = {}
+
+        by_type: Dict[str, List[BookingRecord]] = {}
+        for record in records:
+            by_type.setdefault(record.room_type, []).append(record)
+        for room_type, items in by_type.items():
+            origin = min(r.arrival for r in items)
+            days = (max(r.departure for r in items) - origin).days + horizon_days
+            self._matrices[room_type] = PickupMatrix.build(items, origin, days)
+
+    def _matrix_for(self, record: BookingRecord) -> PickupMatrix:
+        matrix = self._matrices.get(record.room_type)
+        if matrix is None:
+            matrix = PickupMatrix(record.arrival, self.horizon_days)
+        elif record.arrival < matrix.origin:
+            matrix = matrix.rebased(record.arrival)
+        self._matrices[record.room_type] = matrix
+        return matrix
+
+    def _invalidate(self, room_type: str, changed_on: date):
+        """Удаляет из кэша прогнозы, рассчитанные на дату изменения или позже."""
+        for key in [key for key in self._cache if key[0] == room_type and key[1] >= changed_on]:
+            del self._cache[key]
+
+    def add_bookings(self, records: Iterable[BookingRecord]):
+        """
+        Добавляет новые бронирования.
+
+        Прогнозы, рассчитанные до даты бронирования, его не видят и
+        остаются в кэше.
+        """
+        with self._lock:
+            for record in records:
+                self._matrix_for(record).add(record)
+                self._invalidate(record.room_type, min(filter(None, (record.booked_on, record.cancelled_on))))
+
+    def cancel_bookings(self, records: Iterable[BookingRecord]):
+        """
+        Учитывает отмену ранее добавленных бронирований.
+
+        Args:
+            records: Бронирования с заполненным cancelled_on
+        """
+        with self._lock:
+            for record in records:
+                matrix = self._matrix_for(record)
+                matrix.add(record._replace(cancelled_on=None), sign=-1)
+                matrix.add(record)
+                self._invalidate(record.room_type, record.cancelled_on)
+
+    def forecast(self, room_type: str, as_of: date) -> Forecast:
+        """
+        Возвращает прогноз загрузки на горизонт от даты расчета.
+
+        Args:
+            room_type: Тип номеров
+            as_of: Дата расчета (бронирования после нее не учитываются)
+
+        Returns:
+            Forecast: Прогноз по датам проживания
+        """
+        key = (room_type, as_of)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                return cached
+
+            stay_dates = [as_of + timedelta(days=i) for i in range(self.horizon_days)]
+            capacity = self.capacity.get(room_type, 0)
+            matrix = self._matrices.get(room_type)
+            if matrix is None:
+                zeros = np.zeros(self.horizon_days)
+                result = Forecast(room_type, as_of, stay_dates, zeros, zeros, zeros)
+            else:
+                matrix.ensure(stay_dates[-1])
+                columns = np.arange(matrix.column(as_of), matrix.column(as_of) + self.horizon_days)
+                lead = np.minimum(np.arange(self.horizon_days), MAX_LEAD_DAYS)
+                valid = columns >= 0
+                otb = np.zeros(self.horizon_days)
+                otb[valid] = matrix.otb[lead[valid], columns[valid]]
+
+                curves = matrix.pickup_curves(as_of)
+                weekdays = (np.arange(self.horizon_days) + as_of.weekday()) % 7
+                expected = otb + curves[weekdays, lead]
+                if capacity:
+                    # Добор не выводит прогноз за вместимость, но перебронирование сохраняется
+                    expected = np.minimum(expected, np.maximum(otb, capacity))
+                occupancy = expected / capacity if capacity else np.zeros(self.horizon_days)
+                result = Forecast(room_type, as_of, stay_dates, otb, expected, occupancy)
+
+            self._cache[key] = result
+            return result
+
+    def forecast_all(self, as_of: date) -> Dict[str, Forecast]:
+        """Прогноз по всем типам номеров."""
+        return {room_type: self.forecast(room_type, as_of) for room_type in self.capacity}
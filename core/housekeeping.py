@@ -0,0 +1,359 @@
+"""
+Модуль планирования уборки номеров.
+
+Распределяет грязные номера между горничными так, чтобы нагрузка
+(уборка плюс переходы) была равномерной, а маршруты короткими. Маршрут
+горничной обходит этажи по порядку, а номера на этаже - "змейкой" вдоль
+коридора. Решение строится жадно и улучшается локальным поиском
+(переносы и обмены номеров между горничными). При изменении статуса
+номера в течение смены план исправляется на месте, без пересчета с нуля:
+уже убранные номера и номер в работе не переносятся.
+
+Модуль не обращается к БД: статусы и расположение номеров подаются на вход.
+"""
+
+import logging
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Статусы номеров
+STATUS_DIRTY = 'dirty'
+STATUS_CLEAN = 'clean'
+STATUS_OCCUPIED = 'occupied'
+STATUS_OUT_OF_ORDER = 'out_of_order'
+
+# Время переходов (мин)
+WALK_MINUTES_PER_ROOM = 0.5  # между соседними дверями коридора
+WING_CHANGE_MINUTES = 3.0  # переход в другое крыло того же этажа
+FLOOR_CHANGE_MINUTES = 5.0  # переход на другой этаж
+
+# Вес суммарных переходов относительно максимальной нагрузки в целевой функции
+WALK_WEIGHT = 0.3
+
+# Ограничение числа вариантов, проверяемых локальным поиском
+MAX_SEARCH_STEPS = 20000
+MAX_REPLAN_STEPS = 2000
+
+
+class RoomLocation(NamedTuple):
+    """Расположение и норматив уборки номера."""
+    room_id: int
+    floor: int
+    wing: str
+    position: int  # Порядковый номер двери в коридоре крыла
+    cleaning_minutes: float
+
+
+class Housekeeper(NamedTuple):
+    """Горничная."""
+    housekeeper_id: int
+    name: str
+    start_floor: int = 1
+
+
+class Route(NamedTuple):
+    """Маршрут горничной."""
+    housekeeper_id: int
+    rooms: List[int]  # В порядке обхода
+    cleaning_minutes: float
+    walking_minutes: float
+
+    @property
+    def total_minutes(self) -> float:
+        return self.cleaning_minutes + self.walking_minutes
+
+
+def _walk(a: Optional[RoomLocation], b: RoomLocation, start_floor: int) -> float:
+    """Время перехода от номера a (или от точки старта) к номеру b."""
+    if a is None:
+        return FLOOR_CHANGE_MINUTES * abs(b.floor - start_floor)
+    if a.floor != b.floor:
+        return FLOOR_CHANGE_MINUTES * abs(a.floor - b.floor) + WALK_MINUTES_PER_ROOM * b.position
+    if a.wing != b.wing:
+        return WING_CHANGE_MINUTES + WALK_MINUTES_PER_ROOM * b.position
+    return WALK_MINUTES_PER_ROOM * abs(a.position - b.position)
+
+
+class HousekeepingPlanner:
+    """
+    План уборки на смену.
+
+    Attributes:
+        rooms: Расположение номеров по room_id
+        housekeepers: Горничные по housekeeper_id
+    """
+
+    def __init__(self, rooms: Iterable[RoomLocation], housekeepers: Iterable[Housekeeper]):
+        self.rooms: Dict[int, RoomLocation] = {room.room_id: room for room in rooms}
+        self.housekeepers: Dict[int, Housekeeper] = {h.housekeeper_id: h for h in housekeepers}
+        if not self.housekeepers:
+            raise ValueError("Не задано ни одной горничной")
+        # Неначатые номера каждой горничной (порядок определяет _order)
+        self._pending: Dict[int, Set[int]] = {h: set() for h in self.housekeepers}
+        # Убранные и взятые в работу номера остаются за горничной
+        self._done: Dict[int, List[int]] = {h: [] for h in self.housekeepers}
+        self._in_progress: Dict[int, Optional[int]] = {h: None for h in self.housekeepers}
+        self._owner: Dict[int, int] = {}
+        self._ranks: Optional[Dict[int, int]] = None
+
+    # Маршруты и стоимость
+
+    def _rank(self) -> Dict[int, int]:
+        """Место номера в порядке обхода здания: по этажам и крыльям, змейкой вдоль коридора."""
+        if self._ranks is None:
+            groups = sorted({(room.floor, room.wing) for room in self.rooms.values()})
+            direction = {key: index % 2 == 1 for index, key in enumerate(groups)}
+            ordered = sorted(
+                self.rooms.values(),
+                key=lambda r: (r.floor, r.wing, -r.position if direction[(r.floor, r.wing)] else r.position)
+            )
+            self._ranks = {room.room_id: index for index, room in enumerate(ordered)}
+        return self._ranks
+
+    def _order(self, room_ids: Iterable[int]) -> List[int]:
+        """Номера в порядке обхода."""
+        return sorted(room_ids, key=self._rank().__getitem__)
+
+    def _route_cost(self, housekeeper_id: int, room_ids: Iterable[int]) -> Tuple[float, float]:
+        """Время уборки и переходов неначатой части маршрута."""
+        housekeeper = self.housekeepers[housekeeper_id]
+        current = self._in_progress[housekeeper_id] or (
+            self._done[housekeeper_id][-1] if self._done[housekeeper_id] else None
+        )
+        previous = self.rooms[current] if current is not None else None
+        cleaning = walking = 0.0
+        for room_id in self._order(room_ids):
+            room = self.rooms[room_id]
+            walking += _walk(previous, room, housekeeper.start_floor)
+            cleaning += room.cleaning_minutes
+            previous = room
+        return cleaning, walking
+
+    def _load(self, housekeeper_id: int, room_ids: Optional[Iterable[int]] = None) -> Tuple[float, float]:
+        """
+        Полная нагрузка горничной на смену (мин), включая выполненное, и время переходов.
+        """
+        done = sum(self.rooms[r].cleaning_minutes for r in self._done[housekeeper_id])
+        if self._in_progress[housekeeper_id] is not None:
+            done += self.rooms[self._in_progress[housekeeper_id]].cleaning_minutes
+        cleaning, walking = self._route_cost(
+            housekeeper_id, self._pending[housekeeper_id] if room_ids is None else room_ids
+        )
+        return done + cleaning + walking, walking
+
+    @staticmethod
+    def _objective(loads: Dict[int, Tuple[float, float]]) -> float:
+        """Максимальная нагрузка плюс взвешенное суммарное время переходов."""
+        return max(load for load, _ in loads.values()) + WALK_WEIGHT * sum(w for _, w in loads.values())
+
+    # Построение и улучшение плана
+
+    def plan(self, statuses: Dict[int, str]) -> List[Route]:
+        """
+        Строит план с нуля по статусам номеров.
+
+        Грязные номера в порядке обхода здания делятся на последовательные
+        участки равной нагрузки (каждой горничной - соседние номера и этажи),
+        после чего локальный поиск выравнивает нагрузку и сокращает переходы.
+
+        Args:
+            statuses: Статусы номеров по room_id
+
+        Returns:
+            list: Маршруты горничных
+        """
+        for housekeeper_id in self.housekeepers:
+            self._pending[housekeeper_id].clear()
+        self._owner = {
+            room_id: h for h in self.housekeepers
+            for room_id in self._done[h] + [self._in_progress[h]] if room_id is not None
+        }
+        dirty = self._order(
+            room_id for room_id, status in statuses.items()
+            if status == STATUS_DIRTY and room_id in self.rooms and room_id not in self._owner
+        )
+
+        # Жадно: участки по порядку обхода, пока нагрузка горничной не достигнет средней
+        housekeeper_ids = sorted(self.housekeepers)
+        target = (sum(self.rooms[r].cleaning_minutes for r in dirty)
+                  + sum(self._load(h)[0] for h in housekeeper_ids)) / len(housekeeper_ids)
+        position = 0
+        for number, housekeeper_id in enumerate(housekeeper_ids):
+            last = number == len(housekeeper_ids) - 1
+            while position < len(dirty):
+                room_id = dirty[position]
+                load = self._load(housekeeper_id)[0]
+                minutes = self.rooms[room_id].cleaning_minutes
+                # Номер уходит следующей горничной, если с ним перегрузка больше, чем недогрузка без него
+                if not last and self._pending[housekeeper_id] and load + minutes / 2 > target:
+                    break
+                self._pending[housekeeper_id].add(room_id)
+                self._owner[room_id] = housekeeper_id
+                position += 1
+
+        self._improve()
+        return self.routes()
+
+    def _insert(self, room_id: int):
+        """Назначает номер горничной, при которой целевая функция растет меньше всего."""
+        loads = {h: self._load(h) for h in self.housekeepers}
+
+        def cost(h):
+            changed = dict(loads)
+            changed[h] = self._load(h, self._pending[h] | {room_id})
+            return self._objective(changed), h
+
+        best = min(self.housekeepers, key=cost)
+        self._pending[best].add(room_id)
+        self._owner[room_id] = best
+
+    def _improve(self, housekeeper_ids: Optional[Set[int]] = None, max_steps: int = MAX_SEARCH_STEPS):
+        """
+        Локальный поиск: переносы неначатых номеров между горничными и обмены
+        номерами на одном этаже, пока они улучшают целевую функцию.
+
+        Args:
+            housekeeper_ids: Горничные, номера которых можно переносить (по умолчанию все)
+            max_steps: Ограничение числа проверенных вариантов
+        """
+        sources = set(self.housekeepers) if housekeeper_ids is None else set(housekeeper_ids)
+        loads = {h: self._load(h) for h in self.housekeepers}
+        best = self._objective(loads)
+        steps = 0
+
+        def apply(changes):
+            nonlocal best
+            candidate = dict(loads)
+            for h, rooms in changes.items():
+                candidate[h] = self._load(h, rooms)
+            value = self._objective(candidate)
+            if value < best - 1e-9:
+                best = value
+                loads.update(candidate)
+                for h, rooms in changes.items():
+                    self._pending[h] = rooms
+                    for moved in rooms:
+                        self._owner[moved] = h
+                return True
+            return False
+
+        improved = True
+        while improved and steps < max_steps:
+            improved = False
+            for source in sorted(sources, key=lambda h: -loads[h][0]):
+                for room_id in self._order(self._pending[source]):
+                    if room_id not in self._pending[source]:
+                        continue
+                    floor = self.rooms[room_id].floor
+                    for target in self.housekeepers:
+                        if target == source or steps >= max_steps:
+                            continue
+                        steps += 1
+                        # Перенос номера
+                        if apply({source: self._pending[source] - {room_id},
+                                  target: self._pending[target] | {room_id}}):
+                            improved = True
+                            break
+                        # Обмен с номером того же этажа
+                        for other in [r for r in self._pending[target] if self.rooms[r].floor == floor]:
+                            steps += 1
+                            if apply({source: self._pending[source] - {room_id} | {other},
+                                      target: self._pending[target] - {other} | {room_id}}):
+                                improved = True
+                                break
+                        if room_id not in self._pending[source]:
+                            break
+
+    # Изменения в течение смены
+
+    def start_cleaning(self, room_id: int, housekeeper_id: Optional[int] = None):
+        """
+        Отмечает, что горничная начала уборку номера (номер больше не переносится).
+
+        Args:
+            room_id: ID номера
+            housekeeper_id: Горничная, начавшая уборку (по умолчанию - по плану).
+                Номер чужого маршрута переходит к ней.
+
+        Raises:
+            KeyError: Если номер или горничная неизвестны
+            ValueError: Если номера нет в плане и горничная не указана
+        """
+        if room_id not in self.rooms:
+            raise KeyError(f"Неизвестный номер: {room_id}")
+        if housekeeper_id is not None and housekeeper_id not in self.housekeepers:
+            raise KeyError(f"Неизвестная горничная: {housekeeper_id}")
+        owner = self._owner.get(room_id)
+        if housekeeper_id is None:
+            if owner is None:
+                raise ValueError(f"Номер {room_id} не входит в план уборки, укажите горничную")
+            housekeeper_id = owner
+        if owner is not None:
+            if self._in_progress[owner] == room_id:
+                if owner == housekeeper_id:
+                    return
+                self._in_progress[owner] = None
+            self._pending[owner].discard(room_id)
+            if room_id in self._done[owner]:
+                self._done[owner].remove(room_id)
+        self._owner[room_id] = housekeeper_id
+        previous = self._in_progress[housekeeper_id]
+        if previous is not None:
+            self._done[housekeeper_id].append(previous)
+        self._in_progress[housekeeper_id] = room_id
+
+    def update_status(self, room_id: int, status: str) -> List[Route]:
+        """
+        Исправляет план после изменения статуса номера.
+
+        Новый грязный номер вставляется в лучший маршрут; номер, который
+        больше не нужно убирать, снимается с маршрута. Затем локальный поиск
+        выравнивает только затронутых горничных.
+
+        Args:
+            room_id: ID номера
+            status: Новый статус
+
+        Returns:
+            list: Маршруты горничных
+        """
+        if room_id not in self.rooms:
+            raise KeyError(f"Неизвестный номер: {room_id}")
+        owner = self._owner.get(room_id)
+        if status == STATUS_DIRTY:
+            if owner is not None and (room_id in self._pending[owner] or self._in_progress[owner] == room_id):
+                return self.routes()
+            affected = set()
+            if owner is not None:
+                # Убранный номер снова грязный: прежняя уборка не входит в нагрузку
+                self._done[owner].remove(room_id)
+                del self._owner[room_id]
+                affected.add(owner)
+            self._insert(room_id)
+            affected.add(self._owner[room_id])
+        elif owner is not None and room_id in self._pending[owner]:
+            self._pending[owner].discard(room_id)
+            del self._owner[room_id]
+            affected = {owner}
+        else:
+            if owner is not None and self._in_progress[owner] == room_id and status == STATUS_CLEAN:
+                self._done[owner].append(room_id)
+                self._in_progress[owner] = None
+            return self.routes()
+
+        # Разгружаем затронутых и самую загруженную горничную
+        busiest = max(self.housekeepers, key=lambda h: self._load(h)[0])
+        self._improve(affected | {busiest}, max_steps=MAX_REPLAN_STEPS)
+        logger.info(f"План уборки исправлен: номер {room_id} -> {status}")
+        return self.routes()
+
+    def routes(self) -> List[Route]:
+        """Возвращает текущие маршруты (неначатая часть)."""
+        result = []
+        for housekeeper_id in sorted(self.housekeepers):
+            pending = self._pending[housekeeper_id]
+            cleaning, walking = self._route_cost(housekeeper_id, pending)
+            result.append(Route(housekeeper_id, self._order(pending), cleaning, walking))
+        return result
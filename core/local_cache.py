@@ -0,0 +1,263 @@
+"""
+Модуль локальной копии справочных данных.
+
+Хранит в SQLite на машине клиента роли и каталог пользователей (без хэшей
+паролей). Чтения обслуживаются из локальной копии сразу, а синхронизация
+с основной БД выполняется по дельте: каждая строка PostgreSQL несет
+системный номер транзакции xmin, и из основной БД выбираются только строки,
+измененные после сохраненного водяного знака. Запись по-прежнему идет
+только в основную БД.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from core.database import get_db_session, db_registry
+from core.queries import UserRow
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Путь к файлу локальной копии
+LOCAL_CACHE_PATH = os.getenv(
+    'LOCAL_CACHE_PATH',
+    os.path.join(os.path.expanduser('~'), '.hotel_control', 'cache.sqlite3')
+)
+
+
+def property_cache_path(name: str) -> str:
+    """
+    Возвращает путь к локальной копии объекта сети.
+
+    У объекта по умолчанию путь прежний, у остальных - отдельный файл рядом.
+    """
+    if name == db_registry.default:
+        return LOCAL_CACHE_PATH
+    root, ext = os.path.splitext(LOCAL_CACHE_PATH)
+    return f"{root}_{name}{ext}"
+
+LOCAL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS role (
+    role_id INTEGER PRIMARY KEY,
+    role_name TEXT NOT NULL,
+    description TEXT,
+    row_version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY,
+    login TEXT NOT NULL,
+    role_id INTEGER NOT NULL,
+    is_blocked INTEGER NOT NULL,
+    failed_attempts INTEGER NOT NULL,
+    row_version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    table_name TEXT PRIMARY KEY,
+    watermark INTEGER NOT NULL,
+    xid_epoch INTEGER NOT NULL
+);
+"""
+
+# Синхронизируемые таблицы: (имя, ключ, выборка из основной БД, колонки локальной таблицы).
+# В выборке не должно быть чувствительных данных (хэшей паролей).
+SYNC_TABLES = [
+    (
+        'role', 'role_id',
+        """
+        SELECT role_id, role_name::text, description, xmin::text::bigint AS row_version
+          FROM role
+         WHERE xmin::text::bigint > :watermark
+        """,
+        ('role_id', 'role_name', 'description', 'row_version'),
+    ),
+    (
+        'users', 'user_id',
+        """
+        SELECT user_id, login, role_id, is_blocked, failed_attempts, xmin::text::bigint AS row_version
+          FROM users
+         WHERE xmin::text::bigint > :watermark
+        """,
+        ('user_id', 'login', 'role_id', 'is_blocked', 'failed_attempts', 'row_version'),
+    ),
+]
+
+
+class LocalCache:
+    """
+    Локальная копия справочных данных в SQLite.
+
+    Attributes:
+        path: Путь к файлу SQLite
+    """
+
+    def __init__(self, path: str = LOCAL_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = None
+
+    def set_path(self, path: str):
+        """
+        Переключает локальную копию на другой файл (при смене объекта).
+
+        Args:
+            path: Путь к файлу SQLite
+        """
+        with self._lock:
+            if path == self.path:
+                return
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+            self.path = path
+
+    def _connect(self) -> sqlite3.Connection:
+        """Открывает соединение с локальной копией при первом обращении."""
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.executescript(LOCAL_SCHEMA)
+        return self._connection
+
+    def get_roles(self) -> List[Tuple[int, str]]:
+        """
+        Возвращает роли из локальной копии.
+
+        Returns:
+            list: Пары (role_id, role_name)
+        """
+        with self._lock:
+            return self._connect().execute(
+                "SELECT role_id, role_name FROM role ORDER BY role_id"
+            ).fetchall()
+
+    def get_users(self) -> List[UserRow]:
+        """
+        Возвращает каталог пользователей из локальной копии.
+
+        Returns:
+            list: Строки UserRow
+        """
+        with self._lock:
+            rows = self._connect().execute(
+                """
+                SELECT u.user_id, u.login, COALESCE(r.role_name, 'Неизвестно'),
+                       u.is_blocked, u.failed_attempts
+                  FROM users u
+                  LEFT JOIN role r ON r.role_id = u.role_id
+                 ORDER BY u.user_id
+                """
+            ).fetchall()
+        return [UserRow(user_id, login, role_name, bool(is_blocked), failed_attempts)
+                for user_id, login, role_name, is_blocked, failed_attempts in rows]
+
+    def is_empty(self) -> bool:
+        """Проверяет, выполнялась ли хотя бы одна синхронизация."""
+        with self._lock:
+            return self._connect().execute("SELECT count(*) FROM sync_state").fetchone()[0] == 0
+
+    def sync(self) -> bool:
+        """
+        Синхронизирует локальную копию с основной БД по дельте.
+
+        Returns:
+            bool: True, если локальные данные изменились
+        """
+        path = self.path
+        session = get_db_session(read_only=True)
+        try:
+            # settled - младший номер незавершенной транзакции: строки с меньшим
+            # xmin уже не изменятся задним числом, поэтому водяной знак не
+            # поднимается выше него. Эпоха растет при переполнении xmin, после
+            # чего сохраненный водяной знак недействителен.
+            settled, epoch = session.execute(text(
+                "SELECT txid_snapshot_xmin(s) & 4294967295, txid_snapshot_xmax(s) >> 32 "
+                "FROM txid_current_snapshot() AS s"
+            )).one()
+
+            changed = False
+            with self._lock:
+                if self.path != path:
+                    # Объект сменился во время чтения: данные относятся к прежней БД
+                    return False
+                connection = self._connect()
+                for table, key, query, columns in SYNC_TABLES:
+                    changed |= self._sync_table(
+                        session, connection, settled, epoch, table, key, query, columns
+                    )
+                connection.commit()
+            return changed
+
+        except Exception as e:
+            logger.warning(f"Не удалось синхронизировать локальную копию: {e}")
+            if self._connection is not None:
+                self._connection.rollback()
+            return False
+
+        finally:
+            session.close()
+
+    @staticmethod
+    def _sync_table(session, connection, settled, epoch, table, key, query, columns) -> bool:
+        """Применяет дельту одной таблицы и удаляет строки, исчезнувшие из основной БД."""
+        state = connection.execute(
+            "SELECT watermark, xid_epoch FROM sync_state WHERE table_name = ?", (table,)
+        ).fetchone()
+        watermark = state[0] if state and state[1] == epoch else 0
+        if watermark == 0:
+            # Полная перезагрузка: первый запуск или смена эпохи
+            connection.execute(f"DELETE FROM {table}")
+
+        rows = session.execute(text(query), {'watermark': watermark}).fetchall()
+        if rows:
+            placeholders = ", ".join("?" for _ in columns)
+            connection.executemany(
+                f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+                [tuple(row) for row in rows]
+            )
+            newest = max(row.row_version for row in rows)
+            watermark = max(watermark, min(newest, settled - 1))
+
+        # Удаления не видны по xmin; сверяем количество и только при расхождении ключи
+        deleted = 0
+        remote_count = session.execute(text(f"SELECT count(*) FROM {table}")).scalar()
+        local_count = connection.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+        if remote_count != local_count:
+            remote_keys = {row[0] for row in session.execute(text(f"SELECT {key} FROM {table}"))}
+            local_keys = {row[0] for row in connection.execute(f"SELECT {key} FROM {table}")}
+            stale = [(k,) for k in local_keys - remote_keys]
+            connection.executemany(f"DELETE FROM {table} WHERE {key} = ?", stale)
+            deleted = len(stale)
+
+        connection.execute(
+            "INSERT OR REPLACE INTO sync_state (table_name, watermark, xid_epoch) VALUES (?, ?, ?)",
+            (table, watermark, epoch)
+        )
+        if rows or deleted:
+            logger.info(f"Локальная копия {table}: обновлено {len(rows)}, удалено {deleted}")
+        return bool(rows or deleted)
+
+    def revalidate_async(self, callback: Optional[Callable[[bool], None]] = None):
+        """
+        Запускает синхронизацию в фоновом потоке.
+
+        Args:
+            callback: Вызывается из фонового потока с признаком изменения данных
+        """
+        def worker():
+            changed = self.sync()
+            if callback:
+                callback(changed)
+
+        threading.Thread(target=worker, name="LocalCacheSync", daemon=True).start()
+
+
+# Экземпляр локальной копии на процесс; следует за текущим объектом сети
+local_cache = LocalCache(property_cache_path(db_registry.current_name))
+db_registry.add_listener(lambda name: local_cache.set_path(property_cache_path(name)))
@@ -0,0 +1,189 @@
+"""
+Модуль миграций схемы БД.
+
+Таблицы, функции и триггеры создаются не клиентами во время работы, а одной
+командой, которую выполняет администратор с правами владельца схемы:
+
+    python -m core.migrations                   # БД всех объектов сети
+    python -m core.migrations --property main   # БД одного объекта
+    python -m core.migrations --url <URL>       # БД по адресу (например, под владельцем схемы)
+
+Каждая миграция выполняется в своей транзакции и отмечается в таблице
+schema_migration. На время миграции таблица schema_migration блокируется,
+поэтому одновременные запуски выполняются по очереди и не применяют
+миграцию дважды.
+
+Команду нужно также запускать по расписанию (например, ежедневно): она
+заранее создает месячные секции журнала аудита.
+"""
+
+import argparse
+import logging
+import sys
+from typing import Callable, Iterable, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import create_engine, text
+
+from config import PROPERTY_DATABASES
+from core import audit, folio, search
+from core.permissions import DEFAULT_ROLE_PERMISSIONS, has_known_permissions, permission_names
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+MIGRATION_TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS schema_migration (
+        migration_id VARCHAR(64) PRIMARY KEY,
+        description VARCHAR(255),
+        applied_at TIMESTAMP NOT NULL DEFAULT now()
+    )
+"""
+
+
+class Migration(NamedTuple):
+    """Миграция схемы: apply выполняется в транзакции с переданным соединением."""
+    migration_id: str
+    description: str
+    apply: Callable
+
+
+def ddl(statements: Sequence[str]) -> Callable:
+    """Возвращает миграцию, выполняющую DDL-операторы по порядку."""
+    def apply(connection):
+        for statement in statements:
+            connection.execute(text(statement))
+    return apply
+
+
+def migrate_role_permissions(connection):
+    """
+    Заменяет в role.permissions значения без известных прав (прежние описания
+    в свободной форме) явным списком прав по умолчанию для названия роли.
+    Прежний текст переносится в пустое описание роли.
+    """
+    roles = connection.execute(text("SELECT role_id, role_name, permissions FROM role")).all()
+    for role_id, role_name, permissions in roles:
+        if not permissions or has_known_permissions(permissions):
+            continue
+        connection.execute(
+            text("UPDATE role SET permissions = :permissions, "
+                 "description = coalesce(description, :previous) WHERE role_id = :role_id"),
+            {
+                'permissions': permission_names(DEFAULT_ROLE_PERMISSIONS.get(role_name, 0)),
+                'previous': permissions,
+                'role_id': role_id,
+            }
+        )
+        logger.info(f"Права роли {role_name} заменены правами по умолчанию")
+
+
+# Миграции в порядке применения. Идентификаторы не меняются после выпуска.
+MIGRATIONS: List[Migration] = [
+    Migration('0001_auth_audit_log', "Журнал аудита аутентификации", ddl(audit.AUDIT_SCHEMA_DDL)),
+    Migration('0002_role_permissions', "Явные права ролей вместо описаний", migrate_role_permissions),
+    Migration('0003_folio', "Счета проживания, итоги и запрет изменения проводок", ddl(folio.FOLIO_SCHEMA_DDL)),
+    Migration('0004_search', "Поисковый индекс счетов", ddl(search.SEARCH_SCHEMA_DDL)),
+    Migration('0005_search_order', "Индексы отбора кандидатов поиска", ddl(search.SEARCH_ORDER_DDL)),
+]
+
+
+def apply_migrations(engine, only: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    Применяет миграции, которые еще не применены.
+
+    Args:
+        engine: Engine SQLAlchemy с правами владельца схемы
+        only: Идентификаторы миграций, которые нужно применить (по умолчанию все)
+
+    Returns:
+        list: Идентификаторы примененных миграций
+    """
+    only = set(only) if only is not None else None
+    with engine.begin() as connection:
+        connection.execute(text(MIGRATION_TABLE_DDL))
+
+    applied = []
+    for migration in MIGRATIONS:
+        if only is not None and migration.migration_id not in only:
+            continue
+        with engine.begin() as connection:
+            # Параллельный запуск ждет здесь и затем видит миграцию примененной
+            connection.execute(text("LOCK TABLE schema_migration IN EXCLUSIVE MODE"))
+            done = connection.execute(
+                text("SELECT 1 FROM schema_migration WHERE migration_id = :migration_id"),
+                {'migration_id': migration.migration_id}
+            ).first()
+            if done:
+                continue
+            migration.apply(connection)
+            connection.execute(
+                text("INSERT INTO schema_migration (migration_id, description) "
+                     "VALUES (:migration_id, :description)"),
+                {'migration_id': migration.migration_id, 'description': migration.description}
+            )
+        logger.info(f"Применена миграция {migration.migration_id}: {migration.description}")
+        applied.append(migration.migration_id)
+    return applied
+
+
+def run_maintenance(engine) -> int:
+    """
+    Выполняет плановое обслуживание схемы: создает секции журнала аудита
+    на текущий и следующие месяцы.
+
+    Returns:
+        int: Количество месяцев, для которых проверены секции
+    """
+    with engine.begin() as connection:
+        return audit.ensure_partitions(connection)
+
+
+def migrate(url: str) -> List[str]:
+    """
+    Применяет миграции и плановое обслуживание к БД.
+
+    Args:
+        url: URL подключения к БД
+
+    Returns:
+        list: Идентификаторы примененных миграций
+    """
+    engine = create_engine(url)
+    try:
+        applied = apply_migrations(engine)
+        run_maintenance(engine)
+        return applied
+    finally:
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Миграции схемы БД Hotel Control System")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--property", help="Объект сети (по умолчанию все)")
+    target.add_argument("--url", help="URL подключения к БД")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.url:
+        targets = {'--url': args.url}
+    elif args.property:
+        if args.property not in PROPERTY_DATABASES:
+            parser.error(f"Неизвестный объект: {args.property}")
+        targets = {args.property: PROPERTY_DATABASES[args.property]}
+    else:
+        targets = PROPERTY_DATABASES
+
+    failed = False
+    for name, url in targets.items():
+        try:
+            applied = migrate(url)
+            logger.info(f"{name}: применено миграций {len(applied)}, схема актуальна")
+        except Exception as e:
+            logger.error(f"{name}: ошибка миграции: {e}")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
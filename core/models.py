@@ -1,9 +1,11 @@
 import enum
 from sqlalchemy import (
-    create_engine, Column, Integer, String, Boolean, TIMESTAMP, ForeignKey, Enum as SQLEnum
+    create_engine, Column, Integer, BigInteger, String, Text, Boolean, Date, Numeric, TIMESTAMP, ForeignKey,
+    Enum as SQLEnum
 )
 from sqlalchemy.orm import relationship, declarative_base
 from sqlalchemy.sql import func
+from sqlalchemy.types import UserDefinedType
 
 Base = declarative_base()
 
@@ -43,4 +45,117 @@ class User(Base):
     role = relationship("Role")
 
     def __repr__(self):
-        return f"<User(user_id={self.user_id}, login='{self.login}', role_id={self.role_id})>"
\ No newline at end of file
+        return f"<User(user_id={self.user_id}, login='{self.login}', role_id={self.role_id})>"
+
+class AuthAuditLog(Base):
+    """
+    Модель для таблицы auth_audit_log.
+
+    Журнал событий аутентификации только на добавление. В PostgreSQL таблица
+    секционирована по месяцам (см. core.audit.AUDIT_SCHEMA_DDL), поэтому
+    первичный ключ включает event_time.
+    """
+    __tablename__ = 'auth_audit_log'
+
+    event_id = Column(BigInteger, primary_key=True, autoincrement=True)
+    event_time = Column(TIMESTAMP(timezone=False), primary_key=True, nullable=False)
+    event_type = Column(String(32), nullable=False)
+    user_id = Column(Integer, nullable=True)
+    login = Column(String(50), nullable=True)
+    details = Column(String(255), nullable=True)
+
+    def __repr__(self):
+        return f"<AuthAuditLog(event_id={self.event_id}, event_type='{self.event_type}', login='{self.login}')>"
+
+class Folio(Base):
+    """Модель для таблицы folio (счет проживания)."""
+    __tablename__ = 'folio'
+
+    folio_id = Column(BigInteger, primary_key=True, autoincrement=True)
+    booking_ref = Column(String(32), nullable=True)
+    guest_name = Column(String(100), nullable=False)
+    room_number = Column(String(10), nullable=True)
+    # Ежедневное начисление за проживание при ночном аудите; NULL - не начислять
+    room_rate = Column(Numeric(12, 2), nullable=True)
+    status = Column(String(16), nullable=False, default='open')
+    notes = Column(Text, nullable=True)
+    opened_at = Column(TIMESTAMP(timezone=False), nullable=False, server_default=func.now())
+    closed_at = Column(TIMESTAMP(timezone=False), nullable=True)
+
+    balance = relationship("FolioBalance", uselist=False)
+
+    def __repr__(self):
+        return f"<Folio(folio_id={self.folio_id}, guest_name='{self.guest_name}', status='{self.status}')>"
+
+class FolioLine(Base):
+    """
+    Модель для таблицы folio_line.
+
+    Проводки по счету только на добавление (см. core.folio.FOLIO_SCHEMA_DDL):
+    исправление выполняется сторнирующей проводкой. Сумма хранится со знаком:
+    начисления положительные, оплаты отрицательные.
+    """
+    __tablename__ = 'folio_line'
+
+    line_id = Column(BigInteger, primary_key=True, autoincrement=True)
+    folio_id = Column(BigInteger, ForeignKey('folio.folio_id', ondelete="RESTRICT"), nullable=False)
+    business_date = Column(Date, nullable=False)
+    line_type = Column(String(16), nullable=False)
+    description = Column(String(255), nullable=True)
+    amount = Column(Numeric(12, 2), nullable=False)
+    posted_at = Column(TIMESTAMP(timezone=False), nullable=False, server_default=func.now())
+    posted_by = Column(Integer, nullable=True)
+    reverses_line_id = Column(BigInteger, ForeignKey('folio_line.line_id'), nullable=True)
+
+    def __repr__(self):
+        return f"<FolioLine(line_id={self.line_id}, folio_id={self.folio_id}, amount={self.amount})>"
+
+class FolioBalance(Base):
+    """
+    Модель для таблицы folio_balance.
+
+    Итоги счета, которые поддерживает триггер на folio_line: баланс читается
+    одной строкой по первичному ключу, без суммирования проводок.
+    """
+    __tablename__ = 'folio_balance'
+
+    folio_id = Column(BigInteger, ForeignKey('folio.folio_id', ondelete="RESTRICT"), primary_key=True)
+    balance = Column(Numeric(14, 2), nullable=False, default=0)
+    charges_total = Column(Numeric(14, 2), nullable=False, default=0)
+    payments_total = Column(Numeric(14, 2), nullable=False, default=0)
+    line_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(TIMESTAMP(timezone=False), nullable=False, server_default=func.now())
+
+    def __repr__(self):
+        return f"<FolioBalance(folio_id={self.folio_id}, balance={self.balance})>"
+
+class TSVector(UserDefinedType):
+    """
+    Тип tsvector PostgreSQL.
+
+    Заменяет sqlalchemy.dialects.postgresql.TSVECTOR: импорт диалекта
+    при загрузке моделей замедлял бы запуск приложения.
+    """
+    cache_ok = True
+
+    def get_col_spec(self, **kw):
+        return "TSVECTOR"
+
+class SearchDocument(Base):
+    """
+    Модель для таблицы search_document.
+
+    Поисковый индекс стойки регистрации: документ на каждую запись источника,
+    поддерживаемый триггерами (см. core.search.SEARCH_SCHEMA_DDL).
+    """
+    __tablename__ = 'search_document'
+
+    entity_type = Column(String(16), primary_key=True)
+    entity_id = Column(BigInteger, primary_key=True)
+    title = Column(String(255), nullable=False)
+    subtitle = Column(String(255), nullable=True)
+    document = Column(TSVector, nullable=False)
+    updated_at = Column(TIMESTAMP(timezone=False), nullable=False, server_default=func.now())
+
+    def __repr__(self):
+        return f"<SearchDocument(entity_type='{self.entity_type}', entity_id={self.entity_id})>"
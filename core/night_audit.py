@@ -0,0 +1,113 @@
+"""
+Модуль ночного аудита (суточного закрытия).
+Выполняет обработку всех записей набором SQL-операторов в одной транзакции.
+"""
+
+import logging
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy import text
+
+from config import FOLIO_ROOM_TAX_RATE, BUSINESS_DAY_CUTOFF_HOUR
+from core.auth import INACTIVITY_DAYS, has_permission, verify_access_token
+from core.folio import ROOM_CHARGE_SQL, to_amount_rate
+from core.permissions import Permission
+from core.database import get_db_manager, DatabaseError
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Тип обратного вызова прогресса: (номер шага, всего шагов, описание)
+ProgressCallback = Callable[[int, int, str], None]
+
+# Шаги аудита: (ключ статистики, описание, SQL).
+# Каждый оператор идемпотентен: повторный запуск не меняет уже обработанные строки.
+AUDIT_STEPS = [
+    (
+        'blocked_inactive',
+        "Блокировка неактивных учетных записей",
+        """
+        UPDATE users
+           SET is_blocked = TRUE
+         WHERE is_blocked = FALSE
+           AND last_login IS NOT NULL
+           AND last_login <= now() - make_interval(days => :inactivity_days)
+        """
+    ),
+    (
+        'room_charges',
+        "Начисление за проживание по открытым счетам",
+        ROOM_CHARGE_SQL
+    ),
+]
+
+
+def current_business_date(now: Optional[datetime] = None) -> date:
+    """
+    Возвращает закрываемые сутки отеля.
+
+    До BUSINESS_DAY_CUTOFF_HOUR продолжаются предыдущие сутки: аудит,
+    запущенный после полуночи, начисляет проживание за вчерашний день.
+    """
+    now = now or datetime.now()
+    return (now - timedelta(hours=BUSINESS_DAY_CUTOFF_HOUR)).date()
+
+
+def run_night_audit(inactivity_days: int = INACTIVITY_DAYS, progress: Optional[ProgressCallback] = None,
+                    business_date: Optional[date] = None,
+                    access_token: str = None) -> Tuple[bool, str, Dict[str, int]]:
+    """
+    Выполняет ночной аудит.
+
+    Все шаги выполняются в одной транзакции: при ошибке любого шага
+    изменения откатываются целиком, и аудит можно безопасно перезапустить.
+    Аудит начисляет проживание, поэтому кроме права запуска аудита нужно
+    право проводок по счетам.
+
+    Args:
+        inactivity_days: Количество дней бездействия до блокировки
+        progress: Обратный вызов для отображения прогресса
+        business_date: Закрываемые сутки (по умолчанию current_business_date())
+        access_token: Токен пользователя, запускающего аудит
+
+    Returns:
+        tuple: (успех, сообщение, количество обработанных строк по шагам)
+    """
+    stats: Dict[str, int] = {}
+    if not has_permission(access_token, Permission.NIGHT_AUDIT | Permission.FOLIO_POST):
+        return False, "Недостаточно прав для выполнения операции", stats
+
+    # Начисления за проживание проводятся от имени пользователя, запустившего аудит
+    valid, message, token_data = verify_access_token(access_token)
+    if not valid:
+        return False, message, stats
+
+    total = len(AUDIT_STEPS)
+    params = {
+        'inactivity_days': inactivity_days,
+        'business_date': business_date or current_business_date(),
+        'tax_rate': str(to_amount_rate(FOLIO_ROOM_TAX_RATE)),
+        'posted_by': token_data['user_id'],
+    }
+
+    def run_steps(session):
+        # Транзакция целиком повторяется при временной ошибке, поэтому
+        # статистика заполняется заново на каждой попытке
+        stats.clear()
+        for step_no, (key, description, sql) in enumerate(AUDIT_STEPS, start=1):
+            if progress:
+                progress(step_no - 1, total, description)
+            result = session.execute(text(sql), params)
+            stats[key] = result.rowcount
+            logger.info(f"Ночной аудит: {description} - {result.rowcount} строк")
+
+    try:
+        get_db_manager().run_in_transaction(run_steps)
+        if progress:
+            progress(total, total, "Ночной аудит завершен")
+        return True, "Ночной аудит успешно выполнен", stats
+
+    except DatabaseError as e:
+        logger.error(f"Ошибка ночного аудита: {e}")
+        return False, f"Ошибка ночного аудита: {e}", stats
@@ -0,0 +1,136 @@
+"""
+Модуль прав доступа.
+
+Права роли хранятся в Role.permissions строкой вида
+"users.view, users.create" (разделители: запятая, точка с запятой, пробел;
+"*" означает все права). Строка разбирается один раз в целочисленную битовую
+маску, которая передается в токене доступа и проверяется без обращения к БД.
+
+Если в строке нет ни одного известного имени права (пустое поле или
+прежнее описание в свободной форме), роль получает права по умолчанию для
+своего названия. Миграция 0002_role_permissions (core.migrations) заменяет
+такие значения явным списком прав.
+"""
+
+import enum
+import logging
+import re
+from functools import lru_cache
+from typing import Optional, Tuple
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+
+class Permission(enum.IntFlag):
+    """Права доступа. Значения битов хранятся в токенах: не меняйте их."""
+    ADMIN_PANEL = 1 << 0
+    MANAGER_PANEL = 1 << 1
+    USERS_VIEW = 1 << 2
+    USERS_CREATE = 1 << 3
+    USERS_EDIT = 1 << 4
+    USERS_UNBLOCK = 1 << 5
+    USERS_EXPORT = 1 << 6
+    AUDIT_VIEW = 1 << 7
+    NIGHT_AUDIT = 1 << 8
+    FOLIO_VIEW = 1 << 9
+    FOLIO_POST = 1 << 10
+
+
+# Имена прав в Role.permissions
+PERMISSION_NAMES = {
+    'admin.panel': Permission.ADMIN_PANEL,
+    'manager.panel': Permission.MANAGER_PANEL,
+    'users.view': Permission.USERS_VIEW,
+    'users.create': Permission.USERS_CREATE,
+    'users.edit': Permission.USERS_EDIT,
+    'users.unblock': Permission.USERS_UNBLOCK,
+    'users.export': Permission.USERS_EXPORT,
+    'audit.view': Permission.AUDIT_VIEW,
+    'night_audit.run': Permission.NIGHT_AUDIT,
+    'folio.view': Permission.FOLIO_VIEW,
+    'folio.post': Permission.FOLIO_POST,
+}
+
+ALL_PERMISSIONS = Permission(sum(PERMISSION_NAMES.values()))
+
+# Права по умолчанию, если в поле permissions роли нет известных прав
+DEFAULT_ROLE_PERMISSIONS = {
+    'Administrator': ALL_PERMISSIONS,
+    'Manager': Permission.MANAGER_PANEL | Permission.FOLIO_VIEW | Permission.FOLIO_POST,
+    'Staff': Permission(0),
+    'Guest': Permission(0),
+}
+
+_SEPARATORS = re.compile(r'[,;\s]+')
+
+
+@lru_cache(maxsize=64)
+def _parse(permissions: str) -> Tuple[int, bool]:
+    """Разбирает строку прав: (битовая маска, найдено ли хотя бы одно известное право)."""
+    mask = 0
+    recognized = False
+    for name in _SEPARATORS.split(permissions.strip().lower()):
+        if not name:
+            continue
+        if name == '*':
+            mask |= ALL_PERMISSIONS
+            recognized = True
+            continue
+        permission = PERMISSION_NAMES.get(name)
+        if permission is None:
+            logger.warning(f"Неизвестное право доступа: {name}")
+            continue
+        mask |= permission
+        recognized = True
+    return mask, recognized
+
+
+def parse_permissions(permissions: str) -> int:
+    """
+    Разбирает строку прав в битовую маску.
+
+    Args:
+        permissions: Строка прав роли
+
+    Returns:
+        int: Битовая маска прав
+    """
+    return _parse(permissions)[0]
+
+
+def has_known_permissions(permissions: Optional[str]) -> bool:
+    """Проверяет, есть ли в строке прав хотя бы одно известное право."""
+    return bool(permissions) and _parse(permissions)[1]
+
+
+def permission_names(mask: int) -> str:
+    """
+    Возвращает строку прав для Role.permissions по битовой маске.
+
+    Args:
+        mask: Битовая маска прав
+
+    Returns:
+        str: "*" для всех прав, иначе имена через запятую
+    """
+    if mask & ALL_PERMISSIONS == ALL_PERMISSIONS:
+        return '*'
+    return ", ".join(name for name, permission in PERMISSION_NAMES.items() if mask & permission)
+
+
+def compile_role_permissions(role_name: Optional[str], permissions: Optional[str]) -> int:
+    """
+    Возвращает битовую маску прав роли.
+
+    Args:
+        role_name: Название роли
+        permissions: Значение Role.permissions
+
+    Returns:
+        int: Битовая маска прав; права по умолчанию для названия роли,
+        если в значении нет известных прав
+    """
+    if has_known_permissions(permissions):
+        return parse_permissions(permissions)
+    return int(DEFAULT_ROLE_PERMISSIONS.get(role_name, 0))
@@ -0,0 +1,153 @@
+"""
+Модуль предварительной загрузки данных панели управления.
+
+Как только после входа становится известна роль пользователя, данные
+нужной панели начинают загружаться в фоне, пока пользователь читает
+сообщение об успешном входе. Панель забирает готовые данные вместо
+повторной загрузки, не блокируя поток интерфейса: незавершенная загрузка
+передает результат обратным вызовом. При выходе из системы и смене
+объекта загруженное отбрасывается.
+"""
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.api import list_roles, list_users, sync_users
+from core.auth import has_permission
+from core.database import db_registry
+from core.permissions import Permission
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+
+def _load_users(access_token: str):
+    sync_users()
+    return list_users(access_token)
+
+
+# Загрузчики данных: (ключ, право, функция от токена). Панель менеджера
+# пока не показывает данных, поэтому загрузчиков для нее нет.
+PREFETCH_LOADERS: List[Tuple[str, Permission, Callable[[str], Any]]] = [
+    ('users', Permission.USERS_VIEW, _load_users),
+    ('roles', Permission.USERS_VIEW, list_roles),
+]
+
+
+class DashboardPrefetch:
+    """
+    Фоновая загрузка данных панели управления для вошедшего пользователя.
+
+    Данные привязаны к токену доступа и объекту сети, в БД которого они
+    загружены: панель другого пользователя или другого объекта их не получит.
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="Prefetch")
+        self._lock = threading.Lock()
+        self._owner: Optional[Tuple[str, str]] = None
+        self._futures: Dict[str, Future] = {}
+
+    @staticmethod
+    def _owner_of(access_token: Optional[str]) -> Optional[Tuple[str, str]]:
+        return (access_token, db_registry.current_name) if access_token else None
+
+    def start(self, access_token: str):
+        """
+        Запускает загрузку данных, доступных пользователю, из БД текущего объекта.
+
+        Вызывается после выбора объекта. Повторный вызов для того же токена
+        и объекта не перезапускает загрузку.
+
+        Args:
+            access_token: JWT токен вошедшего пользователя
+        """
+        owner = self._owner_of(access_token)
+        with self._lock:
+            if owner is not None and owner == self._owner:
+                return
+            self._discard_locked()
+            self._owner = owner
+            for key, permission, loader in PREFETCH_LOADERS:
+                if has_permission(access_token, permission):
+                    self._futures[key] = self._executor.submit(loader, access_token)
+        logger.debug(f"Запущена предварительная загрузка: {', '.join(self._futures) or 'нет данных'}")
+
+    def _future(self, key: str, access_token: Optional[str],
+                remove: bool) -> Tuple[Optional[Future], Optional[Tuple[str, str]]]:
+        # Возвращает загрузку и владельца, проверенного под той же блокировкой:
+        # discard()/start() другого пользователя может выполниться сразу после нее
+        owner = self._owner_of(access_token)
+        with self._lock:
+            if owner is None or owner != self._owner:
+                return None, None
+            return (self._futures.pop(key, None) if remove else self._futures.get(key)), owner
+
+    @staticmethod
+    def _result(key: str, future: Future) -> Optional[Any]:
+        try:
+            return future.result(timeout=0)
+        except Exception as e:
+            logger.warning(f"Ошибка предварительной загрузки {key}: {e}")
+            return None
+
+    def take(self, key: str, access_token: Optional[str],
+             callback: Callable[[Optional[Any]], None]) -> bool:
+        """
+        Забирает загружаемые данные; повторный вызов вернет False.
+
+        callback(данные) вызывается по завершении загрузки - сразу, если она
+        уже завершена, иначе в потоке загрузки (для интерфейса - через
+        сигнал Qt). При ошибке загрузки передается None. Если до завершения
+        данные отброшены (выход, смена объекта), callback не вызывается.
+
+        Args:
+            key: Ключ данных
+            access_token: Токен пользователя, открывающего панель
+            callback: Обработчик данных
+
+        Returns:
+            bool: True, если данные загружались и callback будет вызван
+        """
+        future, owner = self._future(key, access_token, remove=True)
+        if future is None:
+            return False
+
+        def deliver(done: Future):
+            if done.cancelled():
+                return
+            with self._lock:
+                if self._owner != owner:
+                    return
+            callback(self._result(key, done))
+
+        future.add_done_callback(deliver)
+        return True
+
+    def peek(self, key: str, access_token: Optional[str]) -> Optional[Any]:
+        """
+        Возвращает уже загруженные данные, оставляя их для следующих обращений.
+
+        Незавершенную загрузку не ждет: возвращает None.
+        """
+        future, _ = self._future(key, access_token, remove=False)
+        if future is None or not future.done() or future.cancelled():
+            return None
+        return self._result(key, future)
+
+    def _discard_locked(self):
+        for future in self._futures.values():
+            future.cancel()
+        self._futures.clear()
+        self._owner = None
+
+    def discard(self):
+        """Отбрасывает загруженные данные (при выходе из системы и смене объекта)."""
+        with self._lock:
+            self._discard_locked()
+
+
+# Экземпляр на процесс
+dashboard_prefetch = DashboardPrefetch()
@@ -0,0 +1,161 @@
+"""
+Модуль запросов только для чтения.
+
+Возвращает проекции нужных столбцов в виде именованных кортежей вместо
+полных ORM-объектов: без карты идентичности, отслеживания изменений,
+ленивых связей и без хэша пароля.
+"""
+
+from datetime import datetime
+from typing import List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import select, func
+
+from core.database import get_db_session, db_registry
+from core.models import User, Role
+
+
+class UserRow(NamedTuple):
+    """Строка списка пользователей."""
+    user_id: int
+    login: str
+    role_name: str
+    is_blocked: bool
+    failed_attempts: int
+
+
+class UserDetails(NamedTuple):
+    """Данные пользователя для формы редактирования."""
+    user_id: int
+    login: str
+    role_id: int
+    is_blocked: bool
+    last_login: Optional[datetime]
+
+
+def list_users() -> List[UserRow]:
+    """
+    Возвращает список пользователей с названиями ролей одним запросом.
+    Чтение может обслуживаться репликой.
+
+    Returns:
+        list: Строки UserRow, упорядоченные по user_id
+    """
+    session = get_db_session(read_only=True)
+    try:
+        rows = session.execute(
+            select(User.user_id, User.login, Role.role_name, User.is_blocked, User.failed_attempts)
+            .outerjoin(Role, Role.role_id == User.role_id)
+            .order_by(User.user_id)
+        )
+        return [
+            UserRow(user_id, login, role_name.value if role_name else "Неизвестно", is_blocked, failed_attempts)
+            for user_id, login, role_name, is_blocked, failed_attempts in rows
+        ]
+    finally:
+        session.close()
+
+
+def list_roles() -> List[Tuple[int, str]]:
+    """
+    Возвращает роли одним запросом. Чтение может обслуживаться репликой.
+
+    Returns:
+        list: Пары (role_id, role_name), упорядоченные по role_id
+    """
+    session = get_db_session(read_only=True)
+    try:
+        rows = session.execute(select(Role.role_id, Role.role_name).order_by(Role.role_id))
+        return [(role_id, role_name.value) for role_id, role_name in rows]
+    finally:
+        session.close()
+
+
+def get_user_details(user_id: int) -> Optional[UserDetails]:
+    """
+    Возвращает данные пользователя для редактирования.
+
+    Args:
+        user_id: ID пользователя
+
+    Returns:
+        UserDetails или None, если пользователь не найден
+    """
+    session = get_db_session()
+    try:
+        row = session.execute(
+            select(User.user_id, User.login, User.role_id, User.is_blocked, User.last_login)
+            .where(User.user_id == user_id)
+        ).first()
+        return UserDetails(*row) if row else None
+    finally:
+        session.close()
+
+
+def get_last_login(user_id: int) -> Optional[datetime]:
+    """
+    Возвращает время последнего входа пользователя.
+
+    Raises:
+        LookupError: Если пользователь не найден
+    """
+    session = get_db_session()
+    try:
+        row = session.execute(
+            select(User.last_login).where(User.user_id == user_id)
+        ).first()
+        if row is None:
+            raise LookupError(f"Пользователь с ID={user_id} не найден")
+        return row.last_login
+    finally:
+        session.close()
+
+
+def get_role_name(user_id: int) -> Optional[str]:
+    """
+    Возвращает название роли пользователя одним запросом.
+
+    Returns:
+        str или None, если пользователь или роль не найдены
+    """
+    session = get_db_session()
+    try:
+        role_name = session.execute(
+            select(Role.role_name)
+            .join(User, User.role_id == Role.role_id)
+            .where(User.user_id == user_id)
+        ).scalar()
+        return role_name.value if role_name else None
+    finally:
+        session.close()
+
+
+class PropertySummary(NamedTuple):
+    """Сводка по объекту сети."""
+    property_name: str
+    users_total: int
+    users_blocked: int
+
+
+def group_user_summary() -> Tuple[List[PropertySummary], List[str]]:
+    """
+    Собирает сводку по пользователям всех объектов сети.
+
+    Запросы к БД объектов выполняются параллельно.
+
+    Returns:
+        tuple: (сводки доступных объектов, имена недоступных объектов)
+    """
+    def summarize(manager):
+        with manager.session_scope(read_only=True) as session:
+            return session.execute(
+                select(func.count(User.user_id), func.count(User.user_id).filter(User.is_blocked))
+            ).one()
+
+    summaries, unavailable = [], []
+    for name, (ok, result) in db_registry.fan_out(summarize).items():
+        if ok:
+            summaries.append(PropertySummary(name, result[0], result[1]))
+        else:
+            unavailable.append(name)
+    return summaries, unavailable
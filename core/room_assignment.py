@@ -0,0 +1,283 @@
+"""
+Модуль распределения номеров по заездам.
+
+Назначает физические номера проживаниям так, чтобы в календаре номеров
+не оставалось коротких непродаваемых окон (например, одна ночь между
+выездом и следующим заездом), и по возможности учитывает пожелания
+гостей. Задача решается как задача о расписании интервалов: жадное
+размещение по принципу наилучшего совпадения с последующим локальным
+улучшением переносами проживаний между номерами одного типа.
+
+Модуль не обращается к БД: на вход подаются номера и проживания, на
+выходе - назначения и список изменений для предварительного просмотра.
+"""
+
+import bisect
+import logging
+import time
+from datetime import date
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Минимальный срок проживания, который можно продать: окно короче - потерянные ночи
+MIN_SELLABLE_NIGHTS = 2
+
+# Штрафы целевой функции
+ORPHAN_GAP_PENALTY = 100.0  # за каждое непродаваемое окно
+GAP_NIGHT_COST = 0.1  # за каждую ночь продаваемого окна (плотная упаковка)
+FEATURE_PENALTY = 10.0  # за каждую неучтенную особенность номера
+PREFERRED_ROOM_PENALTY = 20.0  # если не выдан запрошенный номер
+MOVE_PENALTY = 5.0  # за перенос уже назначенного проживания
+
+# Максимальное количество проходов локального улучшения
+MAX_IMPROVEMENT_PASSES = 5
+
+
+class Room(NamedTuple):
+    """Номер."""
+    room_id: int
+    room_type: str
+    floor: int = 0
+    features: FrozenSet[str] = frozenset()
+
+
+class Stay(NamedTuple):
+    """Проживание (бронирование), которому нужен номер."""
+    booking_id: int
+    room_type: str
+    arrival: date
+    departure: date
+    preferred_features: FrozenSet[str] = frozenset()
+    preferred_room: Optional[int] = None
+    room_id: Optional[int] = None  # Текущее назначение
+    locked: bool = False  # Номер закреплен и не может быть изменен
+
+
+class AssignmentChange(NamedTuple):
+    """Строка предварительного просмотра изменений."""
+    booking_id: int
+    arrival: date
+    departure: date
+    old_room: Optional[int]
+    new_room: Optional[int]
+
+
+class AssignmentResult(NamedTuple):
+    """Результат распределения."""
+    assignments: Dict[int, int]  # booking_id -> room_id
+    unassigned: List[int]  # booking_id проживаний, которым не нашлось номера
+    orphan_gaps: int  # Непродаваемых окон в календаре
+    cost: float
+    elapsed_sec: float
+
+
+class _RoomCalendar:
+    """Занятость одного номера: отсортированные непересекающиеся интервалы [заезд, выезд)."""
+
+    __slots__ = ('room', 'starts', 'ends', 'bookings')
+
+    def __init__(self, room: Room):
+        self.room = room
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.bookings: List[int] = []
+
+    def slot(self, start: int, end: int) -> Optional[int]:
+        """Возвращает позицию вставки интервала или None, если он пересекается с занятыми."""
+        index = bisect.bisect_left(self.starts, end)
+        if index > 0 and self.ends[index - 1] > start:
+            return None
+        return index
+
+    def neighbours(self, index: int) -> Tuple[Optional[int], Optional[int]]:
+        """Конец предыдущего и начало следующего интервала относительно позиции."""
+        previous_end = self.ends[index - 1] if index > 0 else None
+        next_start = self.starts[index] if index < len(self.starts) else None
+        return previous_end, next_start
+
+    def insert(self, index: int, start: int, end: int, booking_id: int):
+        self.starts.insert(index, start)
+        self.ends.insert(index, end)
+        self.bookings.insert(index, booking_id)
+
+    def remove(self, booking_id: int) -> int:
+        """Удаляет интервал и возвращает его бывшую позицию."""
+        index = self.bookings.index(booking_id)
+        del self.starts[index], self.ends[index], self.bookings[index]
+        return index
+
+
+def _gap_cost(gap: Optional[int]) -> float:
+    """Стоимость окна между проживаниями; None - окно открыто до края горизонта."""
+    if gap is None or gap == 0:
+        return 0.0
+    if gap < MIN_SELLABLE_NIGHTS:
+        return ORPHAN_GAP_PENALTY
+    return GAP_NIGHT_COST * gap
+
+
+def _preference_cost(stay: Stay, room: Room) -> float:
+    cost = FEATURE_PENALTY * len(stay.preferred_features - room.features)
+    if stay.preferred_room is not None and stay.preferred_room != room.room_id:
+        cost += PREFERRED_ROOM_PENALTY
+    if stay.room_id is not None and stay.room_id != room.room_id:
+        cost += MOVE_PENALTY
+    return cost
+
+
+def _insertion_cost(calendar: _RoomCalendar, index: int, start: int, end: int) -> float:
+    """Изменение стоимости окон номера при вставке интервала в позицию index."""
+    previous_end, next_start = calendar.neighbours(index)
+    before = None if previous_end is None else start - previous_end
+    after = None if next_start is None else next_start - end
+    merged = None if previous_end is None or next_start is None else next_start - previous_end
+    return _gap_cost(before) + _gap_cost(after) - _gap_cost(merged)
+
+
+class RoomAssignmentOptimizer:
+    """
+    Распределение номеров по проживаниям.
+
+    Attributes:
+        rooms: Номера по room_id
+    """
+
+    def __init__(self, rooms: Iterable[Room]):
+        self.rooms: Dict[int, Room] = {room.room_id: room for room in rooms}
+
+    def _calendars(self) -> Dict[str, List[_RoomCalendar]]:
+        by_type: Dict[str, List[_RoomCalendar]] = {}
+        for room in sorted(self.rooms.values(), key=lambda r: r.room_id):
+            by_type.setdefault(room.room_type, []).append(_RoomCalendar(room))
+        return by_type
+
+    def optimize(self, stays: Iterable[Stay],
+                 max_passes: int = MAX_IMPROVEMENT_PASSES) -> AssignmentResult:
+        """
+        Распределяет номера.
+
+        Закрепленные проживания остаются в своих номерах; остальные
+        размещаются заново с учетом штрафа за перенос.
+
+        Args:
+            stays: Проживания в горизонте планирования
+            max_passes: Максимальное количество проходов улучшения
+
+        Returns:
+            AssignmentResult: Назначения и показатели качества
+        """
+        started = time.perf_counter()
+        stays = {stay.booking_id: stay for stay in stays}
+        by_type = self._calendars()
+        calendar_of: Dict[int, _RoomCalendar] = {}
+        unassigned: List[int] = []
+
+        def interval(stay: Stay) -> Tuple[int, int]:
+            return stay.arrival.toordinal(), stay.departure.toordinal()
+
+        # Закрепленные проживания занимают календарь первыми
+        for stay in stays.values():
+            if stay.locked and stay.room_id not in self.rooms:
+                logger.warning(f"Проживание {stay.booking_id} закреплено за неизвестным номером {stay.room_id}")
+                unassigned.append(stay.booking_id)
+            elif stay.locked:
+                start, end = interval(stay)
+                calendar = next(c for c in by_type[self.rooms[stay.room_id].room_type]
+                                if c.room.room_id == stay.room_id)
+                index = calendar.slot(start, end)
+                if index is None:
+                    logger.warning(f"Закрепленное проживание {stay.booking_id} пересекается с другим")
+                    unassigned.append(stay.booking_id)
+                    continue
+                calendar.insert(index, start, end, stay.booking_id)
+                calendar_of[stay.booking_id] = calendar
+
+        # Жадно: раньше заезд, затем длиннее проживание - в номер с наименьшей стоимостью
+        free = sorted(
+            (stay for stay in stays.values() if stay.booking_id not in calendar_of and not stay.locked),
+            key=lambda s: (s.arrival, s.arrival - s.departure, s.booking_id)
+        )
+        for stay in free:
+            start, end = interval(stay)
+            best = None
+            for calendar in by_type.get(stay.room_type, ()):
+                index = calendar.slot(start, end)
+                if index is None:
+                    continue
+                cost = _insertion_cost(calendar, index, start, end) + _preference_cost(stay, calendar.room)
+                if best is None or cost < best[0]:
+                    best = (cost, calendar, index)
+            if best is None:
+                unassigned.append(stay.booking_id)
+                continue
+            _, calendar, index = best
+            calendar.insert(index, start, end, stay.booking_id)
+            calendar_of[stay.booking_id] = calendar
+
+        # Локальное улучшение: перенос проживания в другой номер того же типа,
+        # если это уменьшает суммарную стоимость
+        for _ in range(max_passes):
+            improved = False
+            for stay in free:
+                current = calendar_of.get(stay.booking_id)
+                if current is None:
+                    continue
+                start, end = interval(stay)
+                index = current.remove(stay.booking_id)
+                removal_saving = _insertion_cost(current, index, start, end) + _preference_cost(stay, current.room)
+                best = (removal_saving, current, index)
+                for calendar in by_type[stay.room_type]:
+                    if calendar is current:
+                        continue
+                    candidate = calendar.slot(start, end)
+                    if candidate is None:
+                        continue
+                    cost = _insertion_cost(calendar, candidate, start, end) + _preference_cost(stay, calendar.room)
+                    if cost < best[0] - 1e-9:
+                        best = (cost, calendar, candidate)
+                _, calendar, index = best
+                calendar.insert(index, start, end, stay.booking_id)
+                calendar_of[stay.booking_id] = calendar
+                if calendar is not current:
+                    improved = True
+            if not improved:
+                break
+
+        assignments = {booking_id: calendar.room.room_id for booking_id, calendar in calendar_of.items()}
+        orphan_gaps, cost = 0, 0.0
+        for calendars in by_type.values():
+            for calendar in calendars:
+                for previous_end, next_start in zip(calendar.ends, calendar.starts[1:]):
+                    gap = next_start - previous_end
+                    orphan_gaps += 0 < gap < MIN_SELLABLE_NIGHTS
+                    cost += _gap_cost(gap)
+                for booking_id in calendar.bookings:
+                    cost += _preference_cost(stays[booking_id], calendar.room)
+
+        elapsed = time.perf_counter() - started
+        logger.info(f"Распределение номеров: {len(assignments)} назначено, {len(unassigned)} без номера, "
+                    f"непродаваемых окон {orphan_gaps}, {elapsed:.2f} с")
+        return AssignmentResult(assignments, unassigned, orphan_gaps, cost, elapsed)
+
+
+def diff_assignments(stays: Iterable[Stay], result: AssignmentResult) -> List[AssignmentChange]:
+    """
+    Формирует список изменений относительно текущих назначений.
+
+    Args:
+        stays: Проживания с текущими назначениями
+        result: Результат распределения
+
+    Returns:
+        list: Изменения, упорядоченные по дате заезда
+    """
+    changes = [
+        AssignmentChange(stay.booking_id, stay.arrival, stay.departure,
+                         stay.room_id, result.assignments.get(stay.booking_id))
+        for stay in stays
+        if result.assignments.get(stay.booking_id) != stay.room_id
+    ]
+    changes.sort(key=lambda change: (change.arrival, change.booking_id))
+    return changes
@@ -0,0 +1,262 @@
+"""
+Модуль полнотекстового поиска для стойки регистрации.
+
+Одна строка поиска находит счет по номеру бронирования, номеру комнаты,
+имени гостя или тексту заметки. Индекс - таблица search_document с
+документом tsvector и GIN-индексом; документы поддерживают триггеры на
+таблицах-источниках. Идентификаторы и имена индексируются без
+морфологии ('simple'), имена и заметки - также с русской и английской
+морфологией, поэтому "Иванова" находит "Иванов", а "breakfasts" - "breakfast".
+
+Каждое слово запроса ищется по префиксу (поиск по мере ввода).
+Ранжируются не более 2 * SEARCH_CANDIDATE_LIMIT совпадений, отобранных
+по B-деревьям без сортировки: документы, название которых начинается с
+первого слова запроса (фамилия гостя), в порядке названия, и недавно
+измененные документы. Для частых слов отбор останавливается после
+SEARCH_CANDIDATE_LIMIT совпадений в каждом индексе; редкие слова
+планировщик ищет по GIN-индексу, и совпадений немного. Время запроса
+зависит от частоты слова, но не от всего числа подходящих строк.
+
+Индекс и триггеры создает миграция 0004_search, индексы отбора -
+0005_search_order (core.migrations).
+"""
+
+import logging
+import re
+from typing import List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import text
+
+from core.auth import has_permission
+from core.database import get_db_session
+from core.permissions import Permission
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Количество результатов по умолчанию
+SEARCH_LIMIT = 20
+
+# Сколько совпадений отбирается каждым индексом для ранжирования
+SEARCH_CANDIDATE_LIMIT = 1000
+
+# Ограничения запроса. Префикс короче трех букв совпадает с заметной долей
+# всех документов
+MIN_QUERY_LENGTH = 3
+MAX_QUERY_TERMS = 8
+
+# Типы документов и названия для отображения
+ENTITY_FOLIO = 'folio'
+ENTITY_LABELS = {
+    ENTITY_FOLIO: "Счет",
+}
+
+# Слово запроса: буквы, цифры и символы идентификаторов (почта, номера бронирований)
+_TERM = re.compile(r"[\w@.+-]+")
+_TERM_EDGES = ".+-"
+_LIKE_SPECIAL = re.compile(r"[\\%_]")
+
+# Схема индекса (применяется миграцией 0004_search). Триггер на folio создается до заполнения таблицы по
+# существующим счетам: он блокирует запись в folio до конца транзакции, поэтому
+# счета, добавленные во время заполнения, не теряются. Таблица заполняется один
+# раз, при создании.
+SEARCH_SCHEMA_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION folio_search_document(
+        booking_ref TEXT, guest_name TEXT, room_number TEXT, notes TEXT
+    ) RETURNS tsvector AS $$
+        SELECT setweight(to_tsvector('simple', concat_ws(' ', booking_ref, room_number)), 'A')
+            || setweight(to_tsvector('simple', coalesce(guest_name, '')), 'B')
+            || setweight(to_tsvector('russian', coalesce(guest_name, '')), 'B')
+            || setweight(to_tsvector('russian', coalesce(notes, '')), 'C')
+            || setweight(to_tsvector('english', coalesce(notes, '')), 'C')
+    $$ LANGUAGE sql IMMUTABLE
+    """,
+    """
+    CREATE OR REPLACE FUNCTION folio_search_title(
+        booking_ref TEXT, guest_name TEXT, room_number TEXT
+    ) RETURNS TEXT AS $$
+        SELECT left(concat_ws(' · ', guest_name, 'номер ' || room_number, booking_ref), 255)
+    $$ LANGUAGE sql IMMUTABLE
+    """,
+    """
+    CREATE OR REPLACE FUNCTION folio_search_sync() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            DELETE FROM search_document WHERE entity_type = 'folio' AND entity_id = OLD.folio_id;
+            RETURN NULL;
+        END IF;
+        INSERT INTO search_document (entity_type, entity_id, title, subtitle, document, updated_at)
+        VALUES ('folio', NEW.folio_id,
+                folio_search_title(NEW.booking_ref, NEW.guest_name, NEW.room_number),
+                left(NEW.notes, 255),
+                folio_search_document(NEW.booking_ref, NEW.guest_name, NEW.room_number, NEW.notes),
+                now())
+        ON CONFLICT (entity_type, entity_id) DO UPDATE
+           SET title = EXCLUDED.title,
+               subtitle = EXCLUDED.subtitle,
+               document = EXCLUDED.document,
+               updated_at = EXCLUDED.updated_at;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    DO $$ BEGIN
+        CREATE TRIGGER folio_search_sync
+            AFTER INSERT OR DELETE OR UPDATE OF booking_ref, guest_name, room_number, notes ON folio
+            FOR EACH ROW EXECUTE FUNCTION folio_search_sync();
+    EXCEPTION WHEN duplicate_object THEN NULL;
+    END $$
+    """,
+    """
+    DO $$ BEGIN
+        IF to_regclass('search_document') IS NULL THEN
+            CREATE TABLE search_document (
+                entity_type VARCHAR(16) NOT NULL,
+                entity_id BIGINT NOT NULL,
+                title VARCHAR(255) NOT NULL,
+                subtitle VARCHAR(255),
+                document TSVECTOR NOT NULL,
+                updated_at TIMESTAMP NOT NULL DEFAULT now(),
+                PRIMARY KEY (entity_type, entity_id)
+            );
+            INSERT INTO search_document (entity_type, entity_id, title, subtitle, document)
+            SELECT 'folio', folio_id,
+                   folio_search_title(booking_ref, guest_name, room_number),
+                   left(notes, 255),
+                   folio_search_document(booking_ref, guest_name, room_number, notes)
+              FROM folio;
+            CREATE INDEX ix_search_document_document ON search_document USING GIN (document);
+        END IF;
+    END $$
+    """,
+]
+
+# Индексы отбора кандидатов (миграция 0005_search_order): префикс названия в
+# побайтовом порядке (LIKE 'ив%' и ORDER BY без сортировки) и время изменения
+SEARCH_ORDER_DDL = [
+    """
+    CREATE INDEX IF NOT EXISTS ix_search_document_title
+        ON search_document ((lower(title) COLLATE "C"))
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_search_document_updated
+        ON search_document (updated_at DESC)
+    """,
+]
+
+# Запрос объединяет варианты без морфологии и с русской и английской морфологией.
+# Кандидаты - до :candidates совпадений с названием, начинающимся с первого
+# слова запроса, и до :candidates недавно измененных совпадений; порядок каждой
+# ветви совпадает с порядком B-дерева, поэтому LIMIT останавливает просмотр
+# индекса. Если совпадений меньше :candidates, ранжируются все.
+SEARCH_SQL = """
+    WITH q AS (
+        SELECT to_tsquery('simple', :query)
+            || to_tsquery('russian', :query)
+            || to_tsquery('english', :query) AS query
+    ),
+    candidates AS (
+        (SELECT d.entity_type, d.entity_id
+           FROM search_document d, q
+          WHERE lower(d.title) COLLATE "C" LIKE :title_prefix
+            AND d.document @@ q.query
+          ORDER BY lower(d.title) COLLATE "C"
+          LIMIT :candidates)
+        UNION
+        (SELECT d.entity_type, d.entity_id
+           FROM search_document d, q
+          WHERE d.document @@ q.query
+          ORDER BY d.updated_at DESC
+          LIMIT :candidates)
+    )
+    SELECT d.entity_type, d.entity_id, d.title, d.subtitle,
+           ts_rank_cd(d.document, q.query) AS rank
+      FROM candidates c
+      JOIN search_document d USING (entity_type, entity_id), q
+     ORDER BY rank DESC, d.entity_id DESC
+     LIMIT :limit
+"""
+
+
+class SearchResult(NamedTuple):
+    """Результат поиска."""
+    entity_type: str
+    entity_id: int
+    title: str
+    subtitle: Optional[str]
+    rank: float
+
+
+def query_terms(query: str) -> List[str]:
+    """Слова строки поиска в нижнем регистре без повторов (не больше MAX_QUERY_TERMS)."""
+    terms = []
+    for term in _TERM.findall(query.lower()):
+        term = term.strip(_TERM_EDGES)
+        if term and term not in terms:
+            terms.append(term)
+    return terms[:MAX_QUERY_TERMS]
+
+
+def build_tsquery(query: str) -> Optional[str]:
+    """
+    Преобразует строку поиска в текст tsquery: все слова по префиксу.
+
+    Returns:
+        str: Текст для to_tsquery или None, если искать нечего
+    """
+    terms = query_terms(query)
+    if not terms or sum(map(len, terms)) < MIN_QUERY_LENGTH:
+        return None
+    return " & ".join(f"'{term}':*" for term in terms)
+
+
+def title_prefix(query: str) -> str:
+    """
+    Шаблон LIKE для названий, начинающихся с первого слова запроса.
+
+    Returns:
+        str: Шаблон с экранированными спецсимволами LIKE
+    """
+    terms = query_terms(query)
+    if not terms:
+        return ''
+    return _LIKE_SPECIAL.sub(r'\\\g<0>', terms[0]) + '%'
+
+
+def search(query: str, access_token: str, limit: int = SEARCH_LIMIT) -> Tuple[bool, str, List[SearchResult]]:
+    """
+    Ищет счета по строке поиска.
+
+    Args:
+        query: Строка поиска (номер бронирования, комнаты, имя, текст заметки)
+        access_token: Токен пользователя
+        limit: Максимальное количество результатов
+
+    Returns:
+        tuple: (успех, сообщение, результаты по убыванию релевантности)
+    """
+    if not has_permission(access_token, Permission.FOLIO_VIEW):
+        return False, "Недостаточно прав для выполнения операции", []
+
+    tsquery = build_tsquery(query)
+    if tsquery is None:
+        return True, "", []
+
+    session = get_db_session(read_only=True)
+    try:
+        rows = session.execute(text(SEARCH_SQL), {
+            'query': tsquery,
+            'title_prefix': title_prefix(query),
+            'candidates': SEARCH_CANDIDATE_LIMIT,
+            'limit': limit,
+        }).all()
+        return True, "", [SearchResult(*row) for row in rows]
+
+    except Exception as e:
+        logger.error(f"Ошибка поиска: {e}")
+        return False, f"Ошибка поиска: {str(e)}", []
+
+    finally:
+        session.close()
@@ -0,0 +1,365 @@
+"""
+Модуль сервисного режима.
+
+Запускает без интерфейса локальный HTTP/JSON-сервер на asyncio, через
+который рабочие места выполняют операции входа и управления
+пользователями. Все клиенты работают через один пул соединений процесса
+сервиса, поэтому число соединений с PostgreSQL не растет с числом мест.
+
+Запуск:
+    python -m core.service --host 0.0.0.0 --port 8765 --tls-cert server.crt --tls-key server.key
+    python -m core.service --port 8765    # только 127.0.0.1, за TLS-прокси
+
+По сети передаются пароли и токены, поэтому на нелокальном адресе сервис
+запускается только с TLS.
+
+Протокол: POST /api/<операция> с JSON-объектом именованных аргументов в
+теле; ответ {"result": ...} или {"error": "..."}. Аргументы каждой
+операции проверяются по списку допустимых; лишние и некорректные
+аргументы отклоняются с кодом 400.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import ssl
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+from config import SERVICE_HOST, SERVICE_PORT, SERVICE_WORKERS, SERVICE_TLS_CERT, SERVICE_TLS_KEY
+from core import auth, queries
+from core.auth import has_permission
+from core.database import check_db_connection
+from core.night_audit import run_night_audit
+from core.permissions import Permission
+from core.search import search
+from core.service_client import is_loopback_host
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Максимальный размер тела запроса (байт)
+MAX_BODY_SIZE = 1024 * 1024
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found",
+                405: "Method Not Allowed", 500: "Internal Server Error"}
+
+# Ограничения аргументов
+MAX_STRING_LENGTH = 255
+MAX_TOKEN_LENGTH = 4096
+MAX_BULK_IDS = 10000
+MAX_SEARCH_LIMIT = 100
+
+
+class Argument(NamedTuple):
+    """Допустимый аргумент операции: проверка значения, обязательность и преобразование из JSON."""
+    check: Callable[[Any], bool]
+    required: bool = True
+    convert: Optional[Callable[[Any], Any]] = None
+
+
+def _is_string(value) -> bool:
+    return isinstance(value, str) and len(value) <= MAX_STRING_LENGTH
+
+
+def _is_token(value) -> bool:
+    return isinstance(value, str) and len(value) <= MAX_TOKEN_LENGTH
+
+
+def _is_id(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+
+def _is_bool(value) -> bool:
+    return isinstance(value, bool)
+
+
+def _is_id_list(value) -> bool:
+    return isinstance(value, list) and len(value) <= MAX_BULK_IDS and all(map(_is_id, value))
+
+
+def _is_search_limit(value) -> bool:
+    return _is_id(value) and value <= MAX_SEARCH_LIMIT
+
+
+def _is_date(value) -> bool:
+    if not isinstance(value, str):
+        return False
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        return False
+    return True
+
+
+TOKEN = Argument(_is_token)
+USER_ID = Argument(_is_id)
+USER_IDS = Argument(_is_id_list)
+
+
+class Operation(NamedTuple):
+    """
+    Операция сервиса: функция, право, необходимое для вызова, и допустимые
+    аргументы. Функции core.auth, принимающие access_token, проверяют права
+    сами; для запросов только на чтение право проверяет сервис по токену из
+    аргумента access_token.
+    """
+    func: Callable[..., Any]
+    permission: Optional[Permission]
+    arguments: Dict[str, Argument]
+
+
+# Параметры, не перечисленные в arguments (например, inactivity_days ночного
+# аудита), клиент передать не может
+OPERATIONS: Dict[str, Operation] = {
+    'authenticate_user': Operation(auth.authenticate_user, None, {
+        'login': Argument(_is_string), 'password': Argument(_is_string)}),
+    'change_password': Operation(auth.change_password, None, {
+        'user_id': USER_ID, 'current_password': Argument(_is_string),
+        'new_password': Argument(_is_string)}),
+    'create_user': Operation(auth.create_user, None, {
+        'login': Argument(_is_string), 'password': Argument(_is_string),
+        'role_id': Argument(_is_id), 'access_token': TOKEN}),
+    'update_user': Operation(auth.update_user, None, {
+        'user_id': USER_ID, 'login': Argument(_is_string, False),
+        'role_id': Argument(_is_id, False), 'is_blocked': Argument(_is_bool, False),
+        'access_token': TOKEN}),
+    'unblock_user': Operation(auth.unblock_user, None, {'user_id': USER_ID, 'access_token': TOKEN}),
+    'bulk_block_users': Operation(auth.bulk_block_users, None, {
+        'user_ids': USER_IDS, 'access_token': TOKEN}),
+    'bulk_unblock_users': Operation(auth.bulk_unblock_users, None, {
+        'user_ids': USER_IDS, 'access_token': TOKEN}),
+    'bulk_change_role': Operation(auth.bulk_change_role, None, {
+        'user_ids': USER_IDS, 'role_id': Argument(_is_id), 'access_token': TOKEN}),
+    'bulk_reset_passwords': Operation(auth.bulk_reset_passwords, None, {
+        'user_ids': USER_IDS, 'access_token': TOKEN}),
+    'list_users': Operation(queries.list_users, Permission.USERS_VIEW, {'access_token': TOKEN}),
+    'get_user_details': Operation(queries.get_user_details, Permission.USERS_VIEW, {
+        'user_id': USER_ID, 'access_token': TOKEN}),
+    'list_roles': Operation(queries.list_roles, Permission.USERS_VIEW, {'access_token': TOKEN}),
+    'run_night_audit': Operation(run_night_audit, None, {
+        'business_date': Argument(_is_date, False, date.fromisoformat), 'access_token': TOKEN}),
+    'check_connection': Operation(check_db_connection, None, {}),
+    'search': Operation(search, None, {
+        'query': Argument(_is_string), 'access_token': TOKEN,
+        'limit': Argument(_is_search_limit, False)}),
+}
+
+
+def validate_arguments(operation: Operation, arguments: Dict[str, Any]) -> Optional[str]:
+    """
+    Проверяет аргументы операции.
+
+    Необязательный аргумент может быть передан как null (значение по умолчанию).
+
+    Returns:
+        str: Описание ошибки или None, если аргументы корректны
+    """
+    unknown = set(arguments) - set(operation.arguments)
+    if unknown:
+        return f"Недопустимые аргументы: {', '.join(sorted(unknown))}"
+    for name, argument in operation.arguments.items():
+        if name not in arguments:
+            if argument.required:
+                return f"Не указан аргумент: {name}"
+            continue
+        value = arguments[name]
+        if value is None and not argument.required:
+            continue
+        if not argument.check(value):
+            return f"Некорректное значение аргумента: {name}"
+    return None
+
+
+def _json_default(value):
+    """Сериализует значения, не поддерживаемые json по умолчанию."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Значение типа {type(value).__name__} не сериализуется в JSON")
+
+
+def call_operation(name: str, arguments: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+    """
+    Выполняет операцию сервиса.
+
+    Args:
+        name: Имя операции
+        arguments: Именованные аргументы
+
+    Returns:
+        tuple: (HTTP-статус, тело ответа)
+    """
+    if name not in OPERATIONS:
+        return 404, {'error': f"Неизвестная операция: {name}"}
+    operation = OPERATIONS[name]
+    error = validate_arguments(operation, arguments)
+    if error:
+        return 400, {'error': error}
+    # Необязательные аргументы, переданные как null, получают значение по умолчанию
+    arguments = {key: operation.arguments[key].convert(value) if operation.arguments[key].convert else value
+                 for key, value in arguments.items() if value is not None}
+    if operation.permission is not None:
+        token = arguments.pop('access_token', None)
+        if not has_permission(token, operation.permission):
+            return 403, {'error': "Недостаточно прав для выполнения операции"}
+    try:
+        return 200, {'result': operation.func(**arguments)}
+    except TypeError as e:
+        return 400, {'error': f"Некорректные аргументы: {e}"}
+    except Exception as e:
+        logger.error(f"Ошибка операции {name}: {e}")
+        return 500, {'error': "Внутренняя ошибка сервиса"}
+
+
+class AuthService:
+    """
+    HTTP/JSON-сервер операций.
+
+    Соединения клиентов обслуживает цикл asyncio; операции выполняются в
+    пуле потоков, размер которого не превышает пул соединений с БД.
+
+    Attributes:
+        host: Адрес прослушивания
+        port: Порт
+        ssl_context: Контекст TLS или None (только для локального адреса)
+    """
+
+    def __init__(self, host: str = SERVICE_HOST, port: int = SERVICE_PORT,
+                 workers: int = SERVICE_WORKERS, tls_cert: Optional[str] = SERVICE_TLS_CERT,
+                 tls_key: Optional[str] = SERVICE_TLS_KEY):
+        """
+        Raises:
+            ValueError: Если задан нелокальный адрес без сертификата TLS
+        """
+        if tls_cert:
+            self.ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            self.ssl_context.load_cert_chain(tls_cert, tls_key)
+        elif is_loopback_host(host):
+            self.ssl_context = None
+        else:
+            raise ValueError(
+                f"Без TLS сервис слушает только локальный адрес (за TLS-прокси), указан {host}; "
+                "задайте --tls-cert и --tls-key"
+            )
+        self.host = host
+        self.port = port
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ServiceWorker")
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        """
+        Читает один HTTP-запрос.
+
+        Returns:
+            tuple: (метод, путь, тело, keep-alive) или None при закрытии соединения
+        """
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        parts = request_line.decode('latin-1').split()
+        if len(parts) != 3:
+            raise ValueError("Некорректная строка запроса")
+        method, path, version = parts
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            key, _, value = line.decode('latin-1').partition(':')
+            headers[key.strip().lower()] = value.strip()
+        length = int(headers.get('content-length') or 0)
+        if length > MAX_BODY_SIZE:
+            raise ValueError("Слишком большое тело запроса")
+        body = await reader.readexactly(length) if length else b''
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+        return method, path, body, keep_alive
+
+    @staticmethod
+    def _write_response(writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any],
+                        keep_alive: bool):
+        body = json.dumps(payload, ensure_ascii=False, default=_json_default).encode('utf-8')
+        head = (
+            f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Обслуживает соединение клиента (с поддержкой keep-alive)."""
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except ValueError as e:
+                    self._write_response(writer, 400, {'error': str(e)}, False)
+                    break
+                if request is None:
+                    break
+                method, path, body, keep_alive = request
+
+                if method != 'POST':
+                    status, payload = 405, {'error': "Поддерживается только POST"}
+                elif not path.startswith('/api/'):
+                    status, payload = 404, {'error': f"Неизвестный путь: {path}"}
+                else:
+                    try:
+                        arguments = json.loads(body or b'{}')
+                        if not isinstance(arguments, dict):
+                            raise ValueError("Ожидается JSON-объект")
+                    except ValueError as e:
+                        status, payload = 400, {'error': f"Некорректный JSON: {e}"}
+                    else:
+                        status, payload = await loop.run_in_executor(
+                            self._executor, call_operation, path[len('/api/'):], arguments
+                        )
+
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self):
+        """Запускает сервер и обслуживает клиентов до остановки."""
+        server = await asyncio.start_server(self.handle_client, self.host, self.port,
+                                            ssl=self.ssl_context)
+        scheme = 'https' if self.ssl_context else 'http'
+        logger.info(f"Сервис запущен на {scheme}://{self.host}:{self.port}")
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сервисный режим Hotel Control System")
+    parser.add_argument("--host", default=SERVICE_HOST, help="Адрес прослушивания")
+    parser.add_argument("--port", type=int, default=SERVICE_PORT, help="Порт")
+    parser.add_argument("--workers", type=int, default=SERVICE_WORKERS,
+                        help="Количество потоков выполнения операций")
+    parser.add_argument("--tls-cert", default=SERVICE_TLS_CERT, help="Сертификат сервера (PEM)")
+    parser.add_argument("--tls-key", default=SERVICE_TLS_KEY, help="Закрытый ключ сервера (PEM)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        service = AuthService(args.host, args.port, args.workers, args.tls_cert, args.tls_key)
+    except (ValueError, OSError, ssl.SSLError) as e:
+        parser.error(str(e))
+    try:
+        asyncio.run(service.serve())
+    except KeyboardInterrupt:
+        logger.info("Сервис остановлен")
+
+
+if __name__ == "__main__":
+    main()
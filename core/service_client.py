@@ -0,0 +1,206 @@
+"""
+Модуль тонкого клиента сервисного режима.
+
+Повторяет сигнатуры операций core.auth и core.queries, выполняя их через
+HTTP/JSON API сервиса (core.service). Соединение с сервисом одно на поток
+и переиспользуется между вызовами. Пароли и токены передаются только по
+HTTPS; без TLS допускается лишь сервис на локальном адресе.
+"""
+
+import http.client
+import ipaddress
+import json
+import logging
+import ssl
+import threading
+from datetime import date, datetime
+from typing import Any, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from config import SERVICE_TIMEOUT, SERVICE_TLS_CA
+from core.queries import UserRow, UserDetails
+from core.search import SearchResult, SEARCH_LIMIT
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+
+class ServiceError(Exception):
+    """Исключение для ошибок обращения к сервису."""
+    pass
+
+
+def is_loopback_host(host: str) -> bool:
+    """Проверяет, что адрес локальный (соединение не выходит за пределы машины)."""
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class ServiceClient:
+    """
+    Клиент HTTP/JSON API сервиса.
+
+    Attributes:
+        base_url: URL сервиса, например https://hotel-server:8765
+    """
+
+    def __init__(self, base_url: str, timeout: float = SERVICE_TIMEOUT,
+                 ca_file: Optional[str] = SERVICE_TLS_CA):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ValueError(f"Некорректный URL сервиса: {base_url}")
+        if parts.scheme == 'http' and not is_loopback_host(parts.hostname):
+            raise ValueError(f"Сервис на другой машине доступен только по https: {base_url}")
+        self.base_url = base_url
+        self._host = parts.hostname
+        self._timeout = timeout
+        if parts.scheme == 'https':
+            self._port = parts.port or 443
+            self._ssl_context = ssl.create_default_context(cafile=ca_file)
+        else:
+            self._port = parts.port or 80
+            self._ssl_context = None
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            if self._ssl_context is not None:
+                connection = http.client.HTTPSConnection(
+                    self._host, self._port, timeout=self._timeout, context=self._ssl_context
+                )
+            else:
+                connection = http.client.HTTPConnection(self._host, self._port, timeout=self._timeout)
+            self._local.connection = connection
+        return connection
+
+    def _reset(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def call(self, operation: str, **arguments) -> Any:
+        """
+        Выполняет операцию сервиса.
+
+        Args:
+            operation: Имя операции
+            **arguments: Именованные аргументы операции
+
+        Returns:
+            Any: Результат операции (кортежи передаются как списки)
+
+        Raises:
+            ServiceError: Если сервис недоступен или вернул ошибку
+        """
+        body = json.dumps(arguments).encode('utf-8')
+        headers = {'Content-Type': 'application/json'}
+        # Сервис мог закрыть простаивающее соединение до получения запроса:
+        # только в этом случае запрос безопасно повторить
+        reused = getattr(self._local, 'connection', None) is not None
+        while True:
+            try:
+                connection = self._connection()
+                connection.request('POST', f"/api/{operation}", body, headers)
+                response = connection.getresponse()
+                payload = json.loads(response.read() or b'{}')
+                break
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError) as e:
+                self._reset()
+                if not reused:
+                    raise ServiceError(f"Сервис недоступен: {e}")
+                reused = False
+            except (http.client.HTTPException, OSError, ValueError) as e:
+                self._reset()
+                logger.error(f"Ошибка обращения к сервису: {e}")
+                raise ServiceError(f"Сервис недоступен: {e}")
+        if response.status != 200:
+            raise ServiceError(payload.get('error', f"Ошибка сервиса: HTTP {response.status}"))
+        return payload.get('result')
+
+
+class RemoteOperations:
+    """
+    Операции входа и управления пользователями через сервис.
+
+    Методы повторяют сигнатуры и форматы результатов функций core.auth
+    и core.queries.
+    """
+
+    def __init__(self, client: ServiceClient):
+        self._client = client
+
+    def _call_tuple(self, operation: str, **arguments) -> tuple:
+        try:
+            return tuple(self._client.call(operation, **arguments))
+        except ServiceError as e:
+            # Функции core.auth сообщают об ошибках результатом, а не исключением
+            return (False, str(e)) + ((None,) if operation == 'authenticate_user' else ())
+
+    def authenticate_user(self, login: str, password: str) -> tuple:
+        return self._call_tuple('authenticate_user', login=login, password=password)
+
+    def change_password(self, user_id: int, current_password: str, new_password: str) -> tuple:
+        return self._call_tuple('change_password', user_id=user_id,
+                                current_password=current_password, new_password=new_password)
+
+    def create_user(self, login: str, password: str, role_id: int, access_token: str = None) -> tuple:
+        return self._call_tuple('create_user', login=login, password=password,
+                                role_id=role_id, access_token=access_token)
+
+    def update_user(self, user_id: int, login: str = None, role_id: int = None,
+                    is_blocked: bool = None, access_token: str = None) -> tuple:
+        return self._call_tuple('update_user', user_id=user_id, login=login, role_id=role_id,
+                                is_blocked=is_blocked, access_token=access_token)
+
+    def unblock_user(self, user_id: int, access_token: str = None) -> tuple:
+        return self._call_tuple('unblock_user', user_id=user_id, access_token=access_token)
+
+    def bulk_block_users(self, user_ids, access_token: str = None) -> tuple:
+        return self._call_tuple('bulk_block_users', user_ids=list(user_ids), access_token=access_token)
+
+    def bulk_unblock_users(self, user_ids, access_token: str = None) -> tuple:
+        return self._call_tuple('bulk_unblock_users', user_ids=list(user_ids), access_token=access_token)
+
+    def bulk_change_role(self, user_ids, role_id: int, access_token: str = None) -> tuple:
+        return self._call_tuple('bulk_change_role', user_ids=list(user_ids),
+                                role_id=role_id, access_token=access_token)
+
+    def bulk_reset_passwords(self, user_ids, access_token: str = None) -> tuple:
+        return self._call_tuple('bulk_reset_passwords', user_ids=list(user_ids), access_token=access_token)
+
+    def list_users(self, access_token: str) -> List[UserRow]:
+        return [UserRow(*row) for row in self._client.call('list_users', access_token=access_token)]
+
+    def list_roles(self, access_token: str) -> List[Tuple[int, str]]:
+        return [tuple(row) for row in self._client.call('list_roles', access_token=access_token)]
+
+    def get_user_details(self, user_id: int, access_token: str) -> Optional[UserDetails]:
+        row = self._client.call('get_user_details', user_id=user_id, access_token=access_token)
+        if not row:
+            return None
+        details = UserDetails(*row)
+        if details.last_login:
+            details = details._replace(last_login=datetime.fromisoformat(details.last_login))
+        return details
+
+    def run_night_audit(self, progress=None, business_date: date = None, access_token: str = None) -> tuple:
+        # Прогресс по шагам через сервис не передается
+        result = self._call_tuple('run_night_audit', access_token=access_token,
+                                  business_date=business_date.isoformat() if business_date else None)
+        return result if len(result) == 3 else result + ({},)
+
+    def check_connection(self) -> Tuple[bool, str]:
+        return self._call_tuple('check_connection')
+
+    def search(self, query: str, access_token: str, limit: int = SEARCH_LIMIT) -> tuple:
+        result = self._call_tuple('search', query=query, access_token=access_token, limit=limit)
+        if len(result) != 3:
+            return result + ([],)
+        success, message, rows = result
+        return success, message, [SearchResult(*row) for row in rows]
@@ -1,23 +1,40 @@
+import os
 import sys
 from PyQt6.QtWidgets import QApplication, QMessageBox
+from PyQt6.QtCore import QTimer
 
 from ui.main_window import MainWindow
-from core.database import check_db_connection
+from core.api import check_connection, THIN_CLIENT
 from config import APP_NAME
 
+# При установленной переменной приложение закрывается сразу после первого
+# отображения окна (используется benchmarks/startup_report.py)
+STARTUP_PROBE = os.getenv('HOTEL_STARTUP_PROBE') == '1'
+
+
+def verify_connection():
+    """Проверяет подключение к базе данных (или к сервису) после отображения окна."""
+    connected, message = check_connection()
+
+    if not connected:
+        target = "сервису" if THIN_CLIENT else "базе данных"
+        QMessageBox.critical(None, f"{APP_NAME} - Ошибка",
+                            f"Не удалось подключиться к {target}.\n\n{message}")
+        QApplication.instance().exit(1)
+
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
-    
-    # Проверяем подключение к базе данных при запуске
-    connected, message = check_db_connection()
-    
-    if not connected:
-        QMessageBox.critical(None, f"{APP_NAME} - Ошибка", 
-                            f"Не удалось подключиться к базе данных.\n\n{message}")
-        sys.exit(1)
-    
+
     # Запускаем главное окно
     main_window = MainWindow()
     main_window.show()
-    
+
+    if STARTUP_PROBE:
+        QTimer.singleShot(0, app.quit)
+    else:
+        # Проверяем подключение к базе данных, когда окно уже отрисовано:
+        # подключение и загрузка драйвера БД не задерживают запуск
+        QTimer.singleShot(0, verify_connection)
+
     sys.exit(app.exec())
\ No newline at end of file
@@ -0,0 +1,52 @@
+# -*- mode: python ; coding: utf-8 -*-
+# Сборка с быстрым запуском: каталог вместо одного файла (без распаковки
+# во временный каталог при каждом запуске) и без UPX-сжатия библиотек Qt,
+# которые иначе распаковываются в память при каждой загрузке.
+#
+#     pyinstaller main_onedir.spec
+#     python -m benchmarks.startup_report --exe dist/HotelControl/HotelControl.exe
+
+
+a = Analysis(
+    ['main.py'],
+    pathex=[],
+    binaries=[],
+    datas=[],
+    hiddenimports=['passlib.handlers.bcrypt'],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=['tkinter'],
+    noarchive=False,
+    optimize=0,
+)
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='HotelControl',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,
+    console=False,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+    icon=['icon.ico'],
+)
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='HotelControl',
+)
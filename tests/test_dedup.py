@@ -0,0 +1,109 @@
+"""
+Тесты поиска дублей профилей гостей (core.dedup).
+"""
+
+import random
+from datetime import date
+from itertools import combinations
+
+from core import dedup
+from core.dedup import (
+    DuplicateCandidate, GuestProfile, MATCH_THRESHOLD,
+    find_duplicates, group_duplicates, score_pair, _normalize, blocking_keys
+)
+
+
+def profiles(count: int, seed: int = 1):
+    """Профили с намеренно пересекающимися фамилиями, датами рождения, телефонами и почтой."""
+    rng = random.Random(seed)
+    surnames = ["Иванов", "Ivanov", "Иванова", "Петров", "Petrov", "Смирнов", "Smirnova"]
+    given = ["Сергей", "Sergei", "Мария", "Maria", ""]
+    result = []
+    for guest_id in range(1, count + 1):
+        result.append(GuestProfile(
+            guest_id,
+            rng.choice(surnames),
+            rng.choice(given),
+            rng.choice([None, date(1985, 3, 7), date(1985, 7, 3), date(1990, 1, 1)]),
+            rng.choice([None, "+7 900 123-45-67", "8 (900) 123-45-67", "+7 911 000-00-01"]),
+            rng.choice([None, "guest@example.com", "other@example.com"]),
+        ))
+    return result
+
+
+def expected_pairs(items, threshold=MATCH_THRESHOLD):
+    """Все пары с общим ключом блокировки и оценкой не ниже порога (полный перебор)."""
+    normalized = [_normalize(profile) for profile in items]
+    pairs = set()
+    for a, b in combinations(normalized, 2):
+        keys_a, keys_b = blocking_keys(a), blocking_keys(b)
+        shared = any(key is not None and key == other for key, other in zip(keys_a, keys_b))
+        if shared and score_pair(a, b)[0] >= threshold:
+            pairs.add(tuple(sorted((a.guest_id, b.guest_id))))
+    return pairs
+
+
+def test_cyrillic_and_latin_spellings_match():
+    cyrillic = GuestProfile(1, "Иванов", "Сергей", date(1985, 3, 7))
+    latin = GuestProfile(2, "Ivanov", "Sergei", date(1985, 3, 7))
+
+    candidates = find_duplicates([cyrillic, latin], workers=0)
+
+    assert [(c.left_id, c.right_id) for c in candidates] == [(1, 2)]
+    assert candidates[0].reasons == ('name', 'birth_date')
+
+
+def test_swapped_day_and_month_scores_between_match_and_mismatch():
+    base = GuestProfile(1, "Петров", "Мария", date(1985, 3, 7))
+    same, swapped, other = (
+        _normalize(base._replace(guest_id=2, birth_date=birth_date))
+        for birth_date in (date(1985, 3, 7), date(1985, 7, 3), date(1985, 9, 11))
+    )
+
+    exact_score, exact_reasons = score_pair(_normalize(base), same)
+    swapped_score, swapped_reasons = score_pair(_normalize(base), swapped)
+    other_score, _ = score_pair(_normalize(base), other)
+
+    assert exact_score > swapped_score > other_score
+    assert 'birth_date' in exact_reasons
+    assert 'birth_date' not in swapped_reasons
+
+
+def test_each_pair_is_scored_once_across_blocks():
+    items = profiles(200)
+
+    candidates = find_duplicates(items, threshold=0.5, workers=0)
+    pairs = [(c.left_id, c.right_id) for c in candidates]
+
+    assert len(pairs) == len(set(pairs))
+    assert set(pairs) == expected_pairs(items, threshold=0.5)
+    # Пул процессов дает тот же результат
+    assert find_duplicates(items, threshold=0.5, workers=2) == candidates
+
+
+def test_pair_from_oversized_block_is_scored_in_next_shared_block(monkeypatch):
+    monkeypatch.setattr(dedup, 'MAX_BLOCK_SIZE', 20)
+    # Блок фамилии слишком большой; пары с общей датой рождения оцениваются в ее блоке
+    items = [GuestProfile(guest_id, "Иванов", "Сергей", date(1980, 1, 1 + (guest_id - 1) // 2))
+             for guest_id in range(1, 31)]
+
+    pairs = [(c.left_id, c.right_id) for c in find_duplicates(items, workers=0)]
+
+    assert sorted(pairs) == [(guest_id, guest_id + 1) for guest_id in range(1, 31, 2)]
+
+
+def test_group_duplicates_is_transitive():
+    candidates = [
+        DuplicateCandidate(1, 2, 0.9, ()),
+        DuplicateCandidate(2, 3, 0.9, ()),
+        DuplicateCandidate(4, 5, 0.9, ()),
+        DuplicateCandidate(3, 6, 0.9, ()),
+        DuplicateCandidate(7, 8, 0.9, ()),
+        DuplicateCandidate(5, 8, 0.9, ()),
+    ]
+    expected = [[1, 2, 3, 6], [4, 5, 7, 8]]
+
+    rng = random.Random(3)
+    for _ in range(10):
+        rng.shuffle(candidates)
+        assert group_duplicates(candidates) == expected
@@ -0,0 +1,97 @@
+"""
+Тесты матрицы набора и кэша прогноза загрузки (core.forecast).
+"""
+
+import random
+from datetime import date, timedelta
+
+import numpy as np
+
+from core.forecast import BookingRecord, OccupancyForecaster, PickupMatrix, MAX_LEAD_DAYS
+
+ORIGIN = date(2026, 1, 1)
+DAYS = 120
+
+
+def records(count: int, seed: int = 1, room_type: str = "standard"):
+    """Бронирования со случайной глубиной, длительностью и частью отмен."""
+    rng = random.Random(seed)
+    result = []
+    for _ in range(count):
+        arrival = ORIGIN + timedelta(days=rng.randrange(DAYS - 10))
+        departure = arrival + timedelta(days=rng.randint(1, 7))
+        # Часть бронирований сделана раньше, чем помещается в матрицу
+        booked_on = arrival - timedelta(days=rng.choice((0, 1, 5, 30, 90, MAX_LEAD_DAYS + 20)))
+        cancelled_on = None
+        if rng.random() < 0.3:
+            cancelled_on = booked_on + timedelta(days=rng.randint(0, (departure - booked_on).days + 3))
+        result.append(BookingRecord(room_type, booked_on, arrival, departure, cancelled_on, rng.randint(1, 3)))
+    return result
+
+
+def test_build_equals_repeated_add():
+    items = records(300)
+
+    built = PickupMatrix.build(items, ORIGIN, DAYS)
+    added = PickupMatrix(ORIGIN, DAYS)
+    for record in items:
+        added.add(record)
+
+    assert added.otb.shape == built.otb.shape
+    np.testing.assert_array_equal(added.otb, built.otb)
+
+
+def test_cancellation_round_trip():
+    base = [r._replace(cancelled_on=None) for r in records(100, seed=2)]
+    forecaster = OccupancyForecaster({"standard": 20}, base)
+    origin = forecaster._matrices["standard"].origin
+    days = forecaster._matrices["standard"].otb.shape[1]
+
+    booking = BookingRecord("standard", origin + timedelta(days=10), origin + timedelta(days=40),
+                            origin + timedelta(days=43), rooms=2)
+    forecaster.add_bookings([booking])
+    cancelled = booking._replace(cancelled_on=origin + timedelta(days=25))
+    forecaster.cancel_bookings([cancelled])
+
+    # Матрица совпадает с построенной заново с учетом отмены
+    np.testing.assert_array_equal(
+        forecaster._matrices["standard"].otb,
+        PickupMatrix.build(base + [cancelled], origin, days).otb
+    )
+
+
+def test_cancellation_on_booking_day_restores_matrix():
+    forecaster = OccupancyForecaster({"standard": 20}, records(100, seed=2))
+    matrix = forecaster._matrices["standard"]
+    before = matrix.otb.copy()
+    booking = BookingRecord("standard", ORIGIN + timedelta(days=10), ORIGIN + timedelta(days=40),
+                            ORIGIN + timedelta(days=43), rooms=2)
+
+    forecaster.add_bookings([booking])
+    assert not np.array_equal(matrix.otb, before)
+    # Отмена в день бронирования: номер не числился забронированным ни на одну глубину
+    forecaster.cancel_bookings([booking._replace(cancelled_on=booking.booked_on)])
+
+    np.testing.assert_array_equal(matrix.otb, before)
+
+
+def test_cache_invalidated_only_from_change_date():
+    forecaster = OccupancyForecaster({"standard": 20, "suite": 5},
+                                     records(100, seed=3) + records(30, seed=4, room_type="suite"))
+    early, change, late = ORIGIN + timedelta(days=20), ORIGIN + timedelta(days=30), ORIGIN + timedelta(days=40)
+    cached = {as_of: forecaster.forecast("standard", as_of) for as_of in (early, change, late)}
+    suite = forecaster.forecast("suite", late)
+
+    arrival = change + timedelta(days=15)
+    forecaster.add_bookings([BookingRecord("standard", change, arrival, arrival + timedelta(days=3))])
+
+    # Прогнозы до даты бронирования его не видят и берутся из кэша
+    assert forecaster.forecast("standard", early) is cached[early]
+    assert forecaster.forecast("suite", late) is suite
+    # Прогнозы на дату бронирования и позже пересчитаны и учитывают его
+    for as_of in (change, late):
+        fresh = forecaster.forecast("standard", as_of)
+        assert fresh is not cached[as_of]
+    nights = slice((arrival - late).days, (arrival - late).days + 3)
+    np.testing.assert_array_equal(forecaster.forecast("standard", late).on_the_books[nights],
+                                  cached[late].on_the_books[nights] + 1)
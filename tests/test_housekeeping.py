@@ -0,0 +1,135 @@
+"""
+Тесты исправления плана уборки (core.housekeeping) в течение смены.
+"""
+
+import random
+
+import pytest
+
+from core.housekeeping import (
+    HousekeepingPlanner, Housekeeper, RoomLocation,
+    STATUS_CLEAN, STATUS_DIRTY, STATUS_OCCUPIED, STATUS_OUT_OF_ORDER
+)
+
+
+def building(floors=3, wings=("A", "B"), doors=6):
+    """Номера здания: room_id = этаж * 100 + порядковый номер на этаже."""
+    rooms = []
+    for floor in range(1, floors + 1):
+        for wing_no, wing in enumerate(wings):
+            for position in range(1, doors + 1):
+                room_id = floor * 100 + wing_no * doors + position
+                rooms.append(RoomLocation(room_id, floor, wing, position, 20.0 + room_id % 3 * 5))
+    return rooms
+
+
+def make_planner(housekeepers=3):
+    return HousekeepingPlanner(building(), [Housekeeper(h, f"Горничная {h}") for h in range(1, housekeepers + 1)])
+
+
+def planned_rooms(routes):
+    """Номера всех маршрутов; каждый номер должен входить ровно в один маршрут."""
+    rooms = [room_id for route in routes for room_id in route.rooms]
+    assert len(rooms) == len(set(rooms)), "номер назначен нескольким горничным"
+    return set(rooms)
+
+
+def test_plan_covers_each_dirty_room_once():
+    planner = make_planner()
+    statuses = {room.room_id: STATUS_DIRTY if room.room_id % 2 else STATUS_CLEAN for room in building()}
+
+    routes = planner.plan(statuses)
+
+    assert planned_rooms(routes) == {r for r, s in statuses.items() if s == STATUS_DIRTY}
+
+
+def test_incremental_updates_keep_plan_consistent():
+    rng = random.Random(7)
+    planner = make_planner()
+    rooms = [room.room_id for room in building()]
+    statuses = {room_id: rng.choice((STATUS_DIRTY, STATUS_CLEAN, STATUS_OCCUPIED)) for room_id in rooms}
+    routes = planner.plan(statuses)
+    started = {}  # Номер в работе или убранный -> горничная
+
+    for _ in range(300):
+        action = rng.random()
+        if action < 0.2:
+            # Горничная берет первый номер своего маршрута
+            route = rng.choice([r for r in routes if r.rooms] or routes)
+            if route.rooms:
+                planner.start_cleaning(route.rooms[0])
+                started[route.rooms[0]] = route.housekeeper_id
+            continue
+        room_id = rng.choice(rooms)
+        status = rng.choice((STATUS_DIRTY, STATUS_CLEAN, STATUS_OCCUPIED, STATUS_OUT_OF_ORDER))
+        if status == STATUS_DIRTY and room_id in started and planner._in_progress[started[room_id]] != room_id:
+            # Убранный номер снова грязный и вернется в план
+            del started[room_id]
+        routes = planner.update_status(room_id, status)
+        statuses[room_id] = status
+
+        planned = planned_rooms(routes)
+        # Начатые и убранные номера не переносятся и не попадают в маршруты
+        assert not planned & set(started)
+        for room_id, housekeeper_id in started.items():
+            assert planner._owner[room_id] == housekeeper_id
+        # Номер учитывается в нагрузке не больше одного раза
+        counted = [r for h in planner.housekeepers
+                   for r in planner._done[h] + [planner._in_progress[h]] if r is not None]
+        assert len(counted) == len(set(counted))
+        assert not planned & set(counted)
+
+
+def test_redirtied_room_leaves_done_list():
+    planner = make_planner(housekeepers=2)
+    planner.plan({101: STATUS_DIRTY, 102: STATUS_DIRTY})
+    owner = planner._owner[101]
+    planner.start_cleaning(101)
+    planner.update_status(101, STATUS_CLEAN)
+    assert 101 in planner._done[owner]
+    load_before = planner._load(owner)[0]
+
+    routes = planner.update_status(101, STATUS_DIRTY)
+
+    assert 101 not in planner._done[owner]
+    assert 101 in planned_rooms(routes)
+    # Прежняя уборка больше не входит в нагрузку горничной
+    if planner._owner[101] != owner:
+        assert planner._load(owner)[0] < load_before
+
+
+def test_dirty_update_for_room_in_progress_is_noop():
+    planner = make_planner(housekeepers=2)
+    planner.plan({101: STATUS_DIRTY, 102: STATUS_DIRTY})
+    planner.start_cleaning(101)
+    before = planner.routes()
+
+    assert planner.update_status(101, STATUS_DIRTY) == before
+
+
+def test_start_cleaning_unplanned_room():
+    planner = make_planner(housekeepers=2)
+    planner.plan({101: STATUS_DIRTY})
+
+    with pytest.raises(ValueError):
+        planner.start_cleaning(102)
+    with pytest.raises(KeyError):
+        planner.start_cleaning(999)
+
+    planner.start_cleaning(102, housekeeper_id=2)
+    assert planner._in_progress[2] == 102
+    assert planner._owner[102] == 2
+
+
+def test_start_cleaning_moves_room_to_the_housekeeper_who_took_it():
+    planner = make_planner(housekeepers=2)
+    planner.plan({101: STATUS_DIRTY, 102: STATUS_DIRTY, 301: STATUS_DIRTY})
+    owner = planner._owner[101]
+    other = 2 if owner == 1 else 1
+
+    planner.start_cleaning(101, housekeeper_id=other)
+    routes = {route.housekeeper_id: route for route in planner.routes()}
+
+    assert planner._in_progress[other] == 101
+    assert 101 not in routes[owner].rooms
+    assert 101 not in routes[other].rooms
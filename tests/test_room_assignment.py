@@ -0,0 +1,112 @@
+"""
+Тесты распределения номеров (core.room_assignment) на небольших календарях.
+"""
+
+from datetime import date, timedelta
+
+from core.room_assignment import (
+    Room, Stay, RoomAssignmentOptimizer, diff_assignments, MIN_SELLABLE_NIGHTS
+)
+
+START = date(2026, 3, 1)
+
+
+def day(offset: int) -> date:
+    return START + timedelta(days=offset)
+
+
+def stay(booking_id, arrival, departure, room_type="standard", **kwargs) -> Stay:
+    return Stay(booking_id, room_type, day(arrival), day(departure), **kwargs)
+
+
+def occupancy(stays, assignments):
+    """Интервалы проживаний по номерам: room_id -> [(заезд, выезд)] по возрастанию."""
+    by_room = {}
+    for s in stays:
+        room_id = assignments.get(s.booking_id)
+        if room_id is not None:
+            by_room.setdefault(room_id, []).append((s.arrival, s.departure))
+    return {room_id: sorted(intervals) for room_id, intervals in by_room.items()}
+
+
+def orphan_gaps(stays, assignments) -> int:
+    """Количество окон короче MIN_SELLABLE_NIGHTS между проживаниями в одном номере."""
+    count = 0
+    for intervals in occupancy(stays, assignments).values():
+        for (_, previous_end), (next_start, _) in zip(intervals, intervals[1:]):
+            count += 0 < (next_start - previous_end).days < MIN_SELLABLE_NIGHTS
+    return count
+
+
+def test_no_overlapping_stays_in_a_room():
+    rooms = [Room(1, "standard"), Room(2, "standard"), Room(3, "suite")]
+    stays = [
+        stay(1, 0, 3), stay(2, 1, 4), stay(3, 2, 5), stay(4, 3, 6), stay(5, 4, 7),
+        stay(6, 0, 2, "suite"), stay(7, 2, 5, "suite"),
+    ]
+
+    result = RoomAssignmentOptimizer(rooms).optimize(stays)
+
+    for intervals in occupancy(stays, result.assignments).values():
+        for (_, previous_end), (next_start, _) in zip(intervals, intervals[1:]):
+            assert next_start >= previous_end
+    # Номер назначается только своего типа
+    room_types = {room.room_id: room.room_type for room in rooms}
+    for s in stays:
+        if s.booking_id in result.assignments:
+            assert room_types[result.assignments[s.booking_id]] == s.room_type
+    # Трем пересекающимся стандартным проживаниям не хватает двух номеров
+    assert result.unassigned == [3]
+
+
+def test_preferences_are_honoured():
+    rooms = [
+        Room(1, "standard"),
+        Room(2, "standard", features=frozenset({"sea_view"})),
+        Room(3, "standard"),
+    ]
+    stays = [
+        stay(1, 0, 3, preferred_features=frozenset({"sea_view"})),
+        stay(2, 0, 3, preferred_room=3),
+        stay(3, 0, 3),
+    ]
+
+    result = RoomAssignmentOptimizer(rooms).optimize(stays)
+
+    assert result.assignments[1] == 2
+    assert result.assignments[2] == 3
+    assert result.assignments[3] == 1
+
+
+def test_orphan_gap_is_removed():
+    rooms = [Room(1, "standard"), Room(2, "standard")]
+    stays = [
+        stay(1, 0, 3, room_id=1, locked=True),
+        stay(2, 0, 4, room_id=2, locked=True),
+        # Одна ночь между выездом первого проживания и заездом - окно не продать
+        stay(3, 4, 7, room_id=1),
+    ]
+    current = {s.booking_id: s.room_id for s in stays}
+    assert orphan_gaps(stays, current) == 1
+
+    result = RoomAssignmentOptimizer(rooms).optimize(stays)
+
+    assert result.orphan_gaps == 0
+    assert orphan_gaps(stays, result.assignments) == 0
+    assert result.assignments == {1: 1, 2: 2, 3: 2}
+    assert [(c.booking_id, c.old_room, c.new_room) for c in diff_assignments(stays, result)] == [(3, 1, 2)]
+
+
+def test_optimal_assignment_gives_empty_preview():
+    rooms = [Room(1, "standard"), Room(2, "standard", features=frozenset({"quiet"}))]
+    stays = [
+        stay(1, 0, 3, room_id=1),
+        stay(2, 3, 6, room_id=1),
+        stay(3, 1, 5, room_id=2, preferred_features=frozenset({"quiet"})),
+    ]
+
+    result = RoomAssignmentOptimizer(rooms).optimize(stays)
+
+    assert result.unassigned == []
+    assert result.orphan_gaps == 0
+    assert diff_assignments(stays, result) == []
@@ -7,10 +7,14 @@ from PyQt6.QtWidgets import (
     QTabWidget, QMessageBox, QStatusBar, QProgressBar, 
     QShortcut, QSizePolicy, QFrame
 )
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import Qt, pyqtSignal, QThread
 from PyQt6.QtGui import QFont, QKeySequence, QIcon
 
 from ui.admin.user_management_widget import UserManagementWidget
+from ui.admin.audit_log_widget import AuditLogWidget
+from core.api import run_night_audit, THIN_CLIENT
+from core.auth import has_permission
+from core.permissions import Permission
 import logging
 
 # Настройка логирования
@@ -24,6 +28,7 @@ class HeaderWidget(QFrame):
     Отображает заголовок и информацию о текущем пользователе.
     """
     refresh_clicked = pyqtSignal()
+    night_audit_clicked = pyqtSignal()
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -49,9 +54,15 @@ class HeaderWidget(QFrame):
         self.refresh_button.setToolTip("Обновить данные (F5)")
         self.refresh_button.clicked.connect(self.refresh_clicked.emit)
         
+        # Кнопка ночного аудита
+        self.night_audit_button = QPushButton("Ночной аудит")
+        self.night_audit_button.setToolTip("Выполнить суточное закрытие")
+        self.night_audit_button.clicked.connect(self.night_audit_clicked.emit)
+        
         layout.addWidget(title)
         layout.addStretch()
         layout.addWidget(self.user_info_label)
+        layout.addWidget(self.night_audit_button)
         layout.addWidget(self.refresh_button)
     
     def set_user_info(self, user_data):
@@ -91,6 +102,36 @@ class StatusBarManager(QStatusBar):
             self.showMessage(message)
         elif not is_loading:
             self.clearMessage()
+    
+    def show_progress(self, value, total, message=None):
+        """Показывает определенный прогресс выполнения операции."""
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(value)
+        self.progress_bar.setVisible(value < total)
+        if value >= total:
+            # Возвращаем индикатор в режим бесконечной загрузки
+            self.progress_bar.setRange(0, 0)
+        if message:
+            self.showMessage(message)
+
+
+class NightAuditWorker(QThread):
+    """
+    Поток выполнения ночного аудита.
+    
+    Выполняет аудит вне потока интерфейса и сообщает о прогрессе.
+    """
+    progress = pyqtSignal(int, int, str)
+    completed = pyqtSignal(bool, str, dict)
+    
+    def __init__(self, access_token, parent=None):
+        super().__init__(parent)
+        self.access_token = access_token
+    
+    def run(self):
+        """Выполняет ночной аудит."""
+        success, message, stats = run_night_audit(progress=self.progress.emit, access_token=self.access_token)
+        self.completed.emit(success, message, stats)
 
 
 class AdminDashboard(QWidget):
@@ -114,6 +155,7 @@ class AdminDashboard(QWidget):
         super().__init__()
         self.main_window = main_window
         self.user_data = None
+        self.night_audit_worker = None
         
         # Установка минимального размера
         self.setMinimumSize(800, 600)
@@ -131,6 +173,7 @@ class AdminDashboard(QWidget):
         # Заголовок
         self.header = HeaderWidget()
         self.header.refresh_clicked.connect(self.refresh_data)
+        self.header.night_audit_clicked.connect(self.run_night_audit)
         layout.addWidget(self.header)
         
         # Вкладки
@@ -142,6 +185,10 @@ class AdminDashboard(QWidget):
         self.user_management.user_modified.connect(self.on_user_modified)
         self.tab_widget.addTab(self.user_management, "Пользователи")
         
+        # Вкладка журнала аудита
+        self.audit_log = AuditLogWidget()
+        self.tab_widget.addTab(self.audit_log, "Журнал входа")
+        
         # Вкладка с информацией о других модулях
         info_widget = QWidget()
         info_layout = QVBoxLayout(info_widget)
@@ -187,6 +234,7 @@ class AdminDashboard(QWidget):
             
             # Обновляем интерфейс
             self.header.set_user_info(user_data)
+            self.apply_permissions(user_data.get('access_token'))
             self.refresh_data()
             
             # Показываем уведомление
@@ -226,10 +274,29 @@ class AdminDashboard(QWidget):
         if missing_fields:
             raise ValueError(f"Отсутствуют обязательные поля: {', '.join(missing_fields)}")
         
-        # Проверка роли
-        if user_data.get('role') != 'Administrator':
+        # Проверка права доступа по маске из токена
+        if not has_permission(user_data.get('access_token'), Permission.ADMIN_PANEL):
             raise ValueError("Недостаточно прав для доступа к панели администратора")
     
+    def apply_permissions(self, access_token):
+        """
+        Включает действия и вкладки в соответствии с правами пользователя.
+        
+        Args:
+            access_token: JWT токен доступа
+        """
+        self.user_management.set_access_token(access_token)
+        self.header.night_audit_button.setEnabled(has_permission(access_token, Permission.NIGHT_AUDIT))
+        self.tab_widget.setTabVisible(
+            self.tab_widget.indexOf(self.user_management),
+            has_permission(access_token, Permission.USERS_VIEW)
+        )
+        self.tab_widget.setTabVisible(
+            self.tab_widget.indexOf(self.audit_log),
+            # Журнал читается из БД напрямую и в режиме тонкого клиента недоступен
+            not THIN_CLIENT and has_permission(access_token, Permission.AUDIT_VIEW)
+        )
+    
     def refresh_data(self):
         """Обновляет данные во всех активных виджетах."""
         try:
@@ -241,6 +308,8 @@ class AdminDashboard(QWidget):
             
             if current_tab == self.user_management:
                 self.user_management.load_users()
+            elif current_tab == self.audit_log:
+                self.audit_log.load_events()
             
             # Скрываем индикатор и показываем сообщение об успехе
             self.status_bar.show_loading(False)
@@ -264,4 +333,41 @@ class AdminDashboard(QWidget):
     def on_user_modified(self):
         """Обработчик изменения данных пользователей."""
         self.status_bar.show_message("Данные пользователей успешно обновлены")
-        logger.info("Данные пользователей изменены")
\ No newline at end of file
+        logger.info("Данные пользователей изменены")
+    
+    def run_night_audit(self):
+        """Запускает ночной аудит в фоновом потоке."""
+        if self.night_audit_worker and self.night_audit_worker.isRunning():
+            return
+        
+        reply = QMessageBox.question(
+            self,
+            "Ночной аудит",
+            "Выполнить суточное закрытие?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+        
+        self.header.night_audit_button.setEnabled(False)
+        self.night_audit_worker = NightAuditWorker(self.user_data.get('access_token'), self)
+        self.night_audit_worker.progress.connect(self.status_bar.show_progress)
+        self.night_audit_worker.completed.connect(self.on_night_audit_completed)
+        self.night_audit_worker.start()
+    
+    def on_night_audit_completed(self, success, message, stats):
+        """Обработчик завершения ночного аудита."""
+        self.header.night_audit_button.setEnabled(
+            has_permission(self.user_data.get('access_token'), Permission.NIGHT_AUDIT)
+        )
+        self.status_bar.show_loading(False)
+        
+        if success:
+            blocked = stats.get('blocked_inactive', 0)
+            charged = stats.get('room_charges', 0)
+            self.status_bar.show_message(
+                f"{message}. Заблокировано учетных записей: {blocked}, начислений за проживание: {charged}"
+            )
+            self.refresh_data()
+        else:
+            QMessageBox.warning(self, "Ошибка ночного аудита", message)
\ No newline at end of file
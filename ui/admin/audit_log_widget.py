@@ -0,0 +1,121 @@
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
+    QPushButton, QLineEdit, QLabel, QHeaderView, QMessageBox
+)
+from PyQt6.QtCore import Qt
+
+from core.audit import fetch_events, EVENT_LABELS, EVENT_LOGIN_SUCCESS
+
+
+class AuditLogWidget(QWidget):
+    """Виджет постраничного просмотра журнала аудита аутентификации."""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        
+        # Ключи начала уже просмотренных страниц (для перехода назад)
+        self.page_cursors = [None]
+        self.next_cursor = None
+        self.loaded = False
+        
+        self.setup_ui()
+    
+    def showEvent(self, event):
+        """Загружает журнал при первом открытии вкладки."""
+        super().showEvent(event)
+        if not self.loaded:
+            self.load_events()
+    
+    def setup_ui(self):
+        """Настройка пользовательского интерфейса."""
+        main_layout = QVBoxLayout(self)
+        
+        # Заголовок
+        header_label = QLabel("Журнал аудита входа")
+        header_font = header_label.font()
+        header_font.setPointSize(12)
+        header_font.setBold(True)
+        header_label.setFont(header_font)
+        main_layout.addWidget(header_label)
+        
+        # Фильтр по логину
+        filter_layout = QHBoxLayout()
+        self.login_filter = QLineEdit()
+        self.login_filter.setPlaceholderText("Фильтр по логину")
+        self.login_filter.returnPressed.connect(self.load_events)
+        filter_layout.addWidget(self.login_filter)
+        
+        apply_button = QPushButton("Найти")
+        apply_button.clicked.connect(self.load_events)
+        filter_layout.addWidget(apply_button)
+        main_layout.addLayout(filter_layout)
+        
+        # Таблица событий
+        self.events_table = QTableWidget()
+        self.events_table.setColumnCount(5)
+        self.events_table.setHorizontalHeaderLabels(["Время", "Событие", "Логин", "ID пользователя", "Подробности"])
+        self.events_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.events_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.events_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        main_layout.addWidget(self.events_table)
+        
+        # Навигация по страницам
+        nav_layout = QHBoxLayout()
+        
+        self.prev_button = QPushButton("< Назад")
+        self.prev_button.clicked.connect(self.previous_page)
+        nav_layout.addWidget(self.prev_button)
+        
+        self.page_label = QLabel()
+        self.page_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        nav_layout.addWidget(self.page_label)
+        
+        self.next_button = QPushButton("Далее >")
+        self.next_button.clicked.connect(self.next_page)
+        nav_layout.addWidget(self.next_button)
+        
+        main_layout.addLayout(nav_layout)
+    
+    def load_events(self):
+        """Загружает первую страницу журнала с учетом фильтра."""
+        self.page_cursors = [None]
+        self.show_page()
+    
+    def next_page(self):
+        """Переходит на следующую страницу."""
+        if self.next_cursor is not None:
+            self.page_cursors.append(self.next_cursor)
+            self.show_page()
+    
+    def previous_page(self):
+        """Переходит на предыдущую страницу."""
+        if len(self.page_cursors) > 1:
+            self.page_cursors.pop()
+            self.show_page()
+    
+    def show_page(self):
+        """Отображает страницу, начинающуюся с последнего сохраненного ключа."""
+        login = self.login_filter.text().strip() or None
+        try:
+            events, self.next_cursor = fetch_events(self.page_cursors[-1], login=login)
+        except Exception as e:
+            QMessageBox.warning(self, "Ошибка", f"Не удалось загрузить журнал: {str(e)}")
+            return
+        
+        self.events_table.setRowCount(len(events))
+        for row, event in enumerate(events):
+            self.events_table.setItem(row, 0, QTableWidgetItem(event['event_time'].strftime("%d.%m.%Y %H:%M:%S")))
+            
+            event_item = QTableWidgetItem(EVENT_LABELS.get(event['event_type'], event['event_type']))
+            if event['event_type'] != EVENT_LOGIN_SUCCESS:
+                event_item.setForeground(Qt.GlobalColor.red)
+            self.events_table.setItem(row, 1, event_item)
+            
+            self.events_table.setItem(row, 2, QTableWidgetItem(event['login'] or ""))
+            self.events_table.setItem(row, 3, QTableWidgetItem(str(event['user_id'] or "")))
+            self.events_table.setItem(row, 4, QTableWidgetItem(event['details'] or ""))
+        
+        self.loaded = True
+        self.page_label.setText(f"Страница {len(self.page_cursors)}")
+        self.prev_button.setEnabled(len(self.page_cursors) > 1)
+        self.next_button.setEnabled(self.next_cursor is not None)
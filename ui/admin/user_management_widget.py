@@ -2,23 +2,29 @@ from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
     QPushButton, QDialog, QFormLayout, QLineEdit, QComboBox,
     QMessageBox, QCheckBox, QLabel, QSpacerItem, QSizePolicy,
-    QHeaderView
+    QHeaderView, QFileDialog, QProgressDialog, QInputDialog
 )
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import Qt, pyqtSignal, QThread
 
-from core.auth import create_user, unblock_user, update_user
-from core.models import UserRoleEnum, Role, User
-from core.database import get_db_session
+from core.auth import has_permission, TEMP_PASSWORD
+from core.api import (
+    create_user, update_user, bulk_block_users, bulk_unblock_users, bulk_change_role,
+    bulk_reset_passwords, list_users, list_roles, get_user_details, sync_users, THIN_CLIENT
+)
+from core.permissions import Permission
+from core.export import export_users
+from core.prefetch import dashboard_prefetch
 
 
 class UserDialog(QDialog):
     """Диалог для добавления или редактирования пользователя."""
     
-    def __init__(self, parent=None, user_id=None):
+    def __init__(self, parent=None, user_id=None, access_token=None):
 
         super().__init__(parent)
         
         self.user_id = user_id
+        self.access_token = access_token
         self.is_edit_mode = user_id is not None
         
         # Настройка диалога
@@ -65,34 +71,25 @@ class UserDialog(QDialog):
         layout.addRow("", button_layout)
     
     def load_roles(self):
-        """Загружает список ролей."""
-        session = get_db_session()
-        try:
-            roles = session.query(Role).all()
-            
-            for role in roles:
-                # Добавляем роль в комбобокс
-                self.role_combo.addItem(role.role_name.value, role.role_id)
-        finally:
-            session.close()
+        """Загружает список ролей из локальной копии справочников."""
+        roles = dashboard_prefetch.peek('roles', self.access_token) or list_roles(self.access_token)
+        for role_id, role_name in roles:
+            # Добавляем роль в комбобокс
+            self.role_combo.addItem(role_name, role_id)
     
     def load_user_data(self):
         """Загружает данные пользователя для редактирования."""
-        session = get_db_session()
-        try:
-            user = session.query(User).filter(User.user_id == self.user_id).first()
-            if user:
-                self.login_input.setText(user.login)
-                
-                # Выбираем роль пользователя
-                for i in range(self.role_combo.count()):
-                    if self.role_combo.itemData(i) == user.role_id:
-                        self.role_combo.setCurrentIndex(i)
-                        break
-                
-                self.block_check.setChecked(user.is_blocked)
-        finally:
-            session.close()
+        user = get_user_details(self.user_id, self.access_token)
+        if user:
+            self.login_input.setText(user.login)
+            
+            # Выбираем роль пользователя
+            for i in range(self.role_combo.count()):
+                if self.role_combo.itemData(i) == user.role_id:
+                    self.role_combo.setCurrentIndex(i)
+                    break
+            
+            self.block_check.setChecked(user.is_blocked)
     
     def get_form_data(self):
         """Получает данные формы."""
@@ -110,19 +107,65 @@ class UserDialog(QDialog):
         return data
 
 
+class ExportWorker(QThread):
+    """Поток выгрузки списка пользователей в файл."""
+    
+    progress = pyqtSignal(int, int)
+    completed = pyqtSignal(bool, str)
+    
+    def __init__(self, path, access_token, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.access_token = access_token
+        self._cancelled = False
+    
+    def cancel(self):
+        """Запрашивает отмену выгрузки."""
+        self._cancelled = True
+    
+    def is_cancelled(self):
+        """Возвращает True, если выгрузка отменена."""
+        return self._cancelled
+    
+    def run(self):
+        """Выполняет выгрузку."""
+        success, message, _ = export_users(
+            self.path,
+            progress=self.progress.emit,
+            is_cancelled=self.is_cancelled,
+            access_token=self.access_token
+        )
+        self.completed.emit(success, message)
+
+
+class CacheSyncWorker(QThread):
+    """Поток фоновой синхронизации локальной копии справочников."""
+    
+    synced = pyqtSignal(bool)
+    
+    def run(self):
+        """Выполняет синхронизацию."""
+        self.synced.emit(sync_users())
+
+
 class UserManagementWidget(QWidget):
     """Виджет для управления пользователями."""
     
     user_modified = pyqtSignal()
+    # Список, загруженный во время входа; испускается из потока загрузки
+    prefetched_users = pyqtSignal(object)
     
     def __init__(self, parent=None):
         super().__init__(parent)
         
-        # Настройка виджета
-        self.setup_ui()
+        self.export_worker = None
+        self.sync_worker = None
+        self.access_token = None
+        self.prefetched_users.connect(self.on_prefetched_users)
         
-        # Загрузка данных
-        self.load_users()
+        # Настройка виджета. Данные загружаются после входа администратора
+        # (AdminDashboard.setup -> refresh_data), а не при запуске приложения
+        self.setup_ui()
     
     def setup_ui(self):
         """Настройка пользовательского интерфейса."""
@@ -143,7 +186,7 @@ class UserManagementWidget(QWidget):
         self.users_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.users_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
         self.users_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.users_table.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)
+        self.users_table.setSelectionMode(QTableWidget.SelectionMode.ExtendedSelection)
         main_layout.addWidget(self.users_table)
         
         # Панель кнопок
@@ -159,13 +202,30 @@ class UserManagementWidget(QWidget):
         self.edit_button.clicked.connect(self.edit_user)
         button_layout.addWidget(self.edit_button)
         
-        # Кнопка разблокировки пользователя
+        # Групповые действия над выбранными пользователями
+        self.block_button = QPushButton("Заблокировать")
+        self.block_button.clicked.connect(self.block_users)
+        button_layout.addWidget(self.block_button)
+        
         self.unblock_button = QPushButton("Разблокировать")
-        self.unblock_button.clicked.connect(self.unblock_user)
+        self.unblock_button.clicked.connect(self.unblock_users)
         button_layout.addWidget(self.unblock_button)
         
+        self.role_button = QPushButton("Сменить роль")
+        self.role_button.clicked.connect(self.change_role)
+        button_layout.addWidget(self.role_button)
+        
+        self.reset_button = QPushButton("Сбросить пароль")
+        self.reset_button.clicked.connect(self.reset_passwords)
+        button_layout.addWidget(self.reset_button)
+        
         button_layout.addStretch()
         
+        # Кнопка выгрузки
+        self.export_button = QPushButton("Экспорт")
+        self.export_button.clicked.connect(self.export_users)
+        button_layout.addWidget(self.export_button)
+        
         # Кнопка обновления
         self.refresh_button = QPushButton("Обновить")
         self.refresh_button.clicked.connect(self.load_users)
@@ -173,46 +233,98 @@ class UserManagementWidget(QWidget):
         
         main_layout.addLayout(button_layout)
     
+    def set_access_token(self, access_token):
+        """
+        Устанавливает токен текущего пользователя и доступность действий по его правам.
+        
+        Args:
+            access_token: JWT токен доступа
+        """
+        self.access_token = access_token
+        self.add_button.setEnabled(has_permission(access_token, Permission.USERS_CREATE))
+        self.edit_button.setEnabled(has_permission(access_token, Permission.USERS_EDIT))
+        self.block_button.setEnabled(has_permission(access_token, Permission.USERS_EDIT))
+        self.unblock_button.setEnabled(has_permission(access_token, Permission.USERS_UNBLOCK))
+        self.role_button.setEnabled(has_permission(access_token, Permission.USERS_EDIT))
+        self.reset_button.setEnabled(has_permission(access_token, Permission.USERS_EDIT))
+        # Выгрузка читает БД напрямую и в режиме тонкого клиента недоступна
+        self.export_button.setEnabled(
+            not THIN_CLIENT and has_permission(access_token, Permission.USERS_EXPORT)
+        )
+    
     def load_users(self):
-        """Загружает список пользователей из базы данных."""
-        session = get_db_session()
-        try:
-            # Получаем пользователей с их ролями
-            users = session.query(User).all()
+        """
+        Показывает список пользователей из локальной копии и запускает
+        фоновую проверку актуальности по основной БД.
+        """
+        # Список, загруженный во время входа, уже синхронизирован с основной БД;
+        # незавершенная загрузка передаст его сигналом, не блокируя интерфейс
+        if dashboard_prefetch.take('users', self.access_token, self.prefetched_users.emit):
+            return
+        self.show_cached_users()
+    
+    def on_prefetched_users(self, users):
+        """Показывает список, загруженный во время входа."""
+        if users is None:
+            self.show_cached_users()
+            return
+        self.populate_table(users)
+    
+    def show_cached_users(self):
+        """Показывает локальную копию и запускает фоновую синхронизацию."""
+        self.populate_table()
+        
+        if self.sync_worker is None or not self.sync_worker.isRunning():
+            self.sync_worker = CacheSyncWorker(self)
+            self.sync_worker.synced.connect(self.on_cache_synced)
+            self.sync_worker.start()
+    
+    def on_cache_synced(self, changed):
+        """Перерисовывает таблицу, если фоновая синхронизация принесла изменения."""
+        if changed:
+            self.populate_table()
+    
+    def reload_after_write(self):
+        """Синхронизирует локальную копию после записи и обновляет таблицу."""
+        sync_users()
+        self.populate_table()
+    
+    def populate_table(self, users=None):
+        """
+        Заполняет таблицу пользователей.
+        
+        Args:
+            users: Готовый список UserRow; по умолчанию читается из локальной копии
+        """
+        if users is None:
+            users = list_users(self.access_token)
+        
+        # Очищаем таблицу
+        self.users_table.setRowCount(0)
+        self.users_table.setRowCount(len(users))
+        
+        for row_position, (user_id, login, role_name, is_blocked, failed_attempts) in enumerate(users):
+            # ID
+            self.users_table.setItem(row_position, 0, QTableWidgetItem(str(user_id)))
+            
+            # Логин
+            self.users_table.setItem(row_position, 1, QTableWidgetItem(login))
             
-            # Очищаем таблицу
-            self.users_table.setRowCount(0)
+            # Роль
+            self.users_table.setItem(row_position, 2, QTableWidgetItem(role_name))
             
-            for user in users:
-                row_position = self.users_table.rowCount()
-                self.users_table.insertRow(row_position)
-                
-                # ID
-                self.users_table.setItem(row_position, 0, QTableWidgetItem(str(user.user_id)))
-                
-                # Логин
-                self.users_table.setItem(row_position, 1, QTableWidgetItem(user.login))
-                
-                # Роль
-                # Получаем роль пользователя
-                role = session.query(Role).filter(Role.role_id == user.role_id).first()
-                role_name = role.role_name.value if role else "Неизвестно"
-                self.users_table.setItem(row_position, 2, QTableWidgetItem(role_name))
-                
-                # Статус
-                status = "Заблокирован" if user.is_blocked else "Активен"
-                status_item = QTableWidgetItem(status)
-                status_item.setForeground(Qt.GlobalColor.red if user.is_blocked else Qt.GlobalColor.green)
-                self.users_table.setItem(row_position, 3, status_item)
-                
-                # Попытки входа
-                self.users_table.setItem(row_position, 4, QTableWidgetItem(str(user.failed_attempts)))
-        finally:
-            session.close()
+            # Статус
+            status = "Заблокирован" if is_blocked else "Активен"
+            status_item = QTableWidgetItem(status)
+            status_item.setForeground(Qt.GlobalColor.red if is_blocked else Qt.GlobalColor.green)
+            self.users_table.setItem(row_position, 3, status_item)
+            
+            # Попытки входа
+            self.users_table.setItem(row_position, 4, QTableWidgetItem(str(failed_attempts)))
     
     def add_user(self):
         """Обработчик добавления нового пользователя."""
-        dialog = UserDialog(self)
+        dialog = UserDialog(self, access_token=self.access_token)
         
         if dialog.exec():
             data = dialog.get_form_data()
@@ -227,11 +339,13 @@ class UserManagementWidget(QWidget):
                 return
             
             # Создаем пользователя
-            success, message, user_id = create_user(data['login'], data['password'], data['role_id'])
+            success, message, user_id = create_user(
+                data['login'], data['password'], data['role_id'], access_token=self.access_token
+            )
             
             if success:
                 QMessageBox.information(self, "Успех", message)
-                self.load_users()  # Обновляем список пользователей
+                self.reload_after_write()  # Обновляем список пользователей
                 self.user_modified.emit()  # Сигнализируем об изменении
             else:
                 QMessageBox.warning(self, "Ошибка", message)
@@ -250,7 +364,7 @@ class UserManagementWidget(QWidget):
         user_id = int(self.users_table.item(row, 0).text())
         
         # Открываем диалог редактирования
-        dialog = UserDialog(self, user_id)
+        dialog = UserDialog(self, user_id, access_token=self.access_token)
         
         if dialog.exec():
             data = dialog.get_form_data()
@@ -260,44 +374,135 @@ class UserManagementWidget(QWidget):
             
             # Обновляем пользователя
             success, message = update_user(
-                user_id, 
+                user_id,
                 login=data['login'],  # Добавляем передачу логина
                 role_id=data['role_id'], 
-                is_blocked=data.get('is_blocked', False)
+                is_blocked=data.get('is_blocked', False),
+                access_token=self.access_token
             )
             
             if success:
                 QMessageBox.information(self, "Успех", "Данные пользователя обновлены.")
-                self.load_users()  # Обновляем список пользователей
+                self.reload_after_write()  # Обновляем список пользователей
                 self.user_modified.emit()  # Сигнализируем об изменении
             else:
                 QMessageBox.warning(self, "Ошибка", message)
     
-    def unblock_user(self):
-        """Обработчик разблокировки пользователя."""
-        # Получаем выбранную строку
-        selected_rows = self.users_table.selectedItems()
+    def selected_user_ids(self):
+        """Возвращает ID выбранных пользователей."""
+        return [
+            int(self.users_table.item(index.row(), 0).text())
+            for index in self.users_table.selectionModel().selectedRows()
+        ]
+    
+    def run_bulk_action(self, action, *args):
+        """
+        Выполняет групповое действие одним запросом и обновляет таблицу один раз.
         
-        if not selected_rows:
-            QMessageBox.warning(self, "Ошибка", "Выберите пользователя для разблокировки.")
+        Args:
+            action: Функция core.auth вида f(user_ids, *args, access_token=...)
+            args: Дополнительные аргументы действия
+        """
+        user_ids = self.selected_user_ids()
+        if not user_ids:
+            QMessageBox.warning(self, "Ошибка", "Выберите одного или нескольких пользователей.")
+            return False
+        
+        success, message, changed = action(user_ids, *args, access_token=self.access_token)
+        
+        if success:
+            self.reload_after_write()  # Обновляем список пользователей
+            if changed:
+                self.user_modified.emit()  # Сигнализируем об изменении
+            QMessageBox.information(self, "Успех", message)
+        else:
+            QMessageBox.warning(self, "Ошибка", message)
+        return success
+    
+    def block_users(self):
+        """Обработчик блокировки выбранных пользователей."""
+        self.run_bulk_action(bulk_block_users)
+    
+    def unblock_users(self):
+        """Обработчик разблокировки выбранных пользователей."""
+        self.run_bulk_action(bulk_unblock_users)
+    
+    def change_role(self):
+        """Обработчик смены роли выбранных пользователей."""
+        if not self.selected_user_ids():
+            QMessageBox.warning(self, "Ошибка", "Выберите одного или нескольких пользователей.")
             return
         
-        # Получаем ID пользователя
-        row = selected_rows[0].row()
-        user_id = int(self.users_table.item(row, 0).text())
+        roles = dashboard_prefetch.peek('roles', self.access_token) or list_roles(self.access_token)
+        role_name, ok = QInputDialog.getItem(
+            self,
+            "Смена роли",
+            "Новая роль:",
+            [name for _, name in roles],
+            0,
+            False
+        )
+        if ok:
+            role_id = next(role_id for role_id, name in roles if name == role_name)
+            self.run_bulk_action(bulk_change_role, role_id)
+    
+    def reset_passwords(self):
+        """Обработчик сброса паролей выбранных пользователей."""
+        count = len(self.selected_user_ids())
+        if count:
+            reply = QMessageBox.question(
+                self,
+                "Сброс пароля",
+                f"Сбросить пароль выбранным пользователям ({count})?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            )
+            if reply != QMessageBox.StandardButton.Yes:
+                return
         
-        # Проверяем статус пользователя
-        status = self.users_table.item(row, 3).text()
-        if status != "Заблокирован":
-            QMessageBox.information(self, "Информация", "Пользователь не заблокирован.")
+        if self.run_bulk_action(bulk_reset_passwords):
+            QMessageBox.information(
+                self,
+                "Сброс пароля",
+                f"Временный пароль: {TEMP_PASSWORD}\n"
+                "При следующем входе пользователям будет предложено изменить пароль."
+            )
+    
+    def export_users(self):
+        """Обработчик выгрузки списка пользователей в файл."""
+        if self.export_worker and self.export_worker.isRunning():
             return
         
-        # Разблокируем пользователя
-        success, message = unblock_user(user_id)
+        path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Экспорт пользователей",
+            "users.csv",
+            "CSV (*.csv);;Excel (*.xlsx)"
+        )
+        if not path:
+            return
+        
+        self.export_progress = QProgressDialog("Выгрузка пользователей...", "Отмена", 0, 0, self)
+        self.export_progress.setWindowModality(Qt.WindowModality.WindowModal)
+        self.export_progress.setMinimumDuration(500)
+        
+        self.export_worker = ExportWorker(path, self.access_token, self)
+        self.export_worker.progress.connect(self.on_export_progress)
+        self.export_worker.completed.connect(self.on_export_completed)
+        self.export_progress.canceled.connect(self.export_worker.cancel)
+        self.export_button.setEnabled(False)
+        self.export_worker.start()
+    
+    def on_export_progress(self, written, total):
+        """Обновляет индикатор выгрузки."""
+        self.export_progress.setMaximum(total)
+        self.export_progress.setValue(min(written, total))
+    
+    def on_export_completed(self, success, message):
+        """Обработчик завершения выгрузки."""
+        self.export_progress.reset()
+        self.export_button.setEnabled(has_permission(self.access_token, Permission.USERS_EXPORT))
         
         if success:
-            QMessageBox.information(self, "Успех", message)
-            self.load_users()  # Обновляем список пользователей
-            self.user_modified.emit()  # Сигнализируем об изменении
-        else:
+            QMessageBox.information(self, "Экспорт", message)
+        elif not self.export_worker.is_cancelled():
             QMessageBox.warning(self, "Ошибка", message)
\ No newline at end of file
@@ -4,7 +4,7 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt
 
-from core.auth import change_password
+from core.api import change_password
 
 
 class ChangePasswordDialog(QDialog):
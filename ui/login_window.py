@@ -2,13 +2,15 @@ import sys
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QPushButton, QMessageBox, QSpacerItem,
-    QSizePolicy, QFrame, QInputDialog
+    QSizePolicy, QFrame, QInputDialog, QComboBox
 )
 from PyQt6.QtCore import Qt, QSize
 from PyQt6.QtGui import QIcon, QFont
 
-from core.auth import authenticate_user, is_first_login, hash_password
-from core.database import get_db_session
+from core.auth import is_first_login, hash_password, TEMP_PASSWORD
+from core.api import authenticate_user, THIN_CLIENT
+from core.prefetch import dashboard_prefetch
+from core.database import get_db_session, db_registry
 from core.models import User
 from ui.change_password_dialog import ChangePasswordDialog
 from config import APP_NAME, MIN_WINDOW_WIDTH, MIN_WINDOW_HEIGHT
@@ -52,6 +54,18 @@ class LoginWindow(QMainWindow):
         form_layout = QVBoxLayout(form_frame)
         form_layout.setSpacing(15)
         
+        # Объект сети: вход выполняется в его БД (пользователи у объектов свои)
+        self.property_row = QWidget()
+        property_layout = QHBoxLayout(self.property_row)
+        property_layout.setContentsMargins(0, 0, 0, 0)
+        property_label = QLabel("Объект:")
+        self.property_combo = QComboBox()
+        self.property_combo.addItems(db_registry.names())
+        property_layout.addWidget(property_label)
+        property_layout.addWidget(self.property_combo)
+        self.property_row.setVisible(not THIN_CLIENT and len(db_registry.names()) > 1)
+        form_layout.addWidget(self.property_row)
+        
         # Логин
         login_layout = QHBoxLayout()
         login_label = QLabel("Логин:")
@@ -82,6 +96,8 @@ class LoginWindow(QMainWindow):
         reset_button = QPushButton("Забыли пароль?")
         reset_button.setFlat(True)
         reset_button.clicked.connect(self.handle_password_reset)
+        # Сброс пароля обращается к БД напрямую и в режиме тонкого клиента недоступен
+        reset_button.setVisible(not THIN_CLIENT)
         layout.addWidget(reset_button)
         
         # Устанавливаем последовательность Tab
@@ -89,12 +105,25 @@ class LoginWindow(QMainWindow):
         self.setTabOrder(self.password_input, self.login_button)
         
         # Устанавливаем фокус на поле логина при открытии окна
+        self.show_current_property()
         self.login_input.setFocus()
         
         # Привязываем нажатие Enter в полях к функции login
         self.login_input.returnPressed.connect(self.handle_login)
         self.password_input.returnPressed.connect(self.handle_login)
     
+    def show_current_property(self):
+        """Выбирает в списке текущий объект сети."""
+        self.property_combo.setCurrentText(db_registry.current_name)
+    
+    def select_property(self):
+        """Делает текущим объект, выбранный для входа."""
+        if self.property_row.isHidden():
+            return
+        db_registry.select(self.property_combo.currentText())
+        if self.main_window:
+            self.main_window.watch_current_property()
+    
     def handle_login(self):
         """Обрабатывает попытку входа"""
         login = self.login_input.text().strip()
@@ -114,9 +143,14 @@ class LoginWindow(QMainWindow):
         
         # Пытаемся войти
         try:
+            self.select_property()
             success, message, user_data = authenticate_user(login, password)
             
             if success:
+                # Роль и объект известны: данные панели загружаются из БД
+                # выбранного объекта, пока открыты сообщения
+                dashboard_prefetch.start(user_data.get('access_token'))
+                
                 # Проверяем, первый ли это вход пользователя
                 is_first_login = user_data.get('is_first_login', False)
                 print(f"Информация о первом входе из данных пользователя: {is_first_login}")
@@ -197,7 +231,7 @@ class LoginWindow(QMainWindow):
                     return
                 
                 # Сбрасываем пароль на временный
-                temp_password = "Temp123!"
+                temp_password = TEMP_PASSWORD
                 
                 # Хэшируем временный пароль и сохраняем его
                 hashed_password = hash_password(temp_password)
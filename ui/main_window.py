@@ -8,14 +8,21 @@ from typing import Optional, Dict
 
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QStackedWidget,
-    QMessageBox, QStatusBar, QMenuBar, QShortcut
+    QMessageBox, QStatusBar, QMenuBar, QShortcut, QLabel, QInputDialog, QLineEdit
 )
-from PyQt6.QtCore import Qt, QSettings, QSize, QPoint
+from PyQt6.QtCore import Qt, QSettings, QSize, QPoint, pyqtSignal, QThread
 from PyQt6.QtGui import QIcon, QAction, QKeySequence
 
 from ui.admin.admin_dashboard import AdminDashboard
 from ui.manager.manager_dashboard import ManagerDashboard
 from ui.login_window import LoginWindow
+from core.auth import has_permission
+from core.permissions import Permission
+from core.database import db_registry, get_db_manager
+from core.queries import group_user_summary
+from core.api import THIN_CLIENT, authenticate_user
+from core.prefetch import dashboard_prefetch
+from core.circuit_breaker import STATE_CLOSED, STATE_OPEN, STATE_HALF_OPEN
 
 # Настройка логирования
 logger = logging.getLogger(__name__)
@@ -27,6 +34,31 @@ COMPANY_NAME = "HotelSystem"
 APP_NAME = "Система управления отелем"
 APP_VERSION = "1.0"
 
+# Отображение состояния доступа к БД в строке состояния
+DB_STATE_LABELS = {
+    STATE_CLOSED: ("БД: подключена", "color: #2e7d32;"),
+    STATE_OPEN: ("БД: недоступна", "color: #c62828; font-weight: bold;"),
+    STATE_HALF_OPEN: ("БД: проверка подключения...", "color: #ef6c00;"),
+}
+
+
+class GroupSummaryWorker(QThread):
+    """
+    Поток сбора сводки по объектам сети.
+    
+    Запросы к БД объектов выполняются параллельно вне потока интерфейса.
+    """
+    completed = pyqtSignal(list, list)
+    
+    def run(self):
+        """Собирает сводку по всем объектам."""
+        try:
+            summaries, unavailable = group_user_summary()
+        except Exception as e:
+            logger.error(f"Ошибка сбора сводки по сети: {e}")
+            summaries, unavailable = [], db_registry.names()
+        self.completed.emit(summaries, unavailable)
+
 
 class MainWindow(QMainWindow):
     """
@@ -36,12 +68,17 @@ class MainWindow(QMainWindow):
     и менеджера) и обеспечивает навигацию между ними.
     """
     
+    # Смена состояния предохранителя БД; испускается из фонового потока
+    db_state_changed = pyqtSignal(str)
+    
     def __init__(self):
         """Инициализирует главное окно приложения."""
         super().__init__()
         
         # Инициализация настроек
         self.settings = QSettings(COMPANY_NAME, 'MainWindow')
+        self.summary_worker = None
+        self.user_data = {}
         
         # Инициализация UI
         self.setup_ui()
@@ -123,6 +160,19 @@ class MainWindow(QMainWindow):
         exit_action.triggered.connect(self.close)
         file_menu.addAction(exit_action)
         
+        # Меню "Объект" (для сети из нескольких отелей)
+        property_menu = menubar.addMenu("Объект")
+        
+        switch_property_action = QAction("Сменить объект...", self)
+        switch_property_action.triggered.connect(self.switch_property)
+        property_menu.addAction(switch_property_action)
+        
+        summary_action = QAction("Сводка по сети", self)
+        summary_action.triggered.connect(self.show_group_summary)
+        property_menu.addAction(summary_action)
+        
+        property_menu.menuAction().setVisible(not THIN_CLIENT and len(db_registry.names()) > 1)
+        
         # Меню "Справка"
         help_menu = menubar.addMenu("Справка")
         
@@ -148,6 +198,44 @@ class MainWindow(QMainWindow):
         """Настраивает строку состояния."""
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
+        
+        # Текущий объект сети
+        self.property_label = QLabel()
+        self.property_label.setVisible(not THIN_CLIENT and len(db_registry.names()) > 1)
+        self.status_bar.addPermanentWidget(self.property_label)
+        
+        # Индикатор доступности БД
+        self.db_state_label = QLabel()
+        self.db_state_label.setVisible(not THIN_CLIENT)
+        self.status_bar.addPermanentWidget(self.db_state_label)
+        
+        # Сигнал доставляет смену состояния в поток интерфейса
+        self.db_state_changed.connect(self.update_db_state)
+        self._db_state_listener = self.db_state_changed.emit
+        self._watched_manager = None
+        self.watch_current_property()
+    
+    def watch_current_property(self):
+        """Подписывает индикаторы строки состояния на БД текущего объекта."""
+        if self._watched_manager is not None:
+            self._watched_manager.breaker.remove_listener(self._db_state_listener)
+        self._watched_manager = get_db_manager()
+        self._watched_manager.breaker.add_listener(self._db_state_listener)
+        self.property_label.setText(f"Объект: {db_registry.current_name}")
+        self.update_db_state(self._watched_manager.breaker_state)
+    
+    def update_db_state(self, state: str):
+        """
+        Обновляет индикатор доступности БД.
+        
+        Args:
+            state: Состояние предохранителя БД
+        """
+        text, style = DB_STATE_LABELS.get(state, DB_STATE_LABELS[STATE_CLOSED])
+        self.db_state_label.setText(text)
+        self.db_state_label.setStyleSheet(style)
+        if state == STATE_OPEN:
+            self.show_status_message("Нет связи с базой данных, запросы временно отклоняются", 5000)
     
     def show_status_message(self, message: str, timeout: int = 3000):
         """
@@ -176,12 +264,18 @@ class MainWindow(QMainWindow):
             
             self.show_status_message(f"Загрузка панели для роли: {role}")
             
-            if role == 'Administrator':
+            access_token = user_data.get('access_token')
+            
+            # Объект выбран на экране входа, токен действует только в его БД
+            self.user_data = user_data
+            self.watch_current_property()
+            
+            if has_permission(access_token, Permission.ADMIN_PANEL):
                 self.admin_dashboard.setup(user_data)
                 self.stacked_widget.setCurrentWidget(self.admin_dashboard)
                 logger.info(f"Загружена панель администратора для {user_data['login']}")
             
-            elif role == 'Manager':
+            elif has_permission(access_token, Permission.MANAGER_PANEL):
                 self.manager_dashboard.setup(user_data)
                 self.stacked_widget.setCurrentWidget(self.manager_dashboard)
                 logger.info(f"Загружена панель менеджера для {user_data['login']}")
@@ -199,8 +293,84 @@ class MainWindow(QMainWindow):
             self.show_error("Ошибка", str(e))
             self.show_login()
     
+    def switch_property(self):
+        """
+        Переключает рабочий объект с повторным входом в его БД.
+        
+        Пользователи, роли и идентификаторы у каждого объекта свои, поэтому
+        токен прежнего объекта в новом не действует.
+        """
+        if self.stacked_widget.currentWidget() is self.login_screen:
+            return
+        names = db_registry.names()
+        if len(names) < 2 or THIN_CLIENT:
+            return
+        previous = db_registry.current_name
+        name, ok = QInputDialog.getItem(
+            self, "Выбор объекта", "Объект:", names, names.index(previous), False
+        )
+        if not ok or name == previous:
+            return
+        login = self.user_data.get('login', '')
+        password, ok = QInputDialog.getText(
+            self, "Вход в объект", f"Пароль пользователя {login} в объекте {name}:",
+            QLineEdit.EchoMode.Password
+        )
+        if not ok:
+            return
+        
+        # Данные панели загружены из БД прежнего объекта
+        dashboard_prefetch.discard()
+        db_registry.select(name)
+        try:
+            success, message, user_data = authenticate_user(login, password)
+        except Exception as e:
+            success, message, user_data = False, str(e), None
+        if not success:
+            db_registry.select(previous)
+            self.watch_current_property()
+            self.show_error("Ошибка входа", f"Не удалось войти в объект {name}: {message}")
+            return
+        
+        dashboard_prefetch.start(user_data.get('access_token'))
+        self.show_dashboard(user_data)
+        self.show_status_message(f"Текущий объект: {db_registry.current_name}")
+    
+    def show_group_summary(self):
+        """Запускает сбор сводки по всем объектам сети."""
+        if self.summary_worker is not None and self.summary_worker.isRunning():
+            return
+        self.show_status_message("Сбор сводки по объектам сети...", 0)
+        self.summary_worker = GroupSummaryWorker(self)
+        self.summary_worker.completed.connect(self.on_group_summary_completed)
+        self.summary_worker.start()
+    
+    def on_group_summary_completed(self, summaries, unavailable):
+        """Показывает сводку по объектам сети."""
+        self.status_bar.clearMessage()
+        lines = [
+            f"{s.property_name}: пользователей {s.users_total}, заблокировано {s.users_blocked}"
+            for s in summaries
+        ]
+        lines.append(
+            f"Всего: пользователей {sum(s.users_total for s in summaries)}, "
+            f"заблокировано {sum(s.users_blocked for s in summaries)}"
+        )
+        if unavailable:
+            lines.append(f"Недоступны: {', '.join(unavailable)}")
+        QMessageBox.information(self, "Сводка по сети", "\n".join(lines))
+    
     def show_login(self):
         """Показывает экран входа."""
+        # Данные панели предыдущего пользователя больше не нужны
+        dashboard_prefetch.discard()
+        
+        # Следующий вход по умолчанию предлагается в БД объекта по умолчанию
+        self.user_data = {}
+        if db_registry.current_name != db_registry.default:
+            db_registry.select(db_registry.default)
+            self.watch_current_property()
+        self.login_screen.show_current_property()
         self.stacked_widget.setCurrentWidget(self.login_screen)
         self.show_status_message("Экран входа")
         logger.debug("Отображен экран входа")
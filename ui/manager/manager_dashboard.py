@@ -1,47 +1,132 @@
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QLabel, QPushButton
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QLineEdit,
+    QTableWidget, QTableWidgetItem, QHeaderView
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QThread, QTimer, pyqtSignal
 from PyQt6.QtGui import QFont
 
+from core.api import search
+from core.auth import has_permission
+from core.permissions import Permission
+from core.search import ENTITY_LABELS
+
+# Задержка поиска после ввода (мс)
+SEARCH_DELAY_MS = 300
+
+
+class SearchWorker(QThread):
+    """Поток выполнения поиска вне потока интерфейса."""
+    completed = pyqtSignal(int, bool, str, list)
+
+    def __init__(self, request_no, query, access_token, parent=None):
+        super().__init__(parent)
+        self.request_no = request_no
+        self.query = query
+        self.access_token = access_token
+
+    def run(self):
+        """Выполняет поиск."""
+        success, message, results = search(self.query, self.access_token)
+        self.completed.emit(self.request_no, success, message, results)
+
+
 class ManagerDashboard(QWidget):
     """Панель управления для менеджера."""
-    
+
     def __init__(self, main_window=None):
         super().__init__()
         self.main_window = main_window
+        self.user_data = {}
+        self.search_workers = set()
+        self.request_no = 0
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.run_search)
         self.setup_ui()
-    
+
     def setup_ui(self):
         """Настраивает интерфейс панели управления"""
         layout = QVBoxLayout(self)
         layout.setContentsMargins(20, 20, 20, 20)
         layout.setSpacing(20)
-        
+
         # Заголовок
         title = QLabel("Панель управления менеджера")
         title_font = QFont("Arial", 16, QFont.Weight.Bold)
         title.setFont(title_font)
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(title)
-        
-        # Информационное сообщение
-        info = QLabel("Панель управления для менеджера находится в разработке.")
-        info.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        layout.addWidget(info)
-        
+
+        # Строка поиска: номер бронирования, комнаты, имя гостя или текст заметки
+        search_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Поиск: номер бронирования, комната, гость, заметка")
+        self.search_input.textChanged.connect(self.search_timer.start)
+        self.search_input.returnPressed.connect(self.run_search)
+        search_layout.addWidget(self.search_input)
+        layout.addLayout(search_layout)
+
+        # Результаты поиска
+        self.results_table = QTableWidget()
+        self.results_table.setColumnCount(4)
+        self.results_table.setHorizontalHeaderLabels(["Тип", "ID", "Описание", "Заметка"])
+        self.results_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.results_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.results_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        layout.addWidget(self.results_table)
+
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
         # Кнопка выхода
         logout_button = QPushButton("Выйти из системы")
         logout_button.clicked.connect(self.logout)
         layout.addWidget(logout_button)
-        
-        layout.addStretch()
-    
+
     def setup(self, user_data):
         """Настраивает панель с учетом данных пользователя"""
         self.user_data = user_data
-    
+        allowed = has_permission(user_data.get('access_token'), Permission.FOLIO_VIEW)
+        self.search_input.setEnabled(allowed)
+        self.search_input.clear()
+        self.results_table.setRowCount(0)
+        self.status_label.setText("" if allowed else "Нет прав на просмотр счетов")
+
+    def run_search(self):
+        """Запускает поиск по введенной строке."""
+        self.search_timer.stop()
+        query = self.search_input.text().strip()
+        # Ответы на устаревшие запросы отбрасываются по номеру
+        self.request_no += 1
+        if not query:
+            self.results_table.setRowCount(0)
+            self.status_label.setText("")
+            return
+
+        worker = SearchWorker(self.request_no, query, self.user_data.get('access_token'), self)
+        worker.completed.connect(self.on_search_completed)
+        worker.finished.connect(lambda: self.search_workers.discard(worker))
+        self.search_workers.add(worker)
+        worker.start()
+
+    def on_search_completed(self, request_no, success, message, results):
+        """Отображает результаты поиска."""
+        if request_no != self.request_no:
+            return
+        if not success:
+            self.status_label.setText(message)
+            return
+
+        self.results_table.setRowCount(len(results))
+        for row, result in enumerate(results):
+            self.results_table.setItem(row, 0, QTableWidgetItem(ENTITY_LABELS.get(result.entity_type, result.entity_type)))
+            self.results_table.setItem(row, 1, QTableWidgetItem(str(result.entity_id)))
+            self.results_table.setItem(row, 2, QTableWidgetItem(result.title))
+            self.results_table.setItem(row, 3, QTableWidgetItem(result.subtitle or ""))
+        self.status_label.setText(f"Найдено: {len(results)}" if results else "Ничего не найдено")
+
     def logout(self):
         """Обрабатывает выход из системы"""
         if self.main_window:
-            self.main_window.show_login() 
\ No newline at end of file
+            self.main_window.show_login()